@@ -0,0 +1,56 @@
+import argparse
+import json
+
+# Compare two result files written by benchmarks.suite:
+#
+#   python -m benchmarks.compare before.json after.json --threshold 25
+#
+# Prints every case's median before and after. A case counts as a regression when its median grew by
+# more than --threshold percent and by more than --min-ms (so noise on fast calls is ignored); the
+# exit status is 1 if there is any.
+
+
+def compare(before: dict, after: dict, threshold: float = 25.0, min_ms: float = 1.0) -> list:
+    # One row per case present in either file: (name, before_ms, after_ms, change_percent, regressed)
+    rows = []
+    for name in list(before['results']) + [n for n in after['results'] if n not in before['results']]:
+        old = before['results'].get(name, {}).get('median_ms')
+        new = after['results'].get(name, {}).get('median_ms')
+        change = (new - old) / old * 100 if old and new is not None else None
+        regressed = change is not None and change > threshold and new - old > min_ms
+        rows.append((name, old, new, change, regressed))
+    return rows
+
+
+def _label(report: dict) -> str:
+    return f"{report.get('commit') or 'unknown'}{'+' if report.get('dirty') else ''}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=25.0, help='percent slowdown that counts as a regression')
+    parser.add_argument('--min-ms', type=float, default=1.0, help='ignore slowdowns smaller than this')
+    args = parser.parse_args(argv)
+    with open(args.before, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(args.after, encoding='utf-8') as f:
+        after = json.load(f)
+    if before.get('dataset') != after.get('dataset'):
+        print(f"Warning: different datasets ({before.get('dataset')} vs {after.get('dataset')})")
+    rows = compare(before, after, args.threshold, args.min_ms)
+    print(f"{'case':<40} {_label(before):>12} {_label(after):>12}   change")
+    for name, old, new, change, regressed in rows:
+        old_text = f'{old:.3f}' if old is not None else '-'
+        new_text = f'{new:.3f}' if new is not None else '-'
+        change_text = f'{change:+.1f}%' if change is not None else ''
+        print(f"{name:<40} {old_text:>12} {new_text:>12}   {change_text}{'  REGRESSION' if regressed else ''}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
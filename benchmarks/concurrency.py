@@ -0,0 +1,140 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import date
+from typing import Dict
+from benchmarks.seed import seed
+from database.models import DEFAULT_BUSY_TIMEOUT_MS, DEFAULT_SYNCHRONOUS, JOURNAL_MODES, SYNCHRONOUS_LEVELS, GymDB
+
+# Several processes sharing one database file, like the two front-desk PCs plus the reminder and import
+# scripts:
+#
+#   python -m benchmarks.concurrency --readers 4 --writers 2 --seconds 10 --journal-mode delete wal
+#
+# Readers page through the members list and load the dashboard; writers record monthly payments and edit
+# members, all through GymDB. Each journal mode runs on its own copy of the database. Reports operations
+# per second, latencies and errors per role; any 'database is locked' error counts as a failure.
+
+
+def _worker(role: str, db_path: str, options: Dict, seconds: float, start, results):
+    latencies, errors = [], []
+    db = GymDB(db_path, **options)
+    member_ids = [row[0] for row in db._connect().execute('SELECT id FROM members ORDER BY id LIMIT 200')]
+    today = date.today().isoformat()
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    operation = 0
+    # GymDB reports failed writes by printing and returning None/False; keep that output per operation
+    while time.perf_counter() < deadline:
+        member_id = member_ids[(os.getpid() + operation) % len(member_ids)]
+        output = io.StringIO()
+        began = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                if role == 'reader':
+                    ok = db.query_members(limit=100, offset=(operation % 5) * 100)['members'] is not None
+                    ok = ok and db.get_dashboard_snapshot() is not None
+                elif operation % 2 == 0:
+                    ok = db.add_monthly_payment(member_id, 200, today, comment='stress') is not None
+                else:
+                    ok = db.update_member(member_id, address=f'Stress {operation}')
+        except sqlite3.Error as e:
+            ok = False
+            output.write(str(e))
+        latencies.append((time.perf_counter() - began) * 1000)
+        if not ok:
+            errors.append(output.getvalue().strip() or 'failed')
+        operation += 1
+    db.close()
+    results.put({'role': role, 'latencies': latencies, 'errors': errors})
+
+
+def stress(db_path: str, readers: int = 4, writers: int = 2, seconds: float = 5.0, **options) -> Dict:
+    # Run the readers and writers against db_path at the same time; options are GymDB connection settings
+    context = multiprocessing.get_context('spawn')
+    start = context.Event()
+    results = context.Queue()
+    with GymDB(db_path, **options) as db:
+        db.migrate()
+        journal_mode = db._connect().execute('PRAGMA journal_mode').fetchone()[0]
+    processes = [
+        context.Process(target=_worker, args=(role, db_path, options, seconds, start, results))
+        for role in ['reader'] * readers + ['writer'] * writers
+    ]
+    for process in processes:
+        process.start()
+    # Give every process time to import and connect before the clock starts
+    time.sleep(1.0)
+    start.set()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    report = {'journal_mode': journal_mode, 'seconds': seconds}
+    for role in ('reader', 'writer'):
+        latencies = sorted(lat for r in collected if r['role'] == role for lat in r['latencies'])
+        errors = [e for r in collected if r['role'] == role for e in r['errors']]
+        report[role + 's'] = {
+            'processes': sum(1 for r in collected if r['role'] == role),
+            'operations': len(latencies),
+            'per_second': round(len(latencies) / seconds, 1),
+            'median_ms': round(statistics.median(latencies), 2) if latencies else None,
+            'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 2) if latencies else None,
+            'max_ms': round(latencies[-1], 2) if latencies else None,
+            'errors': len(errors),
+            'lock_errors': sum('locked' in e or 'busy' in e for e in errors),
+            'first_error': errors[0] if errors else None,
+        }
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Concurrent reader and writer processes on one database')
+    parser.add_argument('--db', help='database to copy for each run (default: a seeded 1k dataset)')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--journal-mode', nargs='+', default=['wal'], help=f"one run per mode ({', '.join(JOURNAL_MODES)})")
+    parser.add_argument('--synchronous', choices=SYNCHRONOUS_LEVELS, default=DEFAULT_SYNCHRONOUS)
+    parser.add_argument('--busy-timeout', type=int, default=DEFAULT_BUSY_TIMEOUT_MS, help='milliseconds')
+    parser.add_argument('--output', help='also write the reports to this JSON file')
+    args = parser.parse_args(argv)
+    unknown = [mode for mode in args.journal_mode if mode not in JOURNAL_MODES]
+    if unknown:
+        parser.error(f"unknown journal mode(s): {', '.join(unknown)}")
+    reports = []
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        source = args.db
+        if source is None:
+            source = os.path.join(workdir, 'seed.db')
+            seed(source, 1000)
+        for mode in args.journal_mode:
+            db_path = os.path.join(workdir, f'stress-{mode}.db')
+            shutil.copy(source, db_path)
+            report = stress(db_path, args.readers, args.writers, args.seconds, journal_mode=mode,
+                            synchronous=args.synchronous, busy_timeout=args.busy_timeout)
+            reports.append(report)
+            print(f"journal_mode={report['journal_mode']}")
+            for role in ('readers', 'writers'):
+                r = report[role]
+                failed = failed or r['errors'] > 0
+                print(f"  {role:<8} {r['processes']} processes  {r['per_second']:8.1f} ops/s  median {r['median_ms']} ms"
+                      f"  p95 {r['p95_ms']} ms  max {r['max_ms']} ms  errors {r['errors']} ({r['lock_errors']} locked)")
+                if r['first_error']:
+                    print(f"           first error: {r['first_error']}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+import argparse
+import calendar
+import os
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterator, Optional
+from database.models import GymDB
+
+# Synthetic gym databases for the benchmarks:
+#
+#   python -m benchmarks.seed bench.db --size 10k
+#   python -m benchmarks.seed bench.db --members 50000 --payments 2000000
+#
+# Rows go through GymDB's bulk inserts, so the rollup triggers run exactly as they do for real data.
+# The data is reproducible for a given seed: members enrolled over the last few years, about one in
+# ten archived. By default every member gets a payment history: a monthly payment for most months
+# since enrollment, insurance every year and the occasional other payment. With --payments, that many
+# payments are instead spread at random over the members (one in four an insurance payment).
+
+# Members per dataset size
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000}
+
+ENROLLMENT_YEARS = 4
+ARCHIVED_RATIO = 0.1
+INSURANCE_RATIO = 0.25
+# Payment history: chance that a member pays a given month, renews insurance a given year, makes
+# an other payment in a given month
+MONTHLY_PAID_RATIO = 0.85
+INSURANCE_PAID_RATIO = 0.9
+OTHER_PAYMENT_RATIO = 0.05
+OTHER_PAYMENT_TYPES = ('registration', 'equipment', 'competition')
+
+FIRST_NAMES = ('Youssef', 'Fatima', 'Mohamed', 'Khadija', 'Omar', 'Salma', 'Amine', 'Imane', 'Hamza', 'Nora')
+LAST_NAMES = ('Alaoui', 'Bennani', 'Chraibi', 'El Idrissi', 'Fassi', 'Lahlou', 'Mansouri', 'Tazi', 'Zeroual')
+
+
+def _members(count: int, rng: random.Random, today: date, group_ids, insurance_type_ids) -> Iterator[Dict]:
+    for index in range(count):
+        yield {
+            'first_name': rng.choice(FIRST_NAMES),
+            'last_name': rng.choice(LAST_NAMES),
+            'cin': f'BK{index:07d}',
+            'birth_date': (today - timedelta(days=rng.randint(16 * 365, 60 * 365))).isoformat(),
+            'sex': rng.choice('MF'),
+            'phone_number': f'06{rng.randint(0, 99999999):08d}',
+            'enrollment_date': (today - timedelta(days=rng.randint(0, ENROLLMENT_YEARS * 365))).isoformat(),
+            'group_id': rng.choice(group_ids),
+            'insurance_type_id': rng.choice(insurance_type_ids),
+            'status': 'archived' if rng.random() < ARCHIVED_RATIO else 'active',
+        }
+
+
+def _payments(db: GymDB, count: int, rng: random.Random, today: date) -> Iterator[tuple]:
+    # ('monthly' | 'insurance', row) pairs, each dated between the member's enrollment and today
+    members = [(m['id'], date.fromisoformat(m['enrollment_date'])) for m in db.iter_members()]
+    for _ in range(count):
+        member_id, enrolled = rng.choice(members)
+        payment_date = enrolled + timedelta(days=rng.randint(0, (today - enrolled).days))
+        if rng.random() < INSURANCE_RATIO:
+            yield 'insurance', {'member_id': member_id, 'payment_date': payment_date.isoformat()}
+        else:
+            yield 'monthly', {
+                'member_id': member_id,
+                'payment_date': payment_date.isoformat(),
+                'month': calendar.month_name[payment_date.month],
+                'period': payment_date.year * 100 + payment_date.month,
+            }
+
+
+def _history(db: GymDB, rng: random.Random, today: date) -> Iterator[tuple]:
+    # ('monthly' | 'insurance' | 'other', row) pairs making up each member's history up to today
+    for member in db.iter_members():
+        enrolled = date.fromisoformat(member['enrollment_date'])
+        year, month = enrolled.year, enrolled.month
+        while (year, month) <= (today.year, today.month):
+            last_day = today.day if (year, month) == (today.year, today.month) else calendar.monthrange(year, month)[1]
+            if rng.random() < MONTHLY_PAID_RATIO:
+                payment_date = date(year, month, rng.randint(1, min(last_day, 10)))
+                yield 'monthly', {
+                    'member_id': member['id'],
+                    'payment_date': payment_date.isoformat(),
+                    'month': calendar.month_name[month],
+                    'period': year * 100 + month,
+                }
+            if month == enrolled.month and rng.random() < INSURANCE_PAID_RATIO:
+                yield 'insurance', {'member_id': member['id'], 'payment_date': date(year, month, 1).isoformat()}
+            if rng.random() < OTHER_PAYMENT_RATIO:
+                yield 'other', {
+                    'member_id': member['id'],
+                    'amount': rng.choice((50, 100, 150, 300)),
+                    'payment_date': date(year, month, rng.randint(1, last_day)).isoformat(),
+                    'transaction_type': rng.choice(OTHER_PAYMENT_TYPES),
+                }
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def seed(db_path: str, members: int = 1000, payments: Optional[int] = None, seed: int = 42,
+         chunk_size: int = 5000) -> Dict[str, int]:
+    # Create (or replace) db_path with the given number of members and their payment history (or
+    # `payments` payments at random); returns the row counts
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    rng = random.Random(seed)
+    today = date.today()
+    with GymDB(db_path) as db:
+        db.init_db()
+        group_ids = [g['id'] for g in db.get_groups()]
+        insurance_type_ids = [i['id'] for i in db.get_insurance_types()]
+        db.bulk_add_members(_members(members, rng, today, group_ids, insurance_type_ids), chunk_size)
+        inserts = {
+            'monthly': ('monthly_payments', db.bulk_add_monthly_payments),
+            'insurance': ('insurance_payments', db.bulk_add_insurance_payments),
+            'other': ('other_payments', db.bulk_add_other_payments),
+        }
+        pending = {kind: [] for kind in inserts}
+        counts = {'members': members, 'monthly_payments': 0, 'insurance_payments': 0, 'other_payments': 0}
+
+        def flush(kind):
+            table, insert = inserts[kind]
+            counts[table] += insert(pending[kind], chunk_size)['inserted']
+            pending[kind] = []
+
+        rows = _history(db, rng, today) if payments is None else _payments(db, payments, rng, today)
+        for kind, row in rows:
+            pending[kind].append(row)
+            if len(pending[kind]) >= chunk_size:
+                flush(kind)
+        for kind in inserts:
+            flush(kind)
+        db._connect().execute('ANALYZE')
+    return counts
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Create a synthetic gym database for benchmarks')
+    parser.add_argument('db', help='database file to create (replaced if it exists)')
+    parser.add_argument('--size', choices=SIZES, default='1k', help='number of members (default: 1k)')
+    parser.add_argument('--members', type=int, help='exact number of members (overrides --size)')
+    parser.add_argument('--payments', type=int, help='spread this many payments at random instead of building histories')
+    parser.add_argument('--seed', type=int, default=42, help='random seed; the same seed gives the same data')
+    args = parser.parse_args(argv)
+    counts = seed(args.db, args.members or SIZES[args.size], args.payments, args.seed)
+    print(', '.join(f'{count} {table}' for table, count in counts.items()))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Cold-start timings, each run in a fresh interpreter so nothing is already imported:
+#
+#   python benchmarks/startup.py --runs 5
+#
+# 'database.models' times the import of the database layer, 'gym_manager_app' times importing the GUI and
+# showing the main window until its first section is loaded (offscreen, against a copy of gym_payments.db),
+# and also reports the window's own first-paint time. Exits with status 1 when a median exceeds its
+# budget, so it can be used as a guard.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    'database.models': '''
+import database.models
+''',
+    'gym_manager_app': '''
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication
+import gym_manager_app
+app = QApplication(sys.argv)
+window = gym_manager_app.MainWindow()
+window.show()
+while 'ready' not in window.startup_times:
+    app.processEvents()
+marks['first_paint'] = window.startup_times['first_paint']
+''',
+}
+
+# Median milliseconds allowed per target
+BUDGETS_MS = {'database.models': 150, 'gym_manager_app': 2000}
+
+HARNESS = '''
+import json, os, sys, time
+marks = {{}}
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+print(json.dumps({{'ms': elapsed * 1000, 'selenium': 'selenium' in sys.modules, 'marks': marks}}))
+'''
+
+
+def time_target(name: str, workdir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    result = subprocess.run(
+        [sys.executable, '-c', HARNESS.format(code=TARGETS[name])],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Measure cold-start time of the database layer and the GUI')
+    parser.add_argument('targets', nargs='*', help=f"targets to time (default: all of {', '.join(TARGETS)})")
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per target')
+    args = parser.parse_args(argv)
+    unknown = [t for t in args.targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+    failed = False
+    with tempfile.TemporaryDirectory() as workdir:
+        shutil.copy(os.path.join(ROOT, 'gym_payments.db'), workdir)
+        for name in args.targets or TARGETS:
+            runs = [time_target(name, workdir) for _ in range(args.runs)]
+            median = statistics.median(run['ms'] for run in runs)
+            selenium_loaded = any(run['selenium'] for run in runs)
+            over_budget = median > BUDGETS_MS[name]
+            failed = failed or over_budget or selenium_loaded
+            print(f"{name:<18} median {median:7.1f} ms  min {min(run['ms'] for run in runs):7.1f} ms  "
+                  f"budget {BUDGETS_MS[name]} ms{'  OVER BUDGET' if over_budget else ''}"
+                  f"{'  (imported selenium)' if selenium_loaded else ''}")
+            for mark in runs[0]['marks']:
+                print(f"  {mark:<16} median {statistics.median(run['marks'][mark] for run in runs):7.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
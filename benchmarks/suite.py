@@ -0,0 +1,321 @@
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+from benchmarks.seed import SIZES, seed
+from database.models import GymDB
+
+# Timings of every public GymDB method (and the GUI's members table refresh) on a seeded dataset:
+#
+#   python -m benchmarks.suite --size 10k --output before.json
+#   ... change something ...
+#   python -m benchmarks.suite --size 10k --output after.json
+#   python -m benchmarks.compare before.json after.json
+#
+# Datasets are built once per size and seed by benchmarks.seed and kept in --data-dir; each run works on
+# a copy, so the write benchmarks never change them. Every case is called once to warm up and then
+# timed --runs times (fewer if it takes longer than --max-case-seconds), and the results are written as
+# JSON together with the commit, Python and SQLite versions they were measured with.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, 'benchmarks', 'data')
+
+# Public methods that are not benchmarked, and why
+SKIPPED = {
+    'init_db': 'drops every table',
+    'close': 'closes the connection the other cases use',
+    'cancellable': 'only wraps other calls',
+}
+
+
+class Context:
+    # Sample ids and names from the dataset, plus a counter for unique names in write cases
+    def __init__(self, db: GymDB):
+        conn = db._connect()
+        self.today = date.today()
+        self.period = self.today.year * 100 + self.today.month
+        self.member_id = conn.execute(
+            'SELECT member_id FROM member_payment_summary ORDER BY monthly_count DESC LIMIT 1'
+        ).fetchone()[0]
+        self.member_ids = [row[0] for row in conn.execute('SELECT id FROM members ORDER BY id LIMIT 1000')]
+        self.cins = [row[0] for row in conn.execute('SELECT cin FROM members ORDER BY id LIMIT 100')]
+        self.monthly_payment_id = conn.execute('SELECT MAX(id) FROM monthly_payments').fetchone()[0]
+        self.insurance_payment_id = conn.execute('SELECT MAX(id) FROM insurance_payments').fetchone()[0]
+        self.other_payment_id = conn.execute('SELECT MAX(id) FROM other_payments').fetchone()[0]
+        self.group = db.get_groups()[0]
+        self.insurance_type = db.get_insurance_types()[0]
+        self.run_id = 'benchmark'
+        self.counter = 0
+        self.write_member_id = db.add_member(**self.member())
+
+    def unique(self, prefix: str) -> str:
+        self.counter += 1
+        return f'{prefix} {self.counter}'
+
+    def member(self, **overrides) -> Dict:
+        data = dict(
+            first_name='Bench', last_name='Member', cin=self.unique('BENCH'), birth_date='2000-01-01', sex='M',
+            phone_number='0612345678', address='-', enrollment_date=self.today.isoformat(),
+            group_id=self.group['id'], insurance_type_id=self.insurance_type['id'],
+            emergency_contact_name='-', emergency_contact_phone='-', emergency_contact_relationship='other'
+        )
+        data.update(overrides)
+        return data
+
+
+def _enroll(db: GymDB, member: Dict):
+    # The front desk's most common write: a new member with their first monthly and insurance payments
+    with db.transaction():
+        member_id = db.add_member(**member)
+        db.add_monthly_payment(member_id)
+        db.add_insurance_payment(member_id)
+
+
+def _cases(db: GymDB, ctx: Context) -> Tuple[Dict, Dict]:
+    # Read and write cases, each name -> (setup, call). setup(), if any, runs untimed before every call and
+    # returns the call's arguments.
+    today = ctx.today.isoformat()
+    last_year = (ctx.today - timedelta(days=365)).isoformat()
+    start_period = (ctx.today.year - 1) * 100 + ctx.today.month
+    jobs = [(f'+2126{i:08d}', 'Benchmark reminder') for i in range(100)]
+    checkpoint = {'rows_done': 1000, 'inserted': 990, 'skipped': 5, 'errors': 5}
+
+    def saved_checkpoint():
+        name = ctx.unique('import')
+        db.save_import_checkpoint(name, checkpoint)
+        return (name,)
+
+    reads = {
+        # Reference data
+        'get_groups': (None, db.get_groups),
+        'get_insurance_types': (None, db.get_insurance_types),
+        'get_group_id_by_name': (None, lambda: db.get_group_id_by_name(ctx.group['name'])),
+        'get_group_name_by_id': (None, lambda: db.get_group_name_by_id(ctx.group['id'])),
+        'get_insurance_type_id_by_name': (None, lambda: db.get_insurance_type_id_by_name(ctx.insurance_type['name'])),
+        'get_insurance_type_name_by_id': (None, lambda: db.get_insurance_type_name_by_id(ctx.insurance_type['id'])),
+        # Members
+        'get_members': (None, db.get_members),
+        'iter_members': (None, lambda: sum(1 for _ in db.iter_members())),
+        'get_member_by_id': (None, lambda: db.get_member_by_id(ctx.member_id)),
+        'get_member_ids_by_cin': (None, lambda: db.get_member_ids_by_cin(ctx.cins)),
+        'get_members_with_details': (None, db.get_members_with_details),
+        'query_members': (None, lambda: db.query_members(limit=100)),
+        'query_members[search]': (None, lambda: db.query_members(search='ben', limit=100)),
+        # Payments
+        'payment_period': (None, lambda: GymDB.payment_period(today, 'January')),
+        'get_monthly_payments': (None, db.get_monthly_payments),
+        'iter_monthly_payments': (None, lambda: sum(1 for _ in db.iter_monthly_payments(since=last_year))),
+        'get_monthly_payment_by_id': (None, lambda: db.get_monthly_payment_by_id(ctx.monthly_payment_id)),
+        'get_insurance_payments': (None, db.get_insurance_payments),
+        'iter_insurance_payments': (None, lambda: sum(1 for _ in db.iter_insurance_payments(since=last_year))),
+        'get_insurance_payment_by_id': (None, lambda: db.get_insurance_payment_by_id(ctx.insurance_payment_id)),
+        'get_other_payments': (None, db.get_other_payments),
+        'iter_other_payments': (None, lambda: sum(1 for _ in db.iter_other_payments(since=last_year))),
+        'get_other_payment_by_id': (None, lambda: db.get_other_payment_by_id(ctx.other_payment_id)),
+        'get_all_payments_for_member': (None, lambda: db.get_all_payments_for_member(ctx.member_id)),
+        'iter_transactions': (None, lambda: list(db.iter_transactions(limit=100))),
+        'iter_transactions[member]': (None, lambda: list(db.iter_transactions(member_id=ctx.member_id))),
+        # Statistics
+        'get_member_statistics': (None, db.get_member_statistics),
+        'get_monthly_payment_coverage': (None, db.get_monthly_payment_coverage),
+        'get_period_payment_totals': (None, lambda: db.get_period_payment_totals(start_period, ctx.period)),
+        'get_unpaid_insurance_count': (None, db.get_unpaid_insurance_count),
+        'get_new_members_this_month': (None, db.get_new_members_this_month),
+        'get_dashboard_snapshot': (None, db.get_dashboard_snapshot),
+        'get_unpaid_members_for_month': (None, lambda: db.get_unpaid_members_for_month(ctx.today.month, ctx.today.year)),
+        'get_unpaid_insurance_members': (None, db.get_unpaid_insurance_members),
+        'get_unpaid_members_as_of': (None, lambda: db.get_unpaid_members_as_of(today)),
+        'rebuild_payment_summaries': (None, lambda: db.rebuild_payment_summaries(verify_only=True)),
+        # Reminders
+        'get_next_reminder_retry': (None, lambda: db.get_next_reminder_retry(ctx.run_id)),
+        'get_reminder_jobs': (None, lambda: db.get_reminder_jobs(ctx.run_id)),
+        'get_reminder_run_status': (None, lambda: db.get_reminder_run_status(ctx.run_id)),
+        'get_reminder_campaign_log': (None, lambda: db.get_reminder_campaign_log(ctx.run_id)),
+        'get_import_checkpoint': (None, lambda: db.get_import_checkpoint(ctx.run_id)),
+        'get_recently_reminded_member_ids': (None, lambda: db.get_recently_reminded_member_ids('monthly', datetime.now() - timedelta(days=7))),
+    }
+    # Writes go to a member of their own and run after the reads, so they do not change what the reads measure
+    writes = {
+        'invalidate_reference_cache': (None, db.invalidate_reference_cache),
+        'add_group': (None, lambda: db.add_group(ctx.unique('Bench group'), 100)),
+        'update_group': (lambda: (db.add_group(ctx.unique('Bench group'), 100),),
+                         lambda group_id: db.update_group(group_id, default_fee=120)),
+        'delete_group': (lambda: (db.add_group(ctx.unique('Bench group'), 100),), db.delete_group),
+        'add_insurance_type': (None, lambda: db.add_insurance_type(ctx.unique('Bench insurance'), 100)),
+        'update_insurance_type': (lambda: (db.add_insurance_type(ctx.unique('Bench insurance'), 100),),
+                                  lambda insurance_id: db.update_insurance_type(insurance_id, fee=120)),
+        'delete_insurance_type': (lambda: (db.add_insurance_type(ctx.unique('Bench insurance'), 100),),
+                                  db.delete_insurance_type),
+        'add_member': (lambda: (ctx.member(),), lambda member: db.add_member(**member)),
+        'update_member': (None, lambda: db.update_member(ctx.write_member_id, address=ctx.unique('Street'))),
+        'delete_member': (lambda: (db.add_member(**ctx.member()),), db.delete_member),
+        'bulk_update_members': (None, lambda: db.bulk_update_members({'ids': ctx.member_ids}, address=ctx.unique('Street'))),
+        'bulk_update_members[group]': (None, lambda: db.bulk_update_members(
+            {'group_id': ctx.group['id'], 'born_before': last_year}, group_id=ctx.group['id'])),
+        # Archived members are reactivated first, so every call archives the same ones again
+        'archive_members_without_payment_since': (lambda: (db.bulk_update_members({'status': 'archived'}, status='active'),),
+                                                  lambda _: db.archive_members_without_payment_since(last_year)),
+        'bulk_add_members': (lambda: ([ctx.member() for _ in range(1000)],), db.bulk_add_members),
+        'add_monthly_payment': (None, lambda: db.add_monthly_payment(ctx.write_member_id, 200, today)),
+        'update_monthly_payment': (None, lambda: db.update_monthly_payment(ctx.monthly_payment_id, comment=ctx.unique('Note'))),
+        'delete_monthly_payment': (lambda: (db.add_monthly_payment(ctx.write_member_id, 200, today),), db.delete_monthly_payment),
+        'bulk_add_monthly_payments': (lambda: ([{'member_id': ctx.write_member_id, 'payment_date': today}] * 1000,),
+                                      db.bulk_add_monthly_payments),
+        'add_insurance_payment': (None, lambda: db.add_insurance_payment(ctx.write_member_id, 150, today)),
+        'update_insurance_payment': (None, lambda: db.update_insurance_payment(ctx.insurance_payment_id, comment=ctx.unique('Note'))),
+        'delete_insurance_payment': (lambda: (db.add_insurance_payment(ctx.write_member_id, 150, today),), db.delete_insurance_payment),
+        'bulk_add_insurance_payments': (lambda: ([{'member_id': ctx.write_member_id, 'payment_date': today}] * 1000,),
+                                        db.bulk_add_insurance_payments),
+        'add_other_payments_table': (None, db.add_other_payments_table),
+        'add_other_payment': (None, lambda: db.add_other_payment(ctx.write_member_id, 100, today, 'equipment')),
+        'update_other_payment': (None, lambda: db.update_other_payment(ctx.other_payment_id, comment=ctx.unique('Note'))),
+        'delete_other_payment': (lambda: (db.add_other_payment(ctx.write_member_id, 100, today, 'equipment'),), db.delete_other_payment),
+        'bulk_add_other_payments': (lambda: ([{'member_id': ctx.write_member_id, 'amount': 100, 'payment_date': today,
+                                               'transaction_type': 'equipment'}] * 1000,), db.bulk_add_other_payments),
+        'migrate': (None, db.migrate),
+        'checkpoint': (None, db.checkpoint),
+        'transaction': (lambda: (ctx.member(),), lambda member: _enroll(db, member)),
+        'enqueue_reminder_jobs': (None, lambda: db.enqueue_reminder_jobs(ctx.unique('run'), jobs)),
+        'reset_interrupted_reminder_jobs': (None, lambda: db.reset_interrupted_reminder_jobs(ctx.run_id)),
+        'claim_reminder_job': (None, lambda: db.claim_reminder_job(ctx.run_id)),
+        'finish_reminder_job': (lambda: (db.claim_reminder_job(ctx.run_id)['id'],), db.finish_reminder_job),
+        'save_import_checkpoint': (None, lambda: db.save_import_checkpoint(ctx.run_id, checkpoint)),
+        'delete_import_checkpoint': (saved_checkpoint, db.delete_import_checkpoint),
+        'add_reminder_campaign_log': (None, lambda: db.add_reminder_campaign_log(ctx.unique('run'), 'monthly', ctx.period, [
+            {'member_id': member_id, 'status': 'queued'} for member_id in ctx.member_ids[:100]
+        ])),
+    }
+    return reads, writes
+
+
+def _gui_cases(db: GymDB) -> Dict[str, Tuple[Optional[Callable], Callable]]:
+    # The members table as the GUI fills it: the first page, then the next one as the view scrolls
+    try:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from gym_manager_app import MembersTableModel
+    except ImportError as e:
+        print(f"Skipping the members table benchmarks: {e}")
+        return {}
+    model = MembersTableModel(db)
+    filters = dict(order_by='-enrollment_date')
+    return {
+        'MembersTableModel.set_filters': (None, lambda: model.set_filters(**filters)),
+        'MembersTableModel.set_filters[search]': (None, lambda: model.set_filters(search='ben', **filters)),
+        'MembersTableModel.fetchMore': (lambda: (model.set_filters(**filters),), lambda _: model.fetchMore()),
+    }
+
+
+def _time_case(setup: Optional[Callable], call: Callable, runs: int, max_seconds: float) -> Dict:
+    timings = []
+    started = time.perf_counter()
+    for run in range(runs + 1):
+        args = setup() if setup else ()
+        before = time.perf_counter()
+        call(*args)
+        elapsed = (time.perf_counter() - before) * 1000
+        if run:
+            timings.append(elapsed)
+            if time.perf_counter() - started > max_seconds:
+                break
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'runs': len(timings),
+    }
+
+
+def _commit() -> Dict:
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return {'commit': git('rev-parse', '--short', 'HEAD'), 'dirty': bool(status) if status is not None else None}
+
+
+def dataset(size: str, seed_value: int = 42, data_dir: str = DATA_DIR) -> str:
+    # Path of the seeded dataset for size and seed, building it on first use
+    path = os.path.join(data_dir, f'gym-{size}-seed{seed_value}.db')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        print(f"Seeding the {size} dataset into {path} ...")
+        started = time.perf_counter()
+        counts = seed(path + '.tmp', SIZES[size], seed=seed_value)
+        os.replace(path + '.tmp', path)
+        print(f"  {', '.join(f'{count} {table}' for table, count in counts.items())} in {time.perf_counter() - started:.1f} s")
+    return path
+
+
+def run_suite(db_path: str, runs: int = 5, max_case_seconds: float = 5.0, only=None, gui: bool = True) -> Dict:
+    # Time every case on db_path (which the write cases modify) and return {'results': {...}, 'not_benchmarked': [...]}
+    with GymDB(db_path) as db:
+        db.migrate()
+        ctx = Context(db)
+        db.enqueue_reminder_jobs(ctx.run_id, [(f'+2127{i:08d}', 'Benchmark reminder') for i in range(10000)])
+        db.add_reminder_campaign_log(ctx.run_id, 'monthly', ctx.period, [
+            {'member_id': member_id, 'status': 'queued'} for member_id in ctx.member_ids
+        ])
+        reads, writes = _cases(db, ctx)
+        cases = {**reads, **(_gui_cases(db) if gui else {}), **writes}
+        public = {name for name, _ in inspect.getmembers(GymDB, callable) if not name.startswith('_')}
+        covered = {name.split('[')[0] for name in cases}
+        results = {}
+        for name, (setup, call) in cases.items():
+            if only and not any(pattern in name for pattern in only):
+                continue
+            results[name] = _time_case(setup, call, runs, max_case_seconds)
+            print(f"{name:<40} median {results[name]['median_ms']:10.3f} ms  min {results[name]['min_ms']:10.3f} ms"
+                  f"  ({results[name]['runs']} runs)")
+    return {'results': results, 'not_benchmarked': sorted(public - covered - set(SKIPPED))}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Time every public GymDB method on a seeded dataset')
+    parser.add_argument('--size', choices=SIZES, default='10k', help='dataset size (default: 10k members)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', help='benchmark a copy of this database instead of a seeded dataset')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='where seeded datasets are kept')
+    parser.add_argument('--runs', type=int, default=5, help='timed calls per case')
+    parser.add_argument('--max-case-seconds', type=float, default=5.0, help='stop repeating a case after this long')
+    parser.add_argument('--only', nargs='*', help='only cases whose name contains one of these')
+    parser.add_argument('--no-gui', action='store_true', help='skip the members table (PyQt5) cases')
+    parser.add_argument('--output', help='JSON results file (default: benchmark-<size>-<commit>.json)')
+    args = parser.parse_args(argv)
+    source = args.db or dataset(args.size, args.seed, args.data_dir)
+    commit = _commit()
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, 'benchmark.db')
+        shutil.copy(source, db_path)
+        suite = run_suite(db_path, args.runs, args.max_case_seconds, args.only, not args.no_gui)
+    if suite['not_benchmarked']:
+        print(f"Not benchmarked: {', '.join(suite['not_benchmarked'])}")
+    report = {
+        'dataset': os.path.basename(source) if args.db else {'size': args.size, 'seed': args.seed},
+        **commit,
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'runs': args.runs,
+        **suite,
+    }
+    output = args.output or f"benchmark-{args.size if not args.db else 'custom'}-{commit['commit'] or 'unknown'}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+from benchmarks.seed import seed
+from database.models import GymDB
+
+# What grouping writes with GymDB.transaction() saves on a typical front-desk workflow, enrolling a member
+# with their first monthly and insurance payments:
+#
+#   python -m benchmarks.transactions --enrollments 200
+#
+# 'separate' lets each of the three calls commit on its own, 'transaction' wraps them in one
+# db.transaction(). Commits are counted by tracing COMMIT statements. With synchronous='full' every
+# commit syncs to disk; with WAL and 'normal' only checkpoints do, so that setting shows what is left
+# once the fsyncs are gone.
+
+SETTINGS = [('delete', 'full'), ('wal', 'full'), ('wal', 'normal')]
+
+
+def _member(index: int) -> dict:
+    return dict(
+        first_name='New', last_name='Member', cin=f'ENROLL{index:06d}', birth_date='2000-01-01', sex='F',
+        phone_number='0612345678', address='-', enrollment_date=date.today().isoformat(), group_id=1,
+        insurance_type_id=1, emergency_contact_name='-', emergency_contact_phone='-',
+        emergency_contact_relationship='mother'
+    )
+
+
+def enroll(db: GymDB, index: int):
+    member_id = db.add_member(**_member(index))
+    db.add_monthly_payment(member_id)
+    db.add_insurance_payment(member_id)
+
+
+def run(db_path: str, journal_mode: str, synchronous: str, enrollments: int, grouped: bool) -> dict:
+    commits = []
+    with GymDB(db_path, journal_mode=journal_mode, synchronous=synchronous) as db:
+        db._connect().set_trace_callback(lambda sql: commits.append(sql) if sql.startswith('COMMIT') else None)
+        started = time.perf_counter()
+        for index in range(enrollments):
+            if grouped:
+                with db.transaction():
+                    enroll(db, index)
+            else:
+                enroll(db, index)
+        elapsed = time.perf_counter() - started
+    return {'ms_per_enrollment': elapsed * 1000 / enrollments, 'commits': len(commits)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Time member enrollments with and without db.transaction()')
+    parser.add_argument('--db', help='database to copy for each run (default: a seeded 1k dataset)')
+    parser.add_argument('--enrollments', type=int, default=200)
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as workdir:
+        source = args.db
+        if source is None:
+            source = os.path.join(workdir, 'seed.db')
+            seed(source, 1000)
+        for journal_mode, synchronous in SETTINGS:
+            results = {}
+            for mode in ('separate', 'transaction'):
+                db_path = os.path.join(workdir, f'{journal_mode}-{synchronous}-{mode}.db')
+                shutil.copy(source, db_path)
+                results[mode] = run(db_path, journal_mode, synchronous, args.enrollments, mode == 'transaction')
+            separate, grouped = results['separate'], results['transaction']
+            print(f"journal_mode={journal_mode:<6} synchronous={synchronous:<6}  "
+                  f"separate {separate['ms_per_enrollment']:7.3f} ms ({separate['commits']} commits)  "
+                  f"transaction {grouped['ms_per_enrollment']:7.3f} ms ({grouped['commits']} commits)  "
+                  f"x{separate['ms_per_enrollment'] / grouped['ms_per_enrollment']:.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
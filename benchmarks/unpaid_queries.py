@@ -0,0 +1,95 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+from benchmarks.seed import seed
+from database.models import GymDB
+
+# Latency of the unpaid-member queries, before and after the NOT EXISTS rewrite:
+#
+#   python -m benchmarks.unpaid_queries --members 50000 --payments 2000000
+#   python -m benchmarks.unpaid_queries --db existing.db
+#
+# 'legacy' runs the NOT IN / subtract-the-totals SQL the methods used before, 'current' calls the
+# GymDB methods. Both should return the same members; the legacy insurance count also counted archived
+# members who had paid, so it differs whenever such members exist.
+
+LEGACY_SQL = {
+    'unpaid_for_month': '''
+        SELECT * FROM members
+        WHERE status = 'active'
+          AND id NOT IN (SELECT member_id FROM monthly_payments WHERE period = ?)
+    ''',
+    'unpaid_insurance_count': '''
+        SELECT (SELECT COUNT(*) FROM members WHERE status = 'active')
+             - (SELECT COUNT(*) FROM member_payment_summary WHERE insurance_count > 0)
+    ''',
+    'unpaid_insurance': '''
+        SELECT * FROM members
+        WHERE status = 'active'
+          AND id NOT IN (SELECT member_id FROM insurance_payments)
+    ''',
+}
+
+
+def _time(function, runs: int):
+    timings, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def run(db: GymDB, runs: int):
+    today = date.today()
+    period = today.year * 100 + today.month
+    conn = db._connect()
+
+    def legacy(name, *params):
+        return lambda: sorted((dict(row) for row in conn.execute(LEGACY_SQL[name], params)), key=lambda m: m['id'])
+
+    cases = [
+        ('get_unpaid_members_for_month', legacy('unpaid_for_month', period),
+         lambda: db.get_unpaid_members_for_month(today.month, today.year)),
+        ('get_unpaid_insurance_members', legacy('unpaid_insurance'), db.get_unpaid_insurance_members),
+        ('get_unpaid_insurance_count', lambda: conn.execute(LEGACY_SQL['unpaid_insurance_count']).fetchone()[0],
+         lambda: db.get_unpaid_insurance_count()['unpaid_members']),
+        ('get_unpaid_members_as_of', None, lambda: db.get_unpaid_members_as_of(today.isoformat())),
+    ]
+    for name, before, after in cases:
+        after_ms, after_result = _time(after, runs)
+        line = f"{name:<30} current {after_ms:8.1f} ms"
+        if before is not None:
+            before_ms, before_result = _time(before, runs)
+            line += f"  legacy {before_ms:8.1f} ms"
+            if before_result != after_result:
+                line += f"  RESULTS DIFFER (legacy: {before_result if isinstance(before_result, int) else len(before_result)})"
+        print(f"{line}  ({after_result if isinstance(after_result, int) else len(after_result)})")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Time the unpaid-member queries against the legacy SQL')
+    parser.add_argument('--db', help='existing database to query (default: seed a temporary one)')
+    parser.add_argument('--members', type=int, default=50000)
+    parser.add_argument('--payments', type=int, default=2000000)
+    parser.add_argument('--runs', type=int, default=5, help='timed runs per query')
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = args.db
+        if db_path is None:
+            db_path = os.path.join(workdir, 'bench.db')
+            started = time.perf_counter()
+            counts = seed(db_path, args.members, args.payments)
+            print(f"Seeded {', '.join(f'{count} {table}' for table, count in counts.items())} "
+                  f"in {time.perf_counter() - started:.1f} s")
+        with GymDB(db_path) as db:
+            db.migrate()
+            run(db, args.runs)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
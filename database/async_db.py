@@ -0,0 +1,87 @@
+import asyncio
+import functools
+import inspect
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable
+from database.models import GymDB, ITER_BATCH_SIZE
+
+# asyncio front end for GymDB, for callers that run an event loop (a local HTTP API, Qt through qasync, ...):
+#
+#   async with AsyncGymDB('gym_payments.db') as db:
+#       stats, unpaid = await db.gather(db.get_member_statistics(), db.get_unpaid_insurance_members())
+#       async for payment in db.iter_monthly_payments(since='2024-01-01'):
+#           ...
+#
+# Every public GymDB method is available under the same name and arguments and returns an awaitable. The
+# calls run one after another on a single executor thread, so they share that thread's connection and the
+# event loop never waits on SQLite. iter_* methods become async iterators that fetch rows in batches.
+# The context managers (transaction(), cancellable()) only make sense on the database thread itself:
+# use them inside a function passed to run().
+
+# GymDB methods not offered as awaitables
+SYNC_ONLY = ('cancellable', 'transaction')
+
+
+class AsyncGymDB:
+    def __init__(self, db_path: str = "gym_payments.db", **options):
+        # options are GymDB's connection settings (journal_mode, busy_timeout, ...)
+        self.db = GymDB(db_path, **options)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='gymdb')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def run(self, function: Callable, *args, **kwargs):
+        # Call function(*args, **kwargs) on the database thread, e.g. to run several GymDB calls in one go:
+        # await db.run(lambda: [db.db.get_member_by_id(i) for i in ids])
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+    async def gather(self, *calls, return_exceptions: bool = False) -> list:
+        # Results of several awaitables from this facade, in order. They are all queued on the database
+        # thread at once and run back to back while the event loop goes on; for many tiny lookups, one
+        # run() call that makes them all is cheaper still (one thread hop instead of one per query).
+        return list(await asyncio.gather(*calls, return_exceptions=return_exceptions))
+
+    async def iterate(self, method: str, *args, batch_size: int = ITER_BATCH_SIZE, **kwargs) -> AsyncIterator:
+        # Rows of a GymDB iter_* method; the generator and its cursor live on the database thread and are
+        # advanced one batch at a time
+        rows = await self.run(getattr(self.db, method), *args, **kwargs)
+        try:
+            while True:
+                batch = await self.run(lambda: list(itertools.islice(rows, batch_size)))
+                if not batch:
+                    break
+                for row in batch:
+                    yield row
+        finally:
+            await self.run(rows.close)
+
+    async def close(self):
+        await self.run(self.db.close)
+        self._executor.shutdown(wait=True)
+
+    def __getattr__(self, name: str):
+        # Only reached for names not defined above: wrap the GymDB method of the same name
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attribute = inspect.getattr_static(GymDB, name, None)
+        if isinstance(attribute, staticmethod):
+            return getattr(GymDB, name)
+        if not callable(attribute) or name in SYNC_ONLY:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        if name.startswith('iter_'):
+            wrapper = functools.wraps(attribute)(lambda *args, **kwargs: self.iterate(name, *args, **kwargs))
+        else:
+            method = getattr(self.db, name)
+            wrapper = functools.wraps(attribute)(lambda *args, **kwargs: self.run(method, *args, **kwargs))
+        setattr(self, name, wrapper)
+        return wrapper
+
+    def __dir__(self):
+        public = [name for name, _ in inspect.getmembers(GymDB, callable) if not name.startswith('_') and name not in SYNC_ONLY]
+        return sorted(set(super().__dir__()) | set(public))
@@ -0,0 +1,207 @@
+import argparse
+import calendar
+import itertools
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from database.models import GymDB
+from database.messaging import ReminderDispatcher, WhatsAppWebTransport
+
+# Reminder campaigns: from the unpaid-members queries to queued WhatsApp reminders in one step.
+#
+#   python -m database.campaigns monthly --month 10 --year 2026
+#   python -m database.campaigns insurance --dry-run
+#
+# Targets come from GymDB.get_unpaid_members_for_month() or get_unpaid_insurance_members(). Phone numbers
+# are normalized to E.164 (local Moroccan numbers get +212), members reminded by a campaign of the same
+# kind within the cooldown are skipped, and members sharing a phone (e.g. siblings) get one message with
+# all their names and the total due. Every member considered is written to reminder_campaign_log, the
+# messages are queued for the reminder dispatcher in batches, and the dispatcher then sends them. The
+# run id is derived from the kind, month and day, so running the same campaign again that day (or with the
+# same --run-id) resumes it: members whose reminder was sent or is still queued are left alone, and those
+# whose reminder failed are tried again.
+
+KINDS = ('monthly', 'insurance')
+
+DEFAULT_COUNTRY_CODE = '212'
+
+TEMPLATES = {
+    'monthly': "Hi {name}, this is a reminder that your {month} gym fee of {amount:g} MAD is still due.",
+    'insurance': "Hi {name}, this is a reminder that your insurance fee of {amount:g} MAD is still due.",
+}
+
+# Fields a template may use
+TEMPLATE_FIELDS = ('name', 'first_name', 'amount', 'month', 'year')
+
+
+def normalize_phone(raw: Optional[str], country_code: str = DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    # E.164 form of a phone number ('+212612345678'), or None if it cannot be one. National numbers
+    # ('0612345678', '612345678') get country_code; '00' international prefixes become '+'.
+    if not raw:
+        return None
+    digits = re.sub(r'[\s\-.()/]', '', str(raw))
+    if digits.startswith('+'):
+        digits = digits[1:]
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif digits.startswith('0'):
+        digits = country_code + digits[1:]
+    elif not digits.startswith(country_code) and len(digits) == 9:
+        digits = country_code + digits
+    if not digits.isdigit() or not 8 <= len(digits) <= 15:
+        return None
+    return '+' + digits
+
+
+def render(template: str, **fields) -> str:
+    try:
+        return template.format(**fields)
+    except (KeyError, IndexError) as e:
+        raise ValueError(f"Unknown template field {e}. Available fields: {', '.join(TEMPLATE_FIELDS)}.")
+
+
+def plan_campaign(db: GymDB, kind: str, members: Iterable[Dict], template: Optional[str] = None,
+                  cooldown_days: int = 7, month: Optional[int] = None, year: Optional[int] = None,
+                  country_code: str = DEFAULT_COUNTRY_CODE) -> Dict[str, List[Dict]]:
+    # Decide what each unpaid member gets: {'messages': [...], 'skipped': [...]}. A message is
+    # {'phone_number', 'message', 'amount_due', 'member_ids'}; a skipped entry is {'member_id', 'reason'}.
+    if kind not in KINDS:
+        raise ValueError(f"Unknown campaign kind '{kind}'. Must be one of {', '.join(KINDS)}.")
+    template = template or TEMPLATES[kind]
+    fees = (
+        {g['id']: g['default_fee'] for g in db.get_groups()} if kind == 'monthly'
+        else {i['id']: i['fee'] for i in db.get_insurance_types()}
+    )
+    fee_column = 'group_id' if kind == 'monthly' else 'insurance_type_id'
+    recent = db.get_recently_reminded_member_ids(kind, datetime.now() - timedelta(days=cooldown_days)) if cooldown_days > 0 else set()
+    by_phone, skipped = {}, []
+    for member in members:
+        phone = normalize_phone(member.get('phone_number'), country_code)
+        if member['id'] in recent:
+            skipped.append({'member_id': member['id'], 'phone_number': phone, 'reason': f'reminded in the last {cooldown_days} days'})
+        elif phone is None:
+            skipped.append({'member_id': member['id'], 'reason': f"invalid phone number '{member.get('phone_number')}'"})
+        else:
+            by_phone.setdefault(phone, []).append(member)
+    messages = []
+    for phone, household in by_phone.items():
+        amount = sum(fees.get(m[fee_column]) or 0 for m in household)
+        messages.append({
+            'phone_number': phone,
+            'message': render(
+                template,
+                name=' & '.join(f"{m['first_name']} {m['last_name']}" for m in household),
+                first_name=' & '.join(m['first_name'] for m in household),
+                amount=amount,
+                month=calendar.month_name[month] if month else '',
+                year=year or '',
+            ),
+            'amount_due': amount,
+            'member_ids': [m['id'] for m in household],
+        })
+    return {'messages': messages, 'skipped': skipped}
+
+
+def _batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    items = iter(items)
+    while True:
+        batch = list(itertools.islice(items, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_campaign(db: GymDB, kind: str, month: Optional[int] = None, year: Optional[int] = None,
+                 template: Optional[str] = None, cooldown_days: int = 7, batch_size: int = 200,
+                 transport_factory: Optional[Callable] = None, workers: int = 1, dry_run: bool = False,
+                 run_id: Optional[str] = None) -> Dict:
+    # Plan the campaign, log it, queue its messages in batches of batch_size and send them. With dry_run
+    # nothing is written or sent. Returns counts plus the dispatcher's per-status totals.
+    today = date.today()
+    month = month or today.month
+    year = year or today.year
+    if kind == 'monthly':
+        members = db.get_unpaid_members_for_month(month, year)
+        period = year * 100 + month
+    else:
+        members = db.get_unpaid_insurance_members()
+        period = None
+    run_id = run_id or (f'campaign-monthly-{period}-{today:%Y%m%d}' if kind == 'monthly'
+                        else f'campaign-insurance-{today:%Y%m%d}')
+    # Members whose reminder in this run was sent, or is still queued for the dispatcher to resume, are
+    # done; a failed reminder is planned again and its job requeued
+    jobs = {job['phone_number']: job['status'] for job in db.get_reminder_jobs(run_id)}
+    done = {entry['member_id'] for entry in db.get_reminder_campaign_log(run_id)
+            if entry['status'] == 'queued' and jobs.get(entry['phone_number'], 'failed') != 'failed'}
+    members = [m for m in members if m['id'] not in done]
+    plan = plan_campaign(db, kind, members, template, cooldown_days, month if kind == 'monthly' else None, year)
+    summary = {
+        'run_id': run_id,
+        'targeted': len(members),
+        'messages': len(plan['messages']),
+        'skipped': len(plan['skipped']),
+        'status': None,
+    }
+    if dry_run:
+        for entry in plan['messages']:
+            print(f"{entry['phone_number']}: {entry['message']}")
+        return summary
+    db.add_reminder_campaign_log(run_id, kind, period, ({**s, 'status': 'skipped'} for s in plan['skipped']))
+    summary['messages'] = 0
+    for batch in _batches(plan['messages'], batch_size):
+        # A phone that already has a live job in this run (e.g. a sibling reminded earlier) gets no second
+        # one, so its members are logged as skipped rather than queued
+        queued = [e for e in batch if jobs.get(e['phone_number'], 'failed') == 'failed']
+        taken = [
+            {'member_id': member_id, 'phone_number': e['phone_number'], 'status': 'skipped',
+             'reason': 'a reminder to this phone number is already queued in this run'}
+            for e in batch if e not in queued for member_id in e['member_ids']
+        ]
+        # A member logged as queued is never planned again, so its job has to be committed with the log row
+        with db.transaction():
+            db.add_reminder_campaign_log(run_id, kind, period, [
+                {'member_id': member_id, 'phone_number': e['phone_number'], 'amount_due': e['amount_due'],
+                 'message': e['message'], 'status': 'queued'}
+                for e in queued for member_id in e['member_ids']
+            ] + taken)
+            db.enqueue_reminder_jobs(run_id, ((e['phone_number'], e['message']) for e in queued))
+        jobs.update((e['phone_number'], 'pending') for e in queued)
+        summary['messages'] += len(queued)
+        summary['skipped'] += len(taken)
+    dispatcher = ReminderDispatcher(db, transport_factory or (lambda worker: WhatsAppWebTransport()), workers=workers)
+    summary['status'] = dispatcher.run(run_id)
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Send WhatsApp reminders to members who have not paid')
+    parser.add_argument('kind', choices=KINDS)
+    parser.add_argument('--db', default='gym_payments.db', help='path to the SQLite database')
+    parser.add_argument('--month', type=int, help='month to collect (monthly campaigns; default: current month)')
+    parser.add_argument('--year', type=int, help='year of --month (default: current year)')
+    parser.add_argument('--template', help=f"message template; fields: {', '.join('{' + f + '}' for f in TEMPLATE_FIELDS)}")
+    parser.add_argument('--cooldown-days', type=int, default=7, help='skip members reminded this recently (0: never skip)')
+    parser.add_argument('--batch-size', type=int, default=200, help='messages queued per transaction')
+    parser.add_argument('--workers', type=int, default=1, help='parallel WhatsApp Web sessions')
+    parser.add_argument('--profile-dir', help='keep each WhatsApp Web session logged in, in a profile under this directory')
+    parser.add_argument('--dry-run', action='store_true', help='print the messages without logging or sending')
+    parser.add_argument('--run-id', help='run to start or resume (default: from the kind, month and today)')
+    args = parser.parse_args(argv)
+
+    def transport(worker):
+        return WhatsAppWebTransport(os.path.join(args.profile_dir, f'worker-{worker}') if args.profile_dir else None)
+
+    with GymDB(args.db) as db:
+        db.migrate()
+        summary = run_campaign(db, args.kind, args.month, args.year, args.template, args.cooldown_days,
+                               args.batch_size, transport, args.workers, args.dry_run, args.run_id)
+    print(f"Campaign {summary['run_id']}: {summary['targeted']} unpaid members, {summary['messages']} messages, "
+          f"{summary['skipped']} skipped")
+    if summary['status']:
+        print(f"Sent {summary['status']['sent']}, failed {summary['status']['failed']}, pending {summary['status']['pending']}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
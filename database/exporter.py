@@ -0,0 +1,114 @@
+import argparse
+import csv
+import itertools
+import time
+from typing import Dict, Iterator, List
+from database.models import GymDB
+
+# Streaming export of members and payments.
+#
+#   python -m database.exporter monthly_payments --output monthly_2024.csv --since 2024-01-01 --until 2024-12-31
+#   python -m database.exporter members --format parquet --output members.parquet
+#
+# Rows come from the GymDB iter_* generators and are written one batch at a time, so memory use does not
+# grow with the size of the table. The columnar format is Parquet (zstd-compressed, one row group per
+# batch) and needs pyarrow; CSV has no extra dependency.
+
+DATASETS = ('members', 'monthly_payments', 'insurance_payments', 'other_payments')
+FORMATS = ('csv', 'parquet')
+
+
+def iter_dataset(db: GymDB, dataset: str, since=None, until=None, batch_size: int = 5000) -> Iterator[Dict]:
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'. Must be one of {', '.join(DATASETS)}.")
+    if dataset == 'members':
+        return db.iter_members(batch_size=batch_size)
+    return getattr(db, f'iter_{dataset}')(since=since, until=until, batch_size=batch_size)
+
+
+def _batches(rows: Iterator[Dict], batch_size: int) -> Iterator[List[Dict]]:
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_csv(rows: Iterator[Dict], path: str, batch_size: int) -> int:
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = None
+        for batch in _batches(rows, batch_size):
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(batch[0].keys()))
+                writer.writeheader()
+            writer.writerows(batch)
+            count += len(batch)
+    return count
+
+
+def _arrow_type(pa, column: str):
+    # SQLite columns are dynamically typed (an amount may be stored as 120 or 99.99), so each
+    # column gets a fixed Arrow type from its name rather than from the values of the first batch
+    if column in ('id', 'period') or column.endswith(('_id', '_count')):
+        return pa.int64()
+    if column in ('amount', 'fee', 'default_fee') or column.endswith(('_total', '_amount')):
+        return pa.float64()
+    return pa.string()
+
+
+def write_parquet(rows: Iterator[Dict], path: str, batch_size: int) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet export requires pyarrow (pip install pyarrow).")
+    count = 0
+    writer = None
+    schema = None
+    try:
+        for batch in _batches(rows, batch_size):
+            if writer is None:
+                schema = pa.schema([(c, _arrow_type(pa, c)) for c in batch[0].keys()])
+                writer = pq.ParquetWriter(path, schema, compression='zstd')
+            columns = {
+                c: [None if row[c] is None else (str(row[c]) if t == pa.string() else row[c]) for row in batch]
+                for c, t in zip(schema.names, schema.types)
+            }
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            count += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+def export(db: GymDB, dataset: str, path: str, fmt: str = 'csv', since=None, until=None, batch_size: int = 5000) -> int:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Must be one of {', '.join(FORMATS)}.")
+    rows = iter_dataset(db, dataset, since, until, batch_size)
+    writer = write_csv if fmt == 'csv' else write_parquet
+    return writer(rows, path, batch_size)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Export members or payments to CSV or Parquet')
+    parser.add_argument('dataset', choices=DATASETS)
+    parser.add_argument('--output', required=True, help='file to write')
+    parser.add_argument('--format', choices=FORMATS, help='output format (default: from the file extension, else csv)')
+    parser.add_argument('--db', default='gym_payments.db', help='path to the SQLite database')
+    parser.add_argument('--since', help='first payment_date to include (YYYY-MM-DD, payments only)')
+    parser.add_argument('--until', help='last payment_date to include (YYYY-MM-DD, payments only)')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows read and written at a time')
+    args = parser.parse_args(argv)
+    fmt = args.format or ('parquet' if args.output.lower().endswith('.parquet') else 'csv')
+    started = time.perf_counter()
+    with GymDB(args.db) as db:
+        count = export(db, args.dataset, args.output, fmt, args.since, args.until, args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"Exported {count} {args.dataset} rows to {args.output} in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
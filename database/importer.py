@@ -0,0 +1,248 @@
+import argparse
+import csv
+import itertools
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+from database.models import GymDB
+
+# Streaming importer for members and payment ledgers exported from spreadsheets.
+#
+#   python -m database.importer members.csv
+#   python -m database.importer ledger.xlsx --kind monthly --batch-size 2000
+#
+# Rows are read one at a time and written in batches through the GymDB bulk_add_* API. Each batch is
+# committed together with the number of rows done (a checkpoint in the import_checkpoints table, named
+# after the input file), so a failed run picks up where it stopped when started again and never inserts
+# a batch twice (use --restart to ignore the checkpoint).
+# Column names are the database column names; payment rows may identify the member by cin instead
+# of member_id.
+
+KINDS = ('members', 'monthly', 'insurance', 'other')
+
+SEX_LABELS = {
+    'm': 'M', 'male': 'M', 'h': 'M', 'homme': 'M', 'masculin': 'M', 'ذكر': 'M',
+    'f': 'F', 'female': 'F', 'femme': 'F', 'féminin': 'F', 'feminin': 'F', 'أنثى': 'F', 'انثى': 'F',
+}
+
+RELATIONSHIP_LABELS = {
+    'father': 'father', 'père': 'father', 'pere': 'father', 'أب': 'father', 'الأب': 'father',
+    'mother': 'mother', 'mère': 'mother', 'mere': 'mother', 'أم': 'mother', 'الأم': 'mother',
+    'brother': 'brother', 'frère': 'brother', 'frere': 'brother', 'أخ': 'brother', 'الأخ': 'brother',
+    'sister': 'sister', 'sœur': 'sister', 'soeur': 'sister', 'أخت': 'sister', 'الأخت': 'sister',
+    'friend': 'friend', 'ami': 'friend', 'amie': 'friend', 'صديق': 'friend', 'صديقة': 'friend',
+    'other': 'other', 'autre': 'other', 'آخر': 'other', 'اخر': 'other',
+}
+
+# Extra spellings of the seeded group / insurance type names; the names stored in the database always match
+GROUP_LABELS = {
+    'crossfit': 'Cross-Fit', 'cross fit': 'Cross-Fit', 'كروسفيت': 'Cross-Fit', 'كروس فيت': 'Cross-Fit',
+    'wushu-sanda enfants': 'Wushu-Sanda Children', 'wushu enfants': 'Wushu-Sanda Children',
+    'ووشو ساندا أطفال': 'Wushu-Sanda Children', 'ووشو أطفال': 'Wushu-Sanda Children',
+    'wushu-sanda adultes': 'Wushu-Sanda Adults', 'wushu adultes': 'Wushu-Sanda Adults',
+    'ووشو ساندا كبار': 'Wushu-Sanda Adults', 'ووشو كبار': 'Wushu-Sanda Adults',
+}
+
+INSURANCE_LABELS = {
+    'full contact': 'Full-Contact', 'فول كونتاكت': 'Full-Contact',
+    'wushu': 'Wushu-Sanda', 'ووشو': 'Wushu-Sanda', 'ووشو ساندا': 'Wushu-Sanda',
+    'full-contact et wushu': 'Full-contact & Wushu', 'full contact & wushu': 'Full-contact & Wushu',
+    'privé': 'private', 'prive': 'private', 'خاص': 'private',
+}
+
+# CIN placeholders used when the real one is unknown; these are never treated as duplicates
+CIN_PLACEHOLDERS = ('', '-')
+
+
+def read_rows(path: str) -> Iterator[Dict[str, str]]:
+    # Yield one dict per data row without loading the file into memory
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise SystemExit("Reading .xlsx files requires openpyxl (pip install openpyxl).")
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(h).strip() if h is not None else '' for h in next(rows, ())]
+            for values in rows:
+                yield {h: ('' if v is None else v) for h, v in zip(header, values) if h}
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                yield {(k or '').strip(): v for k, v in row.items()}
+
+
+def _text(value) -> str:
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        # Dates and datetimes coming from spreadsheets
+        return value.isoformat()[:10]
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _label_map(rows: List[Dict], aliases: Dict[str, str]) -> Dict[str, int]:
+    # label (lower case) -> id, from the names in the database plus the known alternative spellings
+    by_name = {r['name'].lower(): r['id'] for r in rows}
+    labels = dict(by_name)
+    for alias, name in aliases.items():
+        if name.lower() in by_name:
+            labels.setdefault(alias.lower(), by_name[name.lower()])
+    labels.update({str(r['id']): r['id'] for r in rows})
+    return labels
+
+
+class RowMapper:
+    # Turns raw spreadsheet rows into the dicts the bulk_add_* methods expect; raises ValueError on bad values
+    def __init__(self, db: GymDB):
+        self.groups = _label_map(db.get_groups(), GROUP_LABELS)
+        self.insurance_types = _label_map(db.get_insurance_types(), INSURANCE_LABELS)
+
+    @staticmethod
+    def _lookup(labels: Dict, value, field: str):
+        text = _text(value)
+        if text.lower() not in labels:
+            raise ValueError(f"Unknown {field} '{text}'.")
+        return labels[text.lower()]
+
+    def member(self, row: Dict) -> Dict:
+        relationship = _text(row.get('emergency_contact_relationship'))
+        status = _text(row.get('status')).lower()
+        return {
+            'first_name': _text(row.get('first_name')),
+            'last_name': _text(row.get('last_name')),
+            'cin': _text(row.get('cin')),
+            'birth_date': _text(row.get('birth_date')),
+            'sex': self._lookup(SEX_LABELS, row.get('sex'), 'sex'),
+            'phone_number': _text(row.get('phone_number')),
+            'address': _text(row.get('address')) or None,
+            'enrollment_date': _text(row.get('enrollment_date')),
+            'group_id': self._lookup(self.groups, row.get('group_id', row.get('group')), 'group'),
+            'insurance_type_id': self._lookup(
+                self.insurance_types, row.get('insurance_type_id', row.get('insurance_type')), 'insurance type'
+            ),
+            'emergency_contact_name': _text(row.get('emergency_contact_name')) or None,
+            'emergency_contact_phone': _text(row.get('emergency_contact_phone')) or None,
+            'emergency_contact_relationship': (
+                self._lookup(RELATIONSHIP_LABELS, relationship, 'emergency contact relationship') if relationship else None
+            ),
+            'status': {'actif': 'active', 'archivé': 'archived', 'archive': 'archived'}.get(status, status) or 'active',
+        }
+
+    @staticmethod
+    def payment(kind: str, row: Dict) -> Dict:
+        payment = {
+            'member_id': int(_text(row['member_id'])) if _text(row.get('member_id')) else None,
+            'cin': _text(row.get('cin')),
+            'amount': float(_text(row['amount'])) if _text(row.get('amount')) else None,
+            'payment_date': _text(row.get('payment_date')) or None,
+            'comment': _text(row.get('comment')) or None,
+        }
+        if payment['member_id'] is None and payment['cin'] in CIN_PLACEHOLDERS:
+            raise ValueError("Row has neither member_id nor cin.")
+        if kind == 'monthly':
+            payment['month'] = _text(row.get('month')) or None
+        elif kind == 'other':
+            payment['transaction_type'] = _text(row.get('transaction_type'))
+        return payment
+
+
+def import_file(db: GymDB, path: str, kind: str = 'members', batch_size: int = 1000,
+                checkpoint: Optional[str] = None, restart: bool = False) -> Dict:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind '{kind}'. Must be one of {', '.join(KINDS)}.")
+    checkpoint = checkpoint or os.path.abspath(path)
+    state = None if restart else db.get_import_checkpoint(checkpoint)
+    state = state or {'rows_done': 0, 'inserted': 0, 'skipped': 0, 'errors': 0}
+    if state['rows_done']:
+        print(f"Resuming after row {state['rows_done']} (checkpoint '{checkpoint}')")
+    mapper = RowMapper(db)
+    bulk_add = {
+        'members': db.bulk_add_members,
+        'monthly': db.bulk_add_monthly_payments,
+        'insurance': db.bulk_add_insurance_payments,
+        'other': db.bulk_add_other_payments,
+    }[kind]
+    seen_cins = set()
+    started = time.perf_counter()
+    rows_this_run = 0
+    # Data rows are numbered from 1; the spreadsheet line is row number + 1 because of the header
+    rows = enumerate(itertools.islice(read_rows(path), state['rows_done'], None), start=state['rows_done'] + 1)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        records, row_numbers = [], []
+        for row_number, raw in batch:
+            try:
+                record = mapper.member(raw) if kind == 'members' else mapper.payment(kind, raw)
+            except (ValueError, KeyError) as e:
+                print(f"Row {row_number}: {e}")
+                state['errors'] += 1
+                continue
+            records.append(record)
+            row_numbers.append(row_number)
+        cins = [r['cin'] for r in records if r.get('cin') not in CIN_PLACEHOLDERS]
+        known_cins = db.get_member_ids_by_cin(cins) if cins else {}
+        kept, kept_numbers = [], []
+        for record, row_number in zip(records, row_numbers):
+            cin = record.get('cin')
+            if kind == 'members':
+                # Deduplicate on cin, against the database and earlier rows of this file
+                if cin not in CIN_PLACEHOLDERS and (cin in known_cins or cin in seen_cins):
+                    state['skipped'] += 1
+                    continue
+                seen_cins.add(cin)
+            else:
+                cin = record.pop('cin')
+                if record['member_id'] is None:
+                    if cin not in known_cins:
+                        print(f"Row {row_number}: No member with cin '{cin}'.")
+                        state['errors'] += 1
+                        continue
+                    record['member_id'] = known_cins[cin]
+            kept.append(record)
+            kept_numbers.append(row_number)
+        # The batch and the checkpoint after it are committed together
+        with db.transaction():
+            report = bulk_add(kept, chunk_size=len(kept)) if kept else {'inserted': 0, 'errors': []}
+            done = dict(state, rows_done=batch[-1][0], inserted=state['inserted'] + report['inserted'],
+                        errors=state['errors'] + len(report['errors']))
+            db.save_import_checkpoint(checkpoint, done)
+        state = done
+        for error in report['errors']:
+            print(f"Row {kept_numbers[error['index']]}: {error['error']}")
+        rows_this_run += len(batch)
+        elapsed = time.perf_counter() - started
+        print(f"{state['rows_done']} rows read, {state['inserted']} inserted, {state['skipped']} duplicates skipped, "
+              f"{state['errors']} errors ({rows_this_run / elapsed if elapsed > 0 else 0:.0f} rows/s)")
+    # Finished: a later run of the same file starts from the beginning again
+    db.delete_import_checkpoint(checkpoint)
+    state['seconds'] = time.perf_counter() - started
+    return state
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Import members or payments from a CSV/XLSX file')
+    parser.add_argument('path', help='CSV or XLSX file, first row is the header')
+    parser.add_argument('--kind', choices=KINDS, default='members', help='what the file contains (default: members)')
+    parser.add_argument('--db', default='gym_payments.db', help='path to the SQLite database')
+    parser.add_argument('--batch-size', type=int, default=1000, help='rows written per transaction')
+    parser.add_argument('--checkpoint', help="name the progress is saved under (default: the file's absolute path)")
+    parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint and start over')
+    args = parser.parse_args(argv)
+    with GymDB(args.db) as db:
+        db.migrate()
+        state = import_file(db, args.path, args.kind, args.batch_size, args.checkpoint, args.restart)
+    print(f"Done: {state['inserted']} inserted, {state['skipped']} duplicates skipped, "
+          f"{state['errors']} errors in {state['seconds']:.1f}s")
+    return 0 if state['errors'] == 0 else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+import argparse
+from database.models import CHECKPOINT_MODES, GymDB
+
+# Database maintenance commands, e.g.:
+#   python -m database.maintenance --db gym_payments.db rebuild-summaries
+#   python -m database.maintenance rebuild-summaries --verify-only
+#   python -m database.maintenance checkpoint --mode truncate
+
+
+def rebuild_summaries(db: GymDB, verify_only: bool) -> int:
+    mismatches = db.rebuild_payment_summaries(verify_only=verify_only)
+    for table, count in mismatches.items():
+        if count == 0:
+            print(f"{table}: OK")
+        elif verify_only:
+            print(f"{table}: {count} row(s) differ from the payment tables")
+        else:
+            print(f"{table}: {count} row(s) differed, table rebuilt")
+    # Non-zero exit status when a verification found drift
+    return 1 if verify_only and any(mismatches.values()) else 0
+
+
+def checkpoint(db: GymDB, mode: str) -> int:
+    result = db.checkpoint(mode)
+    if result['log'] < 0:
+        print("The database is not in WAL mode; nothing to checkpoint.")
+        return 0
+    print(f"{result['checkpointed']} of {result['log']} WAL page(s) checkpointed"
+          f"{' (blocked by another connection, run again later)' if result['busy'] else ''}")
+    return 1 if result['busy'] else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Gym database maintenance')
+    parser.add_argument('--db', default='gym_payments.db', help='path to the SQLite database')
+    commands = parser.add_subparsers(dest='command', required=True)
+    summaries = commands.add_parser('rebuild-summaries', help='verify and rebuild the payment rollup tables')
+    summaries.add_argument('--verify-only', action='store_true', help='only report differences, do not rebuild')
+    wal = commands.add_parser('checkpoint', help='copy the write-ahead log back into the database file')
+    wal.add_argument('--mode', choices=CHECKPOINT_MODES, default='truncate',
+                     help="'truncate' (default) also empties the -wal file; 'passive' never waits for other connections")
+    args = parser.parse_args(argv)
+    with GymDB(args.db) as db:
+        db.migrate()
+        if args.command == 'rebuild-summaries':
+            return rebuild_summaries(db, args.verify_only)
+        if args.command == 'checkpoint':
+            return checkpoint(db, args.mode)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
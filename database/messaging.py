@@ -0,0 +1,242 @@
+import hashlib
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import quote
+
+# WhatsApp reminders. Kept apart from database.models, and selenium is imported inside the
+# functions, so loading the database layer (GUI, scripts, tests) never pays for or requires selenium.
+#
+# ReminderDispatcher sends the reminders queued in the reminder_jobs table through a pool of worker
+# sessions. Every job records its status, attempts and last error, so a run that is interrupted
+# (closed window, crash, lost connection) resumes where it stopped when it is run again with the same
+# run_id. Sessions come from a transport factory: WhatsAppWebTransport drives WhatsApp Web in Chrome,
+# FakeTransport keeps everything in memory for tests.
+
+WHATSAPP_WEB_URL = 'https://web.whatsapp.com/'
+POPUP_BUTTON_XPATH = '//button[.//span[text()="Continue" or text()="Continuer" or text()="OK" or text()="Ok" or text()="Got it" or text()="D\'accord"]]'
+SEARCH_BOX_XPATH = '//div[@contenteditable="true"][@data-tab="3"]'
+MESSAGE_BOX_XPATH = '//footer//div[@contenteditable="true" and @data-tab]'
+INVALID_NUMBER_XPATH = '//div[@role="dialog"]//*[contains(text(), "invalid") or contains(text(), "valide")]'
+
+
+class SendError(Exception):
+    # A send that failed but may succeed if retried (timeout, chat not loaded, ...)
+    pass
+
+
+class PermanentSendError(SendError):
+    # A send that will never succeed (e.g. the number is not on WhatsApp); it is not retried
+    pass
+
+
+class ReminderTransport:
+    # One messaging session, used by a single dispatcher worker: open() once before the first send,
+    # close() once at the end. send() raises SendError (or any other exception) when a message fails.
+    def open(self):
+        pass
+
+    def send(self, phone_number: str, message: str):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class WhatsAppWebTransport(ReminderTransport):
+    # A Chrome window on WhatsApp Web. Every step waits for the page state it needs instead of sleeping
+    # for a fixed time. Each session is a linked device, so parallel workers need their own profile_dir
+    # (WhatsApp links at most four devices); a kept profile also avoids scanning the QR code every run.
+    def __init__(self, profile_dir: Optional[str] = None, login_timeout: float = 120, chat_timeout: float = 30):
+        self.profile_dir = profile_dir
+        self.login_timeout = login_timeout
+        self.chat_timeout = chat_timeout
+        self.driver = None
+
+    def open(self):
+        # selenium takes a few hundred ms to import, so it is only loaded once reminders are actually sent
+        from selenium import webdriver
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        options = webdriver.ChromeOptions()
+        if self.profile_dir:
+            options.add_argument(f'--user-data-dir={os.path.abspath(self.profile_dir)}')
+        self.driver = webdriver.Chrome(options=options)
+        self.driver.get(WHATSAPP_WEB_URL)
+        try:
+            # Wait for either the popup or the search bar
+            WebDriverWait(self.driver, self.login_timeout).until(
+                lambda d: d.find_elements(By.XPATH, POPUP_BUTTON_XPATH) or d.find_elements(By.XPATH, SEARCH_BOX_XPATH)
+            )
+            popups = self.driver.find_elements(By.XPATH, POPUP_BUTTON_XPATH)
+            if popups:
+                popups[0].click()
+                WebDriverWait(self.driver, self.chat_timeout).until(
+                    EC.presence_of_element_located((By.XPATH, SEARCH_BOX_XPATH))
+                )
+        except TimeoutException:
+            self.close()
+            raise SendError("Login to WhatsApp Web failed or timed out.")
+        print("Logged in to WhatsApp Web.")
+
+    def send(self, phone_number: str, message: str):
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.keys import Keys
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        self.driver.get(f'{WHATSAPP_WEB_URL}send?phone={quote(phone_number.lstrip("+"))}')
+        wait = WebDriverWait(self.driver, self.chat_timeout)
+        try:
+            # The chat opens, or WhatsApp reports that the number has no account
+            wait.until(lambda d: d.find_elements(By.XPATH, MESSAGE_BOX_XPATH) or d.find_elements(By.XPATH, INVALID_NUMBER_XPATH))
+            if self.driver.find_elements(By.XPATH, INVALID_NUMBER_XPATH):
+                raise PermanentSendError(f"{phone_number} is not on WhatsApp.")
+            message_box = wait.until(EC.element_to_be_clickable((By.XPATH, MESSAGE_BOX_XPATH)))
+            message_box.click()
+            message_box.send_keys(Keys.CONTROL, 'a')
+            message_box.send_keys(Keys.DELETE)
+            # A plain newline would send the message early
+            for index, line in enumerate(message.split('\n')):
+                if index:
+                    message_box.send_keys(Keys.SHIFT, Keys.ENTER)
+                message_box.send_keys(line)
+            message_box.send_keys(Keys.ENTER)
+            # The composer is emptied once WhatsApp has taken the message
+            wait.until(lambda d: not d.find_element(By.XPATH, MESSAGE_BOX_XPATH).text.strip())
+        except TimeoutException:
+            raise SendError(f"Timed out sending to {phone_number}.")
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
+
+
+class FakeTransport(ReminderTransport):
+    # In-memory transport for tests and dry runs; one instance can be shared by every worker.
+    # failures maps a phone number to how many sends to it fail before one succeeds, or to
+    # 'permanent' for a number that is never reachable.
+    def __init__(self, failures: Optional[Dict] = None):
+        self.failures = dict(failures or {})
+        self.sent = []
+        self.attempts = {}
+        self.sessions = 0
+        self.lock = threading.Lock()
+
+    def open(self):
+        with self.lock:
+            self.sessions += 1
+
+    def send(self, phone_number: str, message: str):
+        with self.lock:
+            self.attempts[phone_number] = self.attempts.get(phone_number, 0) + 1
+            failures = self.failures.get(phone_number, 0)
+            if failures == 'permanent':
+                raise PermanentSendError(f"{phone_number} is not on WhatsApp.")
+            if self.attempts[phone_number] <= failures:
+                raise SendError(f"Timed out sending to {phone_number}.")
+            self.sent.append((phone_number, message))
+
+
+class ReminderDispatcher:
+    # Sends the reminder_jobs of a run with `workers` parallel sessions. A failed send is retried up to
+    # max_attempts times in all, waiting backoff, 2 * backoff, 4 * backoff ... seconds (at most max_backoff).
+    def __init__(self, db, transport_factory: Callable[[int], ReminderTransport], workers: int = 1,
+                 max_attempts: int = 3, backoff: float = 30.0, max_backoff: float = 600.0):
+        self.db = db
+        self.transport_factory = transport_factory
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._stop = threading.Event()
+
+    def enqueue(self, run_id: str, phone_numbers: Iterable[str], message: str) -> int:
+        return self.db.enqueue_reminder_jobs(run_id, ((phone_number, message) for phone_number in phone_numbers))
+
+    def run(self, run_id: str) -> Dict[str, int]:
+        # Send every pending job of the run and return the number of jobs in each status
+        self._stop.clear()
+        self.db.reset_interrupted_reminder_jobs(run_id)
+        threads = [
+            threading.Thread(target=self._work, args=(run_id, worker), name=f'reminder-worker-{worker}')
+            for worker in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            # Let the sends in progress finish; the rest stays pending for the next run
+            self.stop()
+            for thread in threads:
+                thread.join()
+            raise
+        return self.db.get_reminder_run_status(run_id)
+
+    def stop(self):
+        self._stop.set()
+
+    def _work(self, run_id: str, worker: int):
+        transport = self.transport_factory(worker)
+        try:
+            transport.open()
+        except Exception as e:
+            print(f"Reminder worker {worker} could not start: {e}")
+            return
+        try:
+            while not self._stop.is_set():
+                job = self.db.claim_reminder_job(run_id)
+                if job is not None:
+                    self._send(transport, job)
+                    continue
+                # Nothing due: wait for the earliest retry, or stop once nothing is pending
+                due = self.db.get_next_reminder_retry(run_id)
+                if due is None:
+                    break
+                self._stop.wait(min(max((due - datetime.now()).total_seconds(), 0.01), self.max_backoff))
+        finally:
+            transport.close()
+
+    def _send(self, transport: ReminderTransport, job: Dict):
+        try:
+            transport.send(job['phone_number'], job['message'])
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            if isinstance(e, PermanentSendError) or job['attempts'] >= self.max_attempts:
+                self.db.finish_reminder_job(job['id'], error)
+                print(f"Failed to send to {job['phone_number']}: {error}")
+            else:
+                delay = min(self.backoff * 2 ** (job['attempts'] - 1), self.max_backoff)
+                self.db.finish_reminder_job(job['id'], error, retry_at=datetime.now() + timedelta(seconds=delay))
+                print(f"Failed to send to {job['phone_number']} (attempt {job['attempts']}), retrying in {delay:.0f}s: {error}")
+            return
+        self.db.finish_reminder_job(job['id'])
+        print(f"Message sent to {job['phone_number']}")
+
+
+def send_whatsapp_reminders(phone_numbers: list, message: str = "Hi member, this is a reminder to pay your gym fees.",
+                            workers: int = 1, run_id: Optional[str] = None, db_path: str = 'gym_payments.db',
+                            profile_dir: Optional[str] = None) -> Dict[str, int]:
+    # Queue the reminders and send them through WhatsApp Web. Without a run_id the same numbers and
+    # message on the same day form the same run, so calling this again resumes an interrupted run.
+    from database.models import GymDB
+    if run_id is None:
+        digest = hashlib.sha1('\n'.join([message, *sorted(phone_numbers)]).encode('utf-8')).hexdigest()[:8]
+        run_id = f"reminders-{date.today():%Y%m%d}-{digest}"
+
+    def transport(worker):
+        return WhatsAppWebTransport(os.path.join(profile_dir, f'worker-{worker}') if profile_dir else None)
+
+    with GymDB(db_path) as db:
+        db.migrate()
+        dispatcher = ReminderDispatcher(db, transport, workers=workers)
+        dispatcher.enqueue(run_id, phone_numbers, message)
+        status = dispatcher.run(run_id)
+    print(f"Reminder run {run_id}: {status['sent']} sent, {status['failed']} failed, {status['pending']} pending")
+    return status
@@ -0,0 +1,443 @@
+import sqlite3
+import sys
+
+# Schema migrations, applied in order. The position of a migration in MIGRATIONS (starting at 1)
+# is the schema version it produces; PRAGMA user_version stores the last version applied.
+# Migrations never drop recorded data (only derived rollups) so existing databases can be upgraded in place.
+
+
+def _create_base_schema(cursor):
+    # Same tables init_db creates, without dropping anything that already exists
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS groups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            default_fee DECIMAL(10,2) NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS insurance_types (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            fee DECIMAL(10,2) NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name VARCHAR(100) NOT NULL,
+            last_name VARCHAR(100) NOT NULL,
+            cin VARCHAR(20) NOT NULL,
+            birth_date DATE NOT NULL,
+            sex TEXT CHECK(sex IN ('M', 'F')) NOT NULL,
+            phone_number VARCHAR(20) NOT NULL,
+            address VARCHAR(255),
+            enrollment_date DATE NOT NULL,
+            group_id INTEGER NOT NULL,
+            insurance_type_id INTEGER NOT NULL,
+            emergency_contact_name VARCHAR(100),
+            emergency_contact_phone VARCHAR(20),
+            emergency_contact_relationship TEXT CHECK(emergency_contact_relationship IN ('father', 'mother', 'brother', 'sister', 'friend', 'other')),
+            status TEXT CHECK(status IN ('active', 'archived')) DEFAULT 'active',
+            recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (group_id) REFERENCES groups(id),
+            FOREIGN KEY (insurance_type_id) REFERENCES insurance_types(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS monthly_payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER NOT NULL,
+            amount DECIMAL(10,2) NOT NULL,
+            payment_date DATE NOT NULL,
+            month TEXT NOT NULL,
+            comment TEXT,
+            recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (member_id) REFERENCES members(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS insurance_payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER NOT NULL,
+            amount DECIMAL(10,2) NOT NULL,
+            payment_date DATE NOT NULL,
+            comment TEXT,
+            recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (member_id) REFERENCES members(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS other_payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            member_id INTEGER NOT NULL,
+            amount DECIMAL(10,2) NOT NULL,
+            payment_date DATE NOT NULL,
+            transaction_type VARCHAR(50) NOT NULL,
+            comment TEXT,
+            recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (member_id) REFERENCES members(id)
+        )
+    ''')
+
+
+def _add_lookup_indexes(cursor):
+    # Statistics and unpaid queries filter members by status and enrollment date
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_members_status_enrollment ON members(status, enrollment_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_members_enrollment_date ON members(enrollment_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_members_group ON members(group_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_members_insurance_type ON members(insurance_type_id)')
+    # Covering indexes: "did member X pay for month M" and "who paid for month M" never touch the table
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_monthly_payments_member_month ON monthly_payments(member_id, month)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_monthly_payments_month_member ON monthly_payments(month, member_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_insurance_payments_member ON insurance_payments(member_id, payment_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_other_payments_member ON other_payments(member_id, payment_date)')
+
+
+def _monthly_rollup_add(row, key='month', member_totals=True):
+    # Trigger statements that count monthly payment `row` (NEW or OLD) into the rollup tables keyed by `key`
+    return f'''
+        INSERT OR IGNORE INTO member_{key}_payments (member_id, {key}) VALUES ({row}.member_id, {row}.{key});
+        UPDATE member_{key}_payments SET payment_count = payment_count + 1, total_amount = total_amount + {row}.amount
+            WHERE member_id = {row}.member_id AND {key} = {row}.{key};
+        INSERT OR IGNORE INTO {key}_payment_summary ({key}) VALUES ({row}.{key});
+        UPDATE {key}_payment_summary SET
+            payment_count = payment_count + 1,
+            total_amount = total_amount + {row}.amount,
+            paid_members = paid_members + (
+                SELECT payment_count = 1 FROM member_{key}_payments WHERE member_id = {row}.member_id AND {key} = {row}.{key}
+            )
+            WHERE {key} = {row}.{key};
+        {_member_rollup('monthly', row, '+') if member_totals else ''}
+    '''
+
+
+def _monthly_rollup_remove(row, key='month', member_totals=True):
+    # Trigger statements that take monthly payment `row` back out of the rollup tables keyed by `key`
+    return f'''
+        UPDATE member_{key}_payments SET payment_count = payment_count - 1, total_amount = total_amount - {row}.amount
+            WHERE member_id = {row}.member_id AND {key} = {row}.{key};
+        UPDATE {key}_payment_summary SET
+            payment_count = payment_count - 1,
+            total_amount = total_amount - {row}.amount,
+            paid_members = paid_members - (
+                SELECT payment_count = 0 FROM member_{key}_payments WHERE member_id = {row}.member_id AND {key} = {row}.{key}
+            )
+            WHERE {key} = {row}.{key};
+        DELETE FROM member_{key}_payments WHERE member_id = {row}.member_id AND {key} = {row}.{key} AND payment_count = 0;
+        DELETE FROM {key}_payment_summary WHERE {key} = {row}.{key} AND payment_count = 0;
+        {_member_rollup('monthly', row, '-') if member_totals else ''}
+    '''
+
+
+def _drop_empty_member_summary(row):
+    return f'''
+        DELETE FROM member_payment_summary WHERE member_id = {row}.member_id
+            AND monthly_count = 0 AND insurance_count = 0 AND other_count = 0;
+    '''
+
+
+def _member_rollup(kind, row, sign):
+    # Trigger statements that add (sign '+') or remove (sign '-') an insurance/other payment for its member
+    return f'''
+        INSERT OR IGNORE INTO member_payment_summary (member_id) VALUES ({row}.member_id);
+        UPDATE member_payment_summary SET
+            {kind}_count = {kind}_count {sign} 1,
+            {kind}_total = {kind}_total {sign} {row}.amount
+            WHERE member_id = {row}.member_id;
+        {_drop_empty_member_summary(row) if sign == '-' else ''}
+    '''
+
+
+def _add_payment_rollups(cursor):
+    # Rollup tables kept current by triggers, so dashboards and reminders read
+    # pre-aggregated rows instead of scanning the whole payment history
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS member_month_payments (
+            member_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            payment_count INTEGER NOT NULL DEFAULT 0,
+            total_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (member_id, month)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_member_month_payments_month ON member_month_payments(month, member_id)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS month_payment_summary (
+            month TEXT PRIMARY KEY,
+            paid_members INTEGER NOT NULL DEFAULT 0,
+            payment_count INTEGER NOT NULL DEFAULT 0,
+            total_amount DECIMAL(10,2) NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS member_payment_summary (
+            member_id INTEGER PRIMARY KEY,
+            monthly_count INTEGER NOT NULL DEFAULT 0,
+            monthly_total DECIMAL(10,2) NOT NULL DEFAULT 0,
+            insurance_count INTEGER NOT NULL DEFAULT 0,
+            insurance_total DECIMAL(10,2) NOT NULL DEFAULT 0,
+            other_count INTEGER NOT NULL DEFAULT 0,
+            other_total DECIMAL(10,2) NOT NULL DEFAULT 0
+        )
+    ''')
+    triggers = [
+        ('trg_monthly_payments_rollup_insert', 'AFTER INSERT ON monthly_payments', _monthly_rollup_add('NEW')),
+        ('trg_monthly_payments_rollup_delete', 'AFTER DELETE ON monthly_payments', _monthly_rollup_remove('OLD')),
+        ('trg_monthly_payments_rollup_update', 'AFTER UPDATE OF member_id, month, amount ON monthly_payments',
+         _monthly_rollup_remove('OLD') + _monthly_rollup_add('NEW')),
+    ]
+    for kind in ('insurance', 'other'):
+        triggers += [
+            (f'trg_{kind}_payments_rollup_insert', f'AFTER INSERT ON {kind}_payments', _member_rollup(kind, 'NEW', '+')),
+            (f'trg_{kind}_payments_rollup_delete', f'AFTER DELETE ON {kind}_payments', _member_rollup(kind, 'OLD', '-')),
+            (f'trg_{kind}_payments_rollup_update', f'AFTER UPDATE OF member_id, amount ON {kind}_payments',
+             _member_rollup(kind, 'OLD', '-') + _member_rollup(kind, 'NEW', '+')),
+        ]
+    for name, event, body in triggers:
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END')
+    # Backfill from the payments recorded before the rollups existed
+    cursor.execute('DELETE FROM member_month_payments')
+    cursor.execute('DELETE FROM month_payment_summary')
+    cursor.execute('DELETE FROM member_payment_summary')
+    cursor.execute('''
+        INSERT INTO member_month_payments (member_id, month, payment_count, total_amount)
+        SELECT member_id, month, COUNT(*), SUM(amount) FROM monthly_payments GROUP BY member_id, month
+    ''')
+    cursor.execute('''
+        INSERT INTO month_payment_summary (month, paid_members, payment_count, total_amount)
+        SELECT month, COUNT(*), SUM(payment_count), SUM(total_amount) FROM member_month_payments GROUP BY month
+    ''')
+    cursor.execute('''
+        INSERT INTO member_payment_summary
+            (member_id, monthly_count, monthly_total, insurance_count, insurance_total, other_count, other_total)
+        SELECT member_id, SUM(kind = 'monthly'), SUM(CASE WHEN kind = 'monthly' THEN amount ELSE 0 END),
+               SUM(kind = 'insurance'), SUM(CASE WHEN kind = 'insurance' THEN amount ELSE 0 END),
+               SUM(kind = 'other'), SUM(CASE WHEN kind = 'other' THEN amount ELSE 0 END)
+        FROM (
+            SELECT member_id, amount, 'monthly' AS kind FROM monthly_payments
+            UNION ALL SELECT member_id, amount, 'insurance' FROM insurance_payments
+            UNION ALL SELECT member_id, amount, 'other' FROM other_payments
+        )
+        GROUP BY member_id
+    ''')
+
+
+def _add_transactions_ledger(cursor):
+    # One ledger over the three payment tables. Ordered by (payment_date, kind, id), SQLite merges the
+    # three index-ordered branches instead of sorting the whole history.
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_monthly_payments_date ON monthly_payments(payment_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_insurance_payments_date ON insurance_payments(payment_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_other_payments_date ON other_payments(payment_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_monthly_payments_member_date ON monthly_payments(member_id, payment_date)')
+    cursor.execute('''
+        CREATE VIEW IF NOT EXISTS transactions AS
+        SELECT 'monthly' AS kind, id, member_id, payment_date, amount, 'monthly' AS payment_type, comment, recorded_at
+        FROM monthly_payments
+        UNION ALL
+        SELECT 'insurance' AS kind, id, member_id, payment_date, amount, 'insurance' AS payment_type, comment, recorded_at
+        FROM insurance_payments
+        UNION ALL
+        SELECT 'other' AS kind, id, member_id, payment_date, amount, COALESCE(transaction_type, 'other') AS payment_type,
+               comment, recorded_at
+        FROM other_payments
+    ''')
+
+
+# Spelled out rather than taken from calendar.month_name, which follows the locale
+MONTH_NAMES = ('January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October',
+               'November', 'December')
+
+
+def _period_expression(row=''):
+    # SQL for the YYYYMM period a monthly payment covers: `month` may hold a month name ('March'), a
+    # month number ('3') or a 'YYYY-MM' prefix. A bare month gets the year that puts it nearest the
+    # payment date, so 'December' paid on 2024-01-03 is 202312. Mirrors GymDB.payment_period().
+    month, paid = f'{row}month', f'{row}payment_date'
+    names = ' '.join(f"WHEN '{name}' THEN {i}" for i, name in enumerate(MONTH_NAMES, start=1))
+    number = f'''COALESCE(
+        CASE {month} {names} END,
+        CASE WHEN ({month} GLOB '[0-9]' OR {month} GLOB '[0-9][0-9]') AND CAST({month} AS INTEGER) BETWEEN 1 AND 12
+             THEN CAST({month} AS INTEGER) END,
+        CAST(strftime('%m', {paid}) AS INTEGER)
+    )'''
+    paid_month = f"CAST(strftime('%m', {paid}) AS INTEGER)"
+    return f'''(CASE
+        WHEN {month} GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]*' THEN CAST(substr({month}, 1, 4) || substr({month}, 6, 2) AS INTEGER)
+        ELSE (CAST(strftime('%Y', {paid}) AS INTEGER)
+              + CASE WHEN {number} - {paid_month} > 6 THEN -1 WHEN {paid_month} - {number} > 6 THEN 1 ELSE 0 END) * 100
+             + {number}
+    END)'''
+
+
+def _add_monthly_payment_period(cursor):
+    # monthly_payments.month only names the month ('March'), so every year's March was counted together.
+    # period (integer YYYYMM) pins each payment to a year and replaces month as the key of the rollups.
+    if 'period' not in [row[1] for row in cursor.execute('PRAGMA table_info(monthly_payments)')]:
+        cursor.execute('ALTER TABLE monthly_payments ADD COLUMN period INTEGER')
+    cursor.execute(f'UPDATE monthly_payments SET period = {_period_expression()} WHERE period IS NULL')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_monthly_payments_period_member ON monthly_payments(period, member_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_monthly_payments_member_period ON monthly_payments(member_id, period)')
+    for event in ('insert', 'delete', 'update'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS trg_monthly_payments_rollup_{event}')
+    cursor.execute('DROP TABLE IF EXISTS member_month_payments')
+    cursor.execute('DROP TABLE IF EXISTS month_payment_summary')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS member_period_payments (
+            member_id INTEGER NOT NULL,
+            period INTEGER NOT NULL,
+            payment_count INTEGER NOT NULL DEFAULT 0,
+            total_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (member_id, period)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_member_period_payments_period ON member_period_payments(period, member_id)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS period_payment_summary (
+            period INTEGER PRIMARY KEY,
+            paid_members INTEGER NOT NULL DEFAULT 0,
+            payment_count INTEGER NOT NULL DEFAULT 0,
+            total_amount DECIMAL(10,2) NOT NULL DEFAULT 0
+        )
+    ''')
+    # Member totals do not depend on the period; the period rollups skip rows whose period is not set yet,
+    # and a row inserted without one gets it filled in (which then counts it through the update trigger)
+    triggers = [
+        ('trg_monthly_payments_fill_period', 'AFTER INSERT ON monthly_payments WHEN NEW.period IS NULL',
+         f'UPDATE monthly_payments SET period = {_period_expression("NEW.")} WHERE id = NEW.id;'),
+        ('trg_monthly_payments_member_rollup_insert', 'AFTER INSERT ON monthly_payments',
+         _member_rollup('monthly', 'NEW', '+')),
+        ('trg_monthly_payments_member_rollup_delete', 'AFTER DELETE ON monthly_payments',
+         _member_rollup('monthly', 'OLD', '-')),
+        ('trg_monthly_payments_member_rollup_update', 'AFTER UPDATE OF member_id, amount ON monthly_payments',
+         _member_rollup('monthly', 'OLD', '-') + _member_rollup('monthly', 'NEW', '+')),
+        ('trg_monthly_payments_period_rollup_insert', 'AFTER INSERT ON monthly_payments WHEN NEW.period IS NOT NULL',
+         _monthly_rollup_add('NEW', 'period', member_totals=False)),
+        ('trg_monthly_payments_period_rollup_delete', 'AFTER DELETE ON monthly_payments WHEN OLD.period IS NOT NULL',
+         _monthly_rollup_remove('OLD', 'period', member_totals=False)),
+        ('trg_monthly_payments_period_rollup_remove', 'AFTER UPDATE OF member_id, period, amount ON monthly_payments '
+         'WHEN OLD.period IS NOT NULL', _monthly_rollup_remove('OLD', 'period', member_totals=False)),
+        ('trg_monthly_payments_period_rollup_add', 'AFTER UPDATE OF member_id, period, amount ON monthly_payments '
+         'WHEN NEW.period IS NOT NULL', _monthly_rollup_add('NEW', 'period', member_totals=False)),
+    ]
+    for name, event, body in triggers:
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END')
+    cursor.execute('DELETE FROM member_period_payments')
+    cursor.execute('DELETE FROM period_payment_summary')
+    cursor.execute('''
+        INSERT INTO member_period_payments (member_id, period, payment_count, total_amount)
+        SELECT member_id, period, COUNT(*), SUM(amount) FROM monthly_payments GROUP BY member_id, period
+    ''')
+    cursor.execute('''
+        INSERT INTO period_payment_summary (period, paid_members, payment_count, total_amount)
+        SELECT period, COUNT(*), SUM(payment_count), SUM(total_amount) FROM member_period_payments GROUP BY period
+    ''')
+
+
+def _add_reminder_jobs(cursor):
+    # Persistent queue for database.messaging.ReminderDispatcher: one row per phone number and run,
+    # so an interrupted run can resume and each number's outcome is kept
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reminder_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            phone_number TEXT NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT CHECK(status IN ('pending', 'sending', 'sent', 'failed')) NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at DATETIME,
+            last_error TEXT,
+            sent_at DATETIME,
+            recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (run_id, phone_number)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reminder_jobs_run_status ON reminder_jobs(run_id, status, next_attempt_at)')
+
+
+def _add_reminder_campaign_log(cursor):
+    # One row per member a reminder campaign considered: the message queued for them (delivery is tracked
+    # by the reminder_jobs row with the same run_id and phone_number) or why they were skipped
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reminder_campaign_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id TEXT NOT NULL,
+            kind TEXT CHECK(kind IN ('monthly', 'insurance')) NOT NULL,
+            period INTEGER,
+            member_id INTEGER NOT NULL,
+            phone_number TEXT,
+            amount_due DECIMAL(10,2),
+            message TEXT,
+            status TEXT CHECK(status IN ('queued', 'skipped')) NOT NULL,
+            reason TEXT,
+            recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (member_id) REFERENCES members(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_reminder_campaign_log_member
+        ON reminder_campaign_log(kind, member_id, status, recorded_at)
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_reminder_campaign_log_run ON reminder_campaign_log(run_id)')
+
+
+def _add_import_checkpoints(cursor):
+    # Progress of an interrupted database.importer run, written in the same transaction as each batch
+    # so a resumed run never inserts a committed batch twice
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            name TEXT PRIMARY KEY,
+            rows_done INTEGER NOT NULL,
+            inserted INTEGER NOT NULL,
+            skipped INTEGER NOT NULL,
+            errors INTEGER NOT NULL,
+            recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+MIGRATIONS = [
+    _create_base_schema,
+    _add_lookup_indexes,
+    _add_payment_rollups,
+    _add_transactions_ledger,
+    _add_monthly_payment_period,
+    _add_reminder_jobs,
+    _add_reminder_campaign_log,
+    _add_import_checkpoints,
+]
+
+LATEST_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    # Apply every pending migration, each in its own transaction, and return the resulting version
+    version = get_schema_version(conn)
+    if version > LATEST_VERSION:
+        print(f"Warning: database schema version {version} is newer than this application ({LATEST_VERSION}).")
+        return version
+    for target in range(version + 1, LATEST_VERSION + 1):
+        with conn:
+            cursor = conn.cursor()
+            # Take the write lock before looking at the version again: another process starting at the
+            # same time may have applied this migration while we waited
+            cursor.execute('BEGIN IMMEDIATE')
+            if get_schema_version(conn) >= target:
+                continue
+            MIGRATIONS[target - 1](cursor)
+            cursor.execute(f'PRAGMA user_version = {target}')
+    return get_schema_version(conn)
+
+
+if __name__ == '__main__':
+    # Usage: python -m database.migrations [db_path]
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'gym_payments.db'
+    with sqlite3.connect(db_path) as conn:
+        before = get_schema_version(conn)
+        after = migrate(conn)
+    conn.close()
+    print(f"{db_path}: schema version {before} -> {after}")
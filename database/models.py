@@ -1,24 +1,289 @@
+import json
+import random
 import sqlite3
-from typing import List, Dict, Optional
-from datetime import datetime, date
-import calendar
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
+import threading
 import time
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import weakref
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Iterable, Iterator
+from datetime import datetime, date, timedelta
+import calendar
+from database.migrations import LATEST_VERSION, MONTH_NAMES, get_schema_version, migrate as apply_migrations
+from database.messaging import send_whatsapp_reminders  # re-exported for existing callers
+
+# Columns query_members() accepts for order_by
+MEMBER_ORDER_COLUMNS = ('enrollment_date', 'first_name', 'last_name', 'birth_date', 'recorded_at', 'id')
+
+# Member columns written by add_member()/bulk_add_members(), and those that must have a value
+MEMBER_COLUMNS = [
+    'first_name', 'last_name', 'cin', 'birth_date', 'sex', 'phone_number', 'address', 'enrollment_date',
+    'group_id', 'insurance_type_id', 'emergency_contact_name', 'emergency_contact_phone',
+    'emergency_contact_relationship', 'status'
+]
+MEMBER_REQUIRED_COLUMNS = [
+    'first_name', 'last_name', 'cin', 'birth_date', 'sex', 'phone_number', 'enrollment_date', 'group_id', 'insurance_type_id'
+]
+# Filters bulk_update_members() accepts: those of query_members(), plus a list of ids and date cut-offs
+MEMBER_FILTERS = ('search', 'sex', 'group_id', 'insurance_type_id', 'status', 'ids', 'born_before', 'enrolled_before')
+EMERGENCY_CONTACT_RELATIONSHIPS = ('father', 'mother', 'brother', 'sister', 'friend', 'other')
+
+# Rows written per transaction by the bulk_add_* methods
+BULK_CHUNK_SIZE = 500
+
+# Rows fetched from the cursor at a time by the iter_* methods
+ITER_BATCH_SIZE = 1000
+
+# Connection settings GymDB uses unless told otherwise. WAL lets readers keep reading while one process
+# writes; it needs every process on the same machine, so a database on a network share should use 'delete'.
+DEFAULT_JOURNAL_MODE = 'wal'
+# With WAL, 'normal' only syncs at checkpoints: a power cut can lose the last commits but never corrupts
+DEFAULT_SYNCHRONOUS = 'normal'
+# How long a statement waits for another connection's lock before failing with 'database is locked'
+DEFAULT_BUSY_TIMEOUT_MS = 5000
+# WAL pages after which a commit checkpoints the log back into the database (SQLite's default)
+DEFAULT_WAL_AUTOCHECKPOINT = 1000
+JOURNAL_MODES = ('delete', 'truncate', 'persist', 'memory', 'wal', 'off')
+SYNCHRONOUS_LEVELS = ('off', 'normal', 'full', 'extra')
+CHECKPOINT_MODES = ('passive', 'full', 'restart', 'truncate')
+
+# Write transactions that still find the database locked after busy_timeout are retried this many
+# times, waiting WRITE_RETRY_BACKOFF seconds, then twice as long... (at most WRITE_RETRY_MAX_BACKOFF), with jitter
+WRITE_RETRIES = 5
+WRITE_RETRY_BACKOFF = 0.05
+WRITE_RETRY_MAX_BACKOFF = 2.0
+
+# Compiled statements kept per connection by the sqlite3 module (its default is 128). The update_*
+# methods build one UPDATE per table and set of columns, so every combination in use stays compiled.
+STATEMENT_CACHE_SIZE = 512
+
+# Columns the update_* methods never set from their arguments
+UPDATE_EXCLUDED_COLUMNS = ('id', 'recorded_at')
+
+# Small, rarely changed lookup tables served from GymDB's in-process cache (see GymDB._reference)
+REFERENCE_TABLES = ('groups', 'insurance_types')
+
+# Values of the 'kind' column of the transactions ledger view
+TRANSACTION_KINDS = ('monthly', 'insurance', 'other')
+
+# Payment rollup tables maintained by triggers: exact columns, amount columns (compared rounded to cents)
+# and the query that recomputes the table from the raw payment tables
+PAYMENT_SUMMARIES = {
+    'member_period_payments': (
+        ['member_id', 'period', 'payment_count'], ['total_amount'],
+        '''SELECT member_id, period, COUNT(*) AS payment_count, SUM(amount) AS total_amount
+           FROM monthly_payments WHERE period IS NOT NULL GROUP BY member_id, period'''
+    ),
+    'period_payment_summary': (
+        ['period', 'paid_members', 'payment_count'], ['total_amount'],
+        '''SELECT period, COUNT(DISTINCT member_id) AS paid_members, COUNT(*) AS payment_count, SUM(amount) AS total_amount
+           FROM monthly_payments WHERE period IS NOT NULL GROUP BY period'''
+    ),
+    'member_payment_summary': (
+        ['member_id', 'monthly_count', 'insurance_count', 'other_count'], ['monthly_total', 'insurance_total', 'other_total'],
+        '''SELECT member_id,
+                  SUM(kind = 'monthly') AS monthly_count, SUM(CASE WHEN kind = 'monthly' THEN amount ELSE 0 END) AS monthly_total,
+                  SUM(kind = 'insurance') AS insurance_count, SUM(CASE WHEN kind = 'insurance' THEN amount ELSE 0 END) AS insurance_total,
+                  SUM(kind = 'other') AS other_count, SUM(CASE WHEN kind = 'other' THEN amount ELSE 0 END) AS other_total
+           FROM (
+               SELECT member_id, amount, 'monthly' AS kind FROM monthly_payments
+               UNION ALL SELECT member_id, amount, 'insurance' FROM insurance_payments
+               UNION ALL SELECT member_id, amount, 'other' FROM other_payments
+           )
+           GROUP BY member_id'''
+    ),
+}
+
+def _is_locked(error: sqlite3.OperationalError) -> bool:
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+class _ThreadOwner:
+    # Kept in GymDB._local beside a thread's connection. Thread-local values are dropped when the thread
+    # ends, and a weakref.finalize on this object then closes the connection.
+    pass
+
 
 class GymDB:
-    def __init__(self, db_path: str = "gym_payments.db"):
+    def __init__(self, db_path: str = "gym_payments.db", journal_mode: str = DEFAULT_JOURNAL_MODE,
+                 synchronous: str = DEFAULT_SYNCHRONOUS, busy_timeout: int = DEFAULT_BUSY_TIMEOUT_MS,
+                 wal_autocheckpoint: int = DEFAULT_WAL_AUTOCHECKPOINT, write_retries: int = WRITE_RETRIES):
+        if journal_mode.lower() not in JOURNAL_MODES:
+            raise ValueError(f"Invalid journal_mode '{journal_mode}'. Must be one of {', '.join(JOURNAL_MODES)}.")
+        if synchronous.lower() not in SYNCHRONOUS_LEVELS:
+            raise ValueError(f"Invalid synchronous '{synchronous}'. Must be one of {', '.join(SYNCHRONOUS_LEVELS)}.")
         self.db_path = db_path
+        self.journal_mode = journal_mode.lower()
+        self.synchronous = synchronous.lower()
+        self.busy_timeout = busy_timeout
+        self.wal_autocheckpoint = wal_autocheckpoint
+        self.write_retries = write_retries
+        # The journal mode is stored in the database file, so it only has to be set by the first connection
+        self._journal_mode_set = False
+        # The queries rely on the latest schema (rollup tables, period column, transactions view), so the
+        # first connection brings an older database up to date
+        self._schema_checked = False
         # Do NOT call self.init_db() automatically. Only call it explicitly when needed.
+        # One long-lived connection per thread, opened lazily on first use
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # The finalizer that closes each connection when its thread ends, by id(connection)
+        self._finalizers = {}
+        # Cached groups/insurance_types, shared by every thread; the generation lets a reload that raced
+        # with an invalidation be dropped instead of stored
+        self._reference_cache = {}
+        self._reference_generation = 0
+        self._reference_lock = threading.Lock()
+        # Updatable columns per table (read from the schema) and the UPDATE statements built from them
+        self._update_columns = {}
+        self._update_statements = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def _connect(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.execute('PRAGMA foreign_keys = ON;')
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread is off only so close() can release every thread's
+            # connection; each connection is still used by the thread that opened it.
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout / 1000, check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA foreign_keys = ON;')
+            if not self._journal_mode_set:
+                try:
+                    mode = conn.execute(f'PRAGMA journal_mode = {self.journal_mode}').fetchone()[0]
+                    if mode != self.journal_mode and self.db_path != ':memory:':
+                        print(f"Warning: could not switch {self.db_path} to journal mode '{self.journal_mode}' (still '{mode}').")
+                except sqlite3.OperationalError as e:
+                    print(f"Warning: could not set journal mode '{self.journal_mode}' on {self.db_path}: {e}")
+                self._journal_mode_set = True
+            conn.execute(f'PRAGMA synchronous = {self.synchronous}')
+            conn.execute(f'PRAGMA wal_autocheckpoint = {int(self.wal_autocheckpoint)}')
+            self._local.conn = conn
+            self._local.owner = _ThreadOwner()
+            # Threads come and go (the reminder dispatcher starts new workers on every run): close their
+            # connections as they end instead of keeping them open until close()
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._finalizers[id(conn)] = weakref.finalize(
+                    self._local.owner, self._release_connection, conn, self._connections, self._finalizers,
+                    self._connections_lock)
+            if not self._schema_checked:
+                if get_schema_version(conn) < LATEST_VERSION:
+                    self.migrate()
+                self._schema_checked = True
         return conn
 
+    @staticmethod
+    def _release_connection(conn, connections: List, finalizers: Dict, lock: threading.Lock):
+        # Not a bound method, so the finalizer does not keep the GymDB alive
+        with lock:
+            if conn in connections:
+                connections.remove(conn)
+            finalizers.pop(id(conn), None)
+        conn.close()
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            finalizers, self._finalizers = self._finalizers, {}
+        # Outside the lock: dropping the old thread-locals runs finalizers, which take it.
+        # Threads still holding a closed connection will reconnect on next use.
+        for finalizer in finalizers.values():
+            finalizer.detach()
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    @contextmanager
+    def _write(self):
+        # One write transaction on this thread's connection, yielding its cursor; commits when the block
+        # ends and rolls back if it raises. BEGIN IMMEDIATE takes the write lock up front, so waiting for
+        # other writers happens here (up to busy_timeout, then retried with backoff) rather than midway
+        # through the block, where a deferred transaction could only fail.
+        # Inside another _write() or transaction() on the same thread, the block is a savepoint instead:
+        # an error undoes only that block, and nothing is committed until the outermost block ends.
+        conn = self._connect()
+        cursor = conn.cursor()
+        depth = getattr(self._local, 'write_depth', 0)
+        if depth:
+            savepoint = f'write_{depth}'
+            cursor.execute(f'SAVEPOINT {savepoint}')
+            self._local.write_depth = depth + 1
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute(f'ROLLBACK TO {savepoint}')
+                cursor.execute(f'RELEASE {savepoint}')
+                raise
+            finally:
+                self._local.write_depth = depth
+            cursor.execute(f'RELEASE {savepoint}')
+            return
+        self._retry_locked(lambda: cursor.execute('BEGIN IMMEDIATE'))
+        self._local.write_depth = 1
+        try:
+            yield cursor
+            # Without WAL, the commit itself waits for readers to finish
+            self._retry_locked(conn.commit)
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.write_depth = 0
+            if self._local.__dict__.pop('reference_changed', False):
+                self.invalidate_reference_cache()
+
+    @contextmanager
+    def transaction(self):
+        # Group any number of GymDB writes into one atomic commit (one fsync instead of one per call):
+        #
+        #   with db.transaction():
+        #       member_id = db.add_member(...)
+        #       db.add_monthly_payment(member_id)
+        #       db.add_insurance_payment(member_id)
+        #
+        # Everything is rolled back if the block raises. The add_/update_/delete_ methods report their own
+        # errors by printing and returning None/False, undoing only their part, so raise when such a result
+        # should abort the whole group. Nested transaction() blocks are savepoints.
+        with self._write():
+            yield self
+
+    def _retry_locked(self, operation):
+        delay = WRITE_RETRY_BACKOFF
+        for attempt in range(self.write_retries + 1):
+            try:
+                return operation()
+            except sqlite3.OperationalError as e:
+                if not _is_locked(e) or attempt == self.write_retries:
+                    raise
+                time.sleep(delay * random.uniform(0.5, 1.5))
+                delay = min(delay * 2, WRITE_RETRY_MAX_BACKOFF)
+
+    def checkpoint(self, mode: str = 'passive') -> Dict[str, int]:
+        # Copy the WAL back into the database file. 'passive' never waits, 'full' and 'restart' wait for
+        # writers (and readers, for 'restart'), 'truncate' also empties the -wal file. Returns whether the
+        # checkpoint was blocked ('busy'), the pages in the log and the pages checkpointed (-1 without WAL).
+        if mode.lower() not in CHECKPOINT_MODES:
+            raise ValueError(f"Invalid checkpoint mode '{mode}'. Must be one of {', '.join(CHECKPOINT_MODES)}.")
+        busy, log, checkpointed = self._connect().execute(f'PRAGMA wal_checkpoint({mode.upper()})').fetchone()
+        return {'busy': busy, 'log': log, 'checkpointed': checkpointed}
+
+    @contextmanager
+    def cancellable(self, is_cancelled):
+        # Queries run by this thread inside the block are aborted with
+        # sqlite3.OperationalError('interrupted') as soon as is_cancelled() returns True
+        conn = self._connect()
+        conn.set_progress_handler(lambda: 1 if is_cancelled() else 0, 1000)
+        try:
+            yield
+        finally:
+            conn.set_progress_handler(None, 0)
+
     def init_db(self):
         with self._connect() as conn:
             cursor = conn.cursor()
@@ -109,95 +374,156 @@ class GymDB:
                     FOREIGN KEY (member_id) REFERENCES members(id)
                 )
             ''')
+            # The tables were rebuilt from scratch, so every migration has to run again
+            cursor.execute('PRAGMA user_version = 0')
             conn.commit()
+        self.migrate()
+
+    def migrate(self) -> int:
+        # Upgrade the schema in place to the latest version, keeping existing data
+        version = apply_migrations(self._connect())
+        self.invalidate_reference_cache()
+        self._update_columns = {}
+        self._update_statements = {}
+        return version
+
+    def _updatable_columns(self, table: str) -> frozenset:
+        # Columns of table an update_* call may set, from the schema
+        columns = self._update_columns.get(table)
+        if columns is None:
+            rows = self._connect().execute(f'PRAGMA table_info({table})').fetchall()
+            columns = frozenset(row['name'] for row in rows) - set(UPDATE_EXCLUDED_COLUMNS)
+            self._update_columns[table] = columns
+        return columns
+
+    def _update_statement(self, table: str, fields: Iterable[str], touch_recorded_at: bool = False):
+        # 'UPDATE table SET a = ?, b = ? WHERE id = ?' for a set of columns, and the order its values go in.
+        # Columns are sorted, so the same set always gives the same text and sqlite3 reuses its compiled
+        # statement; fields outside the schema are rejected, so none of them ever reaches the SQL.
+        key = (table, frozenset(fields), touch_recorded_at)
+        statement = self._update_statements.get(key)
+        if statement is None:
+            unknown = key[1] - self._updatable_columns(table)
+            if unknown:
+                raise ValueError(f"Unknown {table} column(s): {', '.join(sorted(unknown))}.")
+            columns = sorted(key[1])
+            assignments = [f'{column} = ?' for column in columns] + (['recorded_at = ?'] if touch_recorded_at else [])
+            statement = (f'UPDATE {table} SET {", ".join(assignments)} WHERE id = ?', columns)
+            self._update_statements[key] = statement
+        return statement
+
+    def _update_row(self, table: str, row_id: int, fields: Dict, touch_recorded_at: bool = False) -> bool:
+        # Set fields on one row in its own write (a savepoint inside transaction()); True if the row exists
+        sql, columns = self._update_statement(table, fields, touch_recorded_at)
+        values = [fields[column] for column in columns] + ([datetime.now()] if touch_recorded_at else []) + [row_id]
+        with self._write() as cursor:
+            cursor.execute(sql, values)
+            # Read before the block ends: releasing a savepoint resets rowcount
+            updated = cursor.rowcount > 0
+        return updated
+
+    def invalidate_reference_cache(self):
+        with self._reference_lock:
+            self._reference_cache = {}
+            self._reference_generation += 1
+        if getattr(self._local, 'write_depth', 0):
+            # The change is not committed yet: drop the cache again once the transaction commits or rolls back
+            self._local.reference_changed = True
+
+    def _reference(self, table: str) -> Dict:
+        # Rows of a REFERENCE_TABLES table with 'by_id' and 'by_name' maps, from the cache when it is current.
+        # Writes made through this GymDB invalidate it directly. Commits by any other connection (another
+        # process, a script, another thread's connection) change PRAGMA data_version on this thread's
+        # connection, so a version different from the one this thread saw last also invalidates it.
+        conn = self._connect()
+        version = conn.execute('PRAGMA data_version').fetchone()[0]
+        if getattr(self._local, 'data_version', None) != version:
+            self._local.data_version = version
+            self.invalidate_reference_cache()
+        with self._reference_lock:
+            entry = self._reference_cache.get(table)
+            generation = self._reference_generation
+        if entry is None:
+            rows = [dict(row) for row in conn.execute(f'SELECT * FROM {table} ORDER BY id')]
+            entry = {'rows': rows, 'by_id': {r['id']: r for r in rows}, 'by_name': {r['name']: r for r in rows}}
+            with self._reference_lock:
+                if generation == self._reference_generation:
+                    self._reference_cache[table] = entry
+        return entry
 
     # CRUD for Groups
     def add_group(self, name: str, default_fee: float) -> Optional[int]:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 cursor.execute('INSERT INTO groups (name, default_fee) VALUES (?, ?)', (name, default_fee))
-                conn.commit()
-                return cursor.lastrowid
+            self.invalidate_reference_cache()
+            return cursor.lastrowid
         except sqlite3.IntegrityError as e:
             print(f"Error: Could not add group '{name}'. Reason: {e}. This group may already exist.")
             return None
 
     def get_groups(self) -> List[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM groups')
-            return [dict(row) for row in cursor.fetchall()]
+        return [dict(g) for g in self._reference('groups')['rows']]
+
+    def get_group_id_by_name(self, name: str) -> Optional[int]:
+        group = self._reference('groups')['by_name'].get(name)
+        return group['id'] if group else None
+
+    def get_group_name_by_id(self, group_id: int) -> Optional[str]:
+        group = self._reference('groups')['by_id'].get(group_id)
+        return group['name'] if group else None
 
     def update_group(self, group_id: int, name: Optional[str] = None, default_fee: Optional[float] = None) -> bool:
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            fields = []
-            values = []
-            if name is not None:
-                fields.append('name = ?')
-                values.append(name)
-            if default_fee is not None:
-                fields.append('default_fee = ?')
-                values.append(default_fee)
-            if not fields:
-                return False
-            values.append(group_id)
-            cursor.execute(f'UPDATE groups SET {", ".join(fields)} WHERE id = ?', values)
-            conn.commit()
-            return cursor.rowcount > 0
+        fields = {k: v for k, v in (('name', name), ('default_fee', default_fee)) if v is not None}
+        if not fields:
+            return False
+        updated = self._update_row('groups', group_id, fields)
+        self.invalidate_reference_cache()
+        return updated
 
     def delete_group(self, group_id: int) -> bool:
-        with self._connect() as conn:
-            cursor = conn.cursor()
+        with self._write() as cursor:
             cursor.execute('DELETE FROM groups WHERE id = ?', (group_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        self.invalidate_reference_cache()
+        return deleted
 
     # CRUD for Insurance Types
     def add_insurance_type(self, name: str, fee: float) -> Optional[int]:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 cursor.execute('INSERT INTO insurance_types (name, fee) VALUES (?, ?)', (name, fee))
-                conn.commit()
-                return cursor.lastrowid
+            self.invalidate_reference_cache()
+            return cursor.lastrowid
         except sqlite3.IntegrityError as e:
             print(f"Error: Could not add insurance type '{name}'. Reason: {e}. This insurance type may already exist.")
             return None
 
     def get_insurance_types(self) -> List[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM insurance_types')
-            return [dict(row) for row in cursor.fetchall()]
+        return [dict(i) for i in self._reference('insurance_types')['rows']]
+
+    def get_insurance_type_id_by_name(self, name: str) -> Optional[int]:
+        insurance_type = self._reference('insurance_types')['by_name'].get(name)
+        return insurance_type['id'] if insurance_type else None
+
+    def get_insurance_type_name_by_id(self, insurance_id: int) -> Optional[str]:
+        insurance_type = self._reference('insurance_types')['by_id'].get(insurance_id)
+        return insurance_type['name'] if insurance_type else None
 
     def update_insurance_type(self, insurance_id: int, name: Optional[str] = None, fee: Optional[float] = None) -> bool:
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            fields = []
-            values = []
-            if name is not None:
-                fields.append('name = ?')
-                values.append(name)
-            if fee is not None:
-                fields.append('fee = ?')
-                values.append(fee)
-            if not fields:
-                return False
-            values.append(insurance_id)
-            cursor.execute(f'UPDATE insurance_types SET {", ".join(fields)} WHERE id = ?', values)
-            conn.commit()
-            return cursor.rowcount > 0
+        fields = {k: v for k, v in (('name', name), ('fee', fee)) if v is not None}
+        if not fields:
+            return False
+        updated = self._update_row('insurance_types', insurance_id, fields)
+        self.invalidate_reference_cache()
+        return updated
 
     def delete_insurance_type(self, insurance_id: int) -> bool:
-        with self._connect() as conn:
-            cursor = conn.cursor()
+        with self._write() as cursor:
             cursor.execute('DELETE FROM insurance_types WHERE id = ?', (insurance_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+        self.invalidate_reference_cache()
+        return deleted
 
     # CRUD for Members
     def add_member(self, first_name: str, last_name: str, cin: str, birth_date: str, sex: str,
@@ -205,8 +531,7 @@ class GymDB:
                    emergency_contact_name: str, emergency_contact_phone: str, emergency_contact_relationship: str,
                    status: str = 'active') -> Optional[int]:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 cursor.execute('''
                     INSERT INTO members (
                         first_name, last_name, cin, birth_date, sex, phone_number, address, enrollment_date,
@@ -218,7 +543,6 @@ class GymDB:
                     group_id, insurance_type_id, emergency_contact_name, emergency_contact_phone,
                     emergency_contact_relationship, status, datetime.now()
                 ))
-                conn.commit()
                 return cursor.lastrowid
         except sqlite3.IntegrityError as e:
             if 'FOREIGN KEY constraint failed' in str(e):
@@ -231,38 +555,127 @@ class GymDB:
             return None
 
     def get_members(self) -> List[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM members')
-            return [dict(row) for row in cursor.fetchall()]
+        return list(self.iter_members())
+
+    def iter_members(self, batch_size: int = ITER_BATCH_SIZE) -> Iterator[Dict]:
+        return self._iter_rows('SELECT * FROM members ORDER BY id', (), batch_size)
 
     def get_member_by_id(self, member_id: int) -> Optional[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM members WHERE id = ?', (member_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM members WHERE id = ?', (member_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def get_member_ids_by_cin(self, cins: Iterable[str]) -> Dict[str, int]:
+        # cin -> member id for the given CINs that exist (the lowest id wins if a CIN is duplicated)
+        cins = list(set(cins))
+        result = {}
+        conn = self._connect()
+        cursor = conn.cursor()
+        # Stay well below SQLite's limit on bound parameters
+        for start in range(0, len(cins), 500):
+            batch = cins[start:start + 500]
+            cursor.execute(f'''
+                SELECT cin, MIN(id) FROM members WHERE cin IN ({", ".join("?" * len(batch))}) GROUP BY cin
+            ''', batch)
+            result.update({row[0]: row[1] for row in cursor.fetchall()})
+        return result
+
+    def get_members_with_details(self) -> List[Dict]:
+        # Members joined with their group and insurance type names in one query
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT m.*, g.name AS group_name, it.name AS insurance_type_name
+            FROM members m
+            LEFT JOIN groups g ON m.group_id = g.id
+            LEFT JOIN insurance_types it ON m.insurance_type_id = it.id
+        ''')
+        return [dict(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _member_conditions(search: Optional[str] = None, sex: Optional[str] = None, group_id: Optional[int] = None,
+                           insurance_type_id: Optional[int] = None, status: Optional[str] = None,
+                           ids: Optional[Iterable[int]] = None, born_before: Optional[str] = None,
+                           enrolled_before: Optional[str] = None):
+        # WHERE conditions on members (aliased m) and their parameters, for the MEMBER_FILTERS
+        conditions = []
+        params = []
+        if search:
+            pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            conditions.append("(m.first_name LIKE ? ESCAPE '\\' OR m.last_name LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+        if sex is not None:
+            conditions.append('m.sex = ?')
+            params.append(sex)
+        if group_id is not None:
+            conditions.append('m.group_id = ?')
+            params.append(group_id)
+        if insurance_type_id is not None:
+            conditions.append('m.insurance_type_id = ?')
+            params.append(insurance_type_id)
+        if status is not None:
+            conditions.append('m.status = ?')
+            params.append(status)
+        if ids is not None:
+            # Through json_each, so any number of ids is one parameter
+            conditions.append('m.id IN (SELECT value FROM json_each(?))')
+            params.append(json.dumps([int(i) for i in ids]))
+        if born_before is not None:
+            conditions.append('m.birth_date < ?')
+            params.append(born_before)
+        if enrolled_before is not None:
+            conditions.append('m.enrollment_date < ?')
+            params.append(enrolled_before)
+        return conditions, params
+
+    def query_members(self, search: Optional[str] = None, sex: Optional[str] = None, group_id: Optional[int] = None,
+                      insurance_type_id: Optional[int] = None, status: Optional[str] = None,
+                      order_by: str = '-enrollment_date', limit: Optional[int] = None, offset: int = 0) -> Dict:
+        # Filtered, sorted page of members (with group/insurance names) and the total number of matches.
+        # order_by is a members column, prefixed with '-' for descending order.
+        order_column = order_by.lstrip('-')
+        if order_column not in MEMBER_ORDER_COLUMNS:
+            print(f"Invalid order_by '{order_by}'. Must be one of {', '.join(MEMBER_ORDER_COLUMNS)}.")
+            return {'members': [], 'total': 0}
+        direction = 'DESC' if order_by.startswith('-') else 'ASC'
+        conditions, params = self._member_conditions(search=search, sex=sex, group_id=group_id,
+                                                     insurance_type_id=insurance_type_id, status=status)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT m.*, g.name AS group_name, it.name AS insurance_type_name,
+                   COUNT(*) OVER () AS total_count
+            FROM members m
+            LEFT JOIN groups g ON m.group_id = g.id
+            LEFT JOIN insurance_types it ON m.insurance_type_id = it.id
+            {where}
+            ORDER BY m.{order_column} {direction}, m.id {direction}
+            LIMIT ? OFFSET ?
+        ''', params + [limit if limit is not None else -1, offset])
+        members = [dict(row) for row in cursor.fetchall()]
+        if members:
+            total = members[0]['total_count']
+        elif offset > 0:
+            # Page past the end: the window count is not available, count separately
+            cursor.execute(f'SELECT COUNT(*) FROM members m {where}', params)
+            total = cursor.fetchone()[0]
+        else:
+            total = 0
+        for member in members:
+            del member['total_count']
+        return {'members': members, 'total': total}
 
     def update_member(self, member_id: int, **kwargs) -> bool:
-        valid_fields = [
-            'first_name', 'last_name', 'cin', 'birth_date', 'sex', 'phone_number', 'address',
-            'enrollment_date', 'group_id', 'insurance_type_id', 'emergency_contact_name',
-            'emergency_contact_phone', 'emergency_contact_relationship', 'status'
-        ]
+        valid_fields = self._updatable_columns('members')
         update_fields = {k: v for k, v in kwargs.items() if k in valid_fields}
         if not update_fields:
             print("No valid fields provided for update.")
             return False
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
-                set_clause = ', '.join([f'{field} = ?' for field in update_fields.keys()])
-                values = list(update_fields.values()) + [member_id]
-                cursor.execute(f'UPDATE members SET {set_clause} WHERE id = ?', values)
-                conn.commit()
-                return cursor.rowcount > 0
+            return self._update_row('members', member_id, update_fields)
         except sqlite3.IntegrityError as e:
             if 'FOREIGN KEY constraint failed' in str(e):
                 print("Error: The group_id or insurance_type_id does not exist. Please provide valid IDs.")
@@ -273,23 +686,93 @@ class GymDB:
             print(f"Error updating member: {e}")
             return False
 
+    def bulk_update_members(self, filter: Dict, **fields) -> List[int]:
+        # Set fields on every member matching all of filter (keys from MEMBER_FILTERS) in one UPDATE, e.g.
+        #   db.bulk_update_members({'group_id': kids_id, 'born_before': '2008-09-01'}, group_id=adults_id)
+        # Returns the ids of the updated members, or [] on error. An empty filter is refused rather than
+        # taken to mean every member.
+        unknown = [key for key in filter if key not in MEMBER_FILTERS]
+        conditions, params = ([], []) if unknown else self._member_conditions(**filter)
+        # Empty values ({'search': ''}, {'sex': None}) filter nothing, so they are refused too
+        if not conditions:
+            print(f"Invalid filter. Keys must be one or more of {', '.join(MEMBER_FILTERS)}.")
+            return []
+        valid_fields = self._updatable_columns('members')
+        update_fields = {k: v for k, v in fields.items() if k in valid_fields}
+        if not update_fields:
+            print("No valid fields provided for update.")
+            return []
+        columns = sorted(update_fields)
+        try:
+            with self._write() as cursor:
+                cursor.execute(f'''
+                    UPDATE members AS m SET {", ".join(f"{column} = ?" for column in columns)}
+                    WHERE {" AND ".join(conditions)}
+                    RETURNING id
+                ''', [update_fields[column] for column in columns] + params)
+                return sorted(row[0] for row in cursor.fetchall())
+        except sqlite3.IntegrityError as e:
+            if 'FOREIGN KEY constraint failed' in str(e):
+                print("Error: The group_id or insurance_type_id does not exist. Please provide valid IDs.")
+            else:
+                print(f"Error updating members: {e}")
+            return []
+        except Exception as e:
+            print(f"Error updating members: {e}")
+            return []
+
+    def archive_members_without_payment_since(self, since: str) -> List[int]:
+        # Archive, in one UPDATE, the active members with no monthly, insurance or other payment dated since
+        # (YYYY-MM-DD) or later. Members enrolled on or after that date have not had the whole period to
+        # pay and are left alone. Returns the ids of the archived members, or [] on error.
+        try:
+            with self._write() as cursor:
+                cursor.execute('''
+                    UPDATE members AS m SET status = 'archived'
+                    WHERE m.status = 'active' AND m.enrollment_date < :since
+                      AND NOT EXISTS (SELECT 1 FROM monthly_payments p WHERE p.member_id = m.id AND p.payment_date >= :since)
+                      AND NOT EXISTS (SELECT 1 FROM insurance_payments p WHERE p.member_id = m.id AND p.payment_date >= :since)
+                      AND NOT EXISTS (SELECT 1 FROM other_payments p WHERE p.member_id = m.id AND p.payment_date >= :since)
+                    RETURNING id
+                ''', {'since': since})
+                return sorted(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            print(f"Error archiving members: {e}")
+            return []
+
     def delete_member(self, member_id: int) -> bool:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 cursor.execute('DELETE FROM members WHERE id = ?', (member_id,))
-                conn.commit()
                 return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting member: {e}")
             return False
 
     # CRUD for Monthly Payments
+    @staticmethod
+    def payment_period(payment_date: str, month=None) -> int:
+        # YYYYMM period a monthly payment covers, by the same rules the migration used to backfill the column.
+        # month may be a month name ('March'), a month number or 'YYYY-MM[-DD]'; a bare month gets the year
+        # that puts it nearest payment_date, so 'December' paid on 2024-01-03 is 202312.
+        paid = date.fromisoformat(str(payment_date)[:10])
+        text = '' if month is None else str(month)
+        if len(text) >= 7 and text[:4].isdigit() and text[4] == '-' and text[5:7].isdigit():
+            return int(text[:4]) * 100 + int(text[5:7])
+        if text in MONTH_NAMES:
+            number = MONTH_NAMES.index(text) + 1
+        elif text.isdigit() and len(text) <= 2 and 1 <= int(text) <= 12:
+            number = int(text)
+        else:
+            number = paid.month
+        year = paid.year - (number - paid.month > 6) + (paid.month - number > 6)
+        return year * 100 + number
+
     def add_monthly_payment(self, member_id: int, amount: Optional[float] = None, payment_date: Optional[str] = None,
-                            month: Optional[str] = None, comment: Optional[str] = None) -> Optional[int]:
+                            month: Optional[str] = None, comment: Optional[str] = None,
+                            period: Optional[int] = None) -> Optional[int]:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 # Get default amount if not provided
                 if amount is None:
                     cursor.execute('''
@@ -304,14 +787,16 @@ class GymDB:
                 # Default payment_date is today
                 if payment_date is None:
                     payment_date = date.today().isoformat()
-                # Default month is current month name
+                # Default month is the period's month, else the month of the payment date
                 if month is None:
-                    month = calendar.month_name[date.today().month]
+                    number = period % 100 if period is not None else date.fromisoformat(str(payment_date)[:10]).month
+                    month = calendar.month_name[number]
+                if period is None:
+                    period = self.payment_period(payment_date, month)
                 cursor.execute('''
-                    INSERT INTO monthly_payments (member_id, amount, payment_date, month, comment, recorded_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (member_id, amount, payment_date, month, comment, datetime.now()))
-                conn.commit()
+                    INSERT INTO monthly_payments (member_id, amount, payment_date, month, period, comment, recorded_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (member_id, amount, payment_date, month, period, comment, datetime.now()))
                 return cursor.lastrowid
         except sqlite3.IntegrityError as e:
             if 'FOREIGN KEY constraint failed' in str(e):
@@ -324,28 +809,42 @@ class GymDB:
             return None
 
     def get_monthly_payments(self) -> List[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT mp.*, m.first_name, m.last_name, g.name AS group_name
-                FROM monthly_payments mp
-                JOIN members m ON mp.member_id = m.id
-                JOIN groups g ON m.group_id = g.id
-            ''')
-            return [dict(row) for row in cursor.fetchall()]
+        return list(self.iter_monthly_payments())
+
+    def iter_monthly_payments(self, since: Optional[str] = None, until: Optional[str] = None,
+                              batch_size: int = ITER_BATCH_SIZE, start_period: Optional[int] = None,
+                              end_period: Optional[int] = None) -> Iterator[Dict]:
+        # since/until bound payment_date; start_period/end_period (YYYYMM, inclusive) bound the month paid for
+        where, params = self._payment_date_range('mp', since, until, start_period, end_period)
+        return self._iter_rows(f'''
+            SELECT mp.*, m.first_name, m.last_name, g.name AS group_name
+            FROM monthly_payments mp
+            JOIN members m ON mp.member_id = m.id
+            JOIN groups g ON m.group_id = g.id
+            {where}
+            ORDER BY mp.id
+        ''', params, batch_size)
 
     def get_monthly_payment_by_id(self, payment_id: int) -> Optional[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM monthly_payments WHERE id = ?', (payment_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM monthly_payments WHERE id = ?', (payment_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
 
     def update_monthly_payment(self, payment_id: int, **kwargs) -> bool:
-        valid_fields = ['member_id', 'amount', 'payment_date', 'month', 'comment']
+        valid_fields = self._updatable_columns('monthly_payments')
         update_fields = {k: v for k, v in kwargs.items() if k in valid_fields}
+        # A new month moves the payment to the period it names (a bare month name is placed by the payment date)
+        if 'month' in update_fields and 'period' not in update_fields:
+            current = self.get_monthly_payment_by_id(payment_id)
+            if current:
+                try:
+                    update_fields['period'] = self.payment_period(
+                        update_fields.get('payment_date', current['payment_date']), update_fields['month'])
+                except ValueError as e:
+                    print(f"Error updating monthly payment: {e}")
+                    return False
         # If month is provided as a date, convert to month name
         if 'month' in update_fields:
             try:
@@ -359,14 +858,7 @@ class GymDB:
             print("No valid fields provided for update.")
             return False
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
-                set_clause = ', '.join([f'{field} = ?' for field in update_fields.keys()])
-                set_clause += ', recorded_at = ?'
-                values = list(update_fields.values()) + [datetime.now(), payment_id]
-                cursor.execute(f'UPDATE monthly_payments SET {set_clause} WHERE id = ?', values)
-                conn.commit()
-                return cursor.rowcount > 0
+            return self._update_row('monthly_payments', payment_id, update_fields, touch_recorded_at=True)
         except sqlite3.IntegrityError as e:
             if 'FOREIGN KEY constraint failed' in str(e):
                 print("Error: The member_id does not exist. Please provide a valid member ID.")
@@ -379,10 +871,8 @@ class GymDB:
 
     def delete_monthly_payment(self, payment_id: int) -> bool:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 cursor.execute('DELETE FROM monthly_payments WHERE id = ?', (payment_id,))
-                conn.commit()
                 return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting monthly payment: {e}")
@@ -390,8 +880,7 @@ class GymDB:
 
     def add_insurance_payment(self, member_id: int, amount: float = None, payment_date: str = None, comment: str = None) -> int:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 # Get default amount if not provided
                 if amount is None:
                     cursor.execute('''
@@ -410,7 +899,6 @@ class GymDB:
                     INSERT INTO insurance_payments (member_id, amount, payment_date, comment, recorded_at)
                     VALUES (?, ?, ?, ?, ?)
                 ''', (member_id, amount, payment_date, comment, datetime.now()))
-                conn.commit()
                 return cursor.lastrowid
         except sqlite3.IntegrityError as e:
             if 'FOREIGN KEY constraint failed' in str(e):
@@ -423,40 +911,35 @@ class GymDB:
             return None
 
     def get_insurance_payments(self) -> List[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT ip.*, m.first_name, m.last_name, it.name AS insurance_type_name
-                FROM insurance_payments ip
-                JOIN members m ON ip.member_id = m.id
-                JOIN insurance_types it ON m.insurance_type_id = it.id
-            ''')
-            return [dict(row) for row in cursor.fetchall()]
+        return list(self.iter_insurance_payments())
+
+    def iter_insurance_payments(self, since: Optional[str] = None, until: Optional[str] = None,
+                                batch_size: int = ITER_BATCH_SIZE) -> Iterator[Dict]:
+        where, params = self._payment_date_range('ip', since, until)
+        return self._iter_rows(f'''
+            SELECT ip.*, m.first_name, m.last_name, it.name AS insurance_type_name
+            FROM insurance_payments ip
+            JOIN members m ON ip.member_id = m.id
+            JOIN insurance_types it ON m.insurance_type_id = it.id
+            {where}
+            ORDER BY ip.id
+        ''', params, batch_size)
 
     def get_insurance_payment_by_id(self, payment_id: int) -> Optional[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM insurance_payments WHERE id = ?', (payment_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM insurance_payments WHERE id = ?', (payment_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
 
     def update_insurance_payment(self, payment_id: int, **kwargs) -> bool:
-        valid_fields = ['member_id', 'amount', 'payment_date', 'comment']
+        valid_fields = self._updatable_columns('insurance_payments')
         update_fields = {k: v for k, v in kwargs.items() if k in valid_fields}
         if not update_fields:
             print("No valid fields provided for update.")
             return False
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
-                set_clause = ', '.join([f'{field} = ?' for field in update_fields.keys()])
-                set_clause += ', recorded_at = ?'
-                values = list(update_fields.values()) + [datetime.now(), payment_id]
-                cursor.execute(f'UPDATE insurance_payments SET {set_clause} WHERE id = ?', values)
-                conn.commit()
-                return cursor.rowcount > 0
+            return self._update_row('insurance_payments', payment_id, update_fields, touch_recorded_at=True)
         except sqlite3.IntegrityError as e:
             if 'FOREIGN KEY constraint failed' in str(e):
                 print("Error: The member_id does not exist. Please provide a valid member ID.")
@@ -469,10 +952,8 @@ class GymDB:
 
     def delete_insurance_payment(self, payment_id: int) -> bool:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 cursor.execute('DELETE FROM insurance_payments WHERE id = ?', (payment_id,))
-                conn.commit()
                 return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting insurance payment: {e}")
@@ -480,13 +961,11 @@ class GymDB:
 
     def add_other_payment(self, member_id: int, amount: float, payment_date: str, transaction_type: str, comment: str = None) -> int:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 cursor.execute('''
                     INSERT INTO other_payments (member_id, amount, payment_date, transaction_type, comment, recorded_at)
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (member_id, amount, payment_date, transaction_type, comment, datetime.now()))
-                conn.commit()
                 return cursor.lastrowid
         except sqlite3.IntegrityError as e:
             if 'FOREIGN KEY constraint failed' in str(e):
@@ -499,39 +978,68 @@ class GymDB:
             return None
 
     def get_other_payments(self) -> List[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT op.*, m.first_name, m.last_name
-                FROM other_payments op
-                JOIN members m ON op.member_id = m.id
-            ''')
-            return [dict(row) for row in cursor.fetchall()]
+        return list(self.iter_other_payments())
+
+    def iter_other_payments(self, since: Optional[str] = None, until: Optional[str] = None,
+                            batch_size: int = ITER_BATCH_SIZE) -> Iterator[Dict]:
+        where, params = self._payment_date_range('op', since, until)
+        return self._iter_rows(f'''
+            SELECT op.*, m.first_name, m.last_name
+            FROM other_payments op
+            JOIN members m ON op.member_id = m.id
+            {where}
+            ORDER BY op.id
+        ''', params, batch_size)
+
+    @staticmethod
+    def _payment_date_range(alias: str, since: Optional[str], until: Optional[str],
+                            start_period: Optional[int] = None, end_period: Optional[int] = None):
+        # WHERE clause for an inclusive payment_date range (and period range, for monthly payments);
+        # any bound may be omitted
+        conditions, params = [], []
+        if start_period is not None:
+            conditions.append(f'{alias}.period >= ?')
+            params.append(start_period)
+        if end_period is not None:
+            conditions.append(f'{alias}.period <= ?')
+            params.append(end_period)
+        if since is not None:
+            conditions.append(f'{alias}.payment_date >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append(f'{alias}.payment_date <= ?')
+            params.append(until)
+        return (f'WHERE {" AND ".join(conditions)}' if conditions else ''), params
+
+    def _iter_rows(self, sql: str, params, batch_size: int) -> Iterator[Dict]:
+        # The statement is stepped batch_size rows at a time, so only one batch is ever held in memory
+        cursor = self._connect().cursor()
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
 
     def get_other_payment_by_id(self, payment_id: int) -> Optional[Dict]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM other_payments WHERE id = ?', (payment_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM other_payments WHERE id = ?', (payment_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
 
     def update_other_payment(self, payment_id: int, **kwargs) -> bool:
-        valid_fields = ['member_id', 'amount', 'payment_date', 'transaction_type', 'comment']
+        valid_fields = self._updatable_columns('other_payments')
         update_fields = {k: v for k, v in kwargs.items() if k in valid_fields}
         if not update_fields:
             print("No valid fields provided for update.")
             return False
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
-                set_clause = ', '.join([f'{field} = ?' for field in update_fields.keys()])
-                set_clause += ', recorded_at = ?'
-                values = list(update_fields.values()) + [datetime.now(), payment_id]
-                cursor.execute(f'UPDATE other_payments SET {set_clause} WHERE id = ?', values)
-                conn.commit()
-                return cursor.rowcount > 0
+            return self._update_row('other_payments', payment_id, update_fields, touch_recorded_at=True)
         except sqlite3.IntegrityError as e:
             if 'FOREIGN KEY constraint failed' in str(e):
                 print("Error: The member_id does not exist. Please provide a valid member ID.")
@@ -544,18 +1052,15 @@ class GymDB:
 
     def delete_other_payment(self, payment_id: int) -> bool:
         try:
-            with self._connect() as conn:
-                cursor = conn.cursor()
+            with self._write() as cursor:
                 cursor.execute('DELETE FROM other_payments WHERE id = ?', (payment_id,))
-                conn.commit()
                 return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting other payment: {e}")
             return False
 
     def add_other_payments_table(self):
-        with self._connect() as conn:
-            cursor = conn.cursor()
+        with self._write() as cursor:
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS other_payments (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -568,201 +1073,568 @@ class GymDB:
                     FOREIGN KEY (member_id) REFERENCES members(id)
                 )
             ''')
-            conn.commit()
+
+    # Bulk inserts: rows are validated up front, written with executemany in one transaction per chunk,
+    # and problems are returned as a per-row report ({'inserted': n, 'errors': [{'index': i, 'error': msg}]})
+    def bulk_add_members(self, members: Iterable[Dict], chunk_size: int = BULK_CHUNK_SIZE) -> Dict:
+        columns = MEMBER_COLUMNS + ['recorded_at']
+        group_ids = self._reference('groups')['by_id']
+        insurance_type_ids = self._reference('insurance_types')['by_id']
+
+        def prepare(cursor, chunk):
+            valid, errors = [], []
+            now = datetime.now()
+            for index, row in chunk:
+                missing = [c for c in MEMBER_REQUIRED_COLUMNS if row.get(c) in (None, '')]
+                if missing:
+                    errors.append({'index': index, 'error': f"Missing required field(s): {', '.join(missing)}."})
+                elif row['sex'] not in ('M', 'F'):
+                    errors.append({'index': index, 'error': f"Invalid sex '{row['sex']}'. Must be 'M' or 'F'."})
+                elif row.get('emergency_contact_relationship') not in (None, *EMERGENCY_CONTACT_RELATIONSHIPS):
+                    errors.append({'index': index, 'error': f"Invalid emergency_contact_relationship '{row['emergency_contact_relationship']}'."})
+                elif (row.get('status') or 'active') not in ('active', 'archived'):
+                    errors.append({'index': index, 'error': f"Invalid status '{row['status']}'."})
+                elif row['group_id'] not in group_ids or row['insurance_type_id'] not in insurance_type_ids:
+                    errors.append({'index': index, 'error': "The group_id or insurance_type_id does not exist."})
+                else:
+                    values = [row.get(c) for c in MEMBER_COLUMNS]
+                    values[MEMBER_COLUMNS.index('status')] = row.get('status') or 'active'
+                    valid.append((index, values + [now]))
+            return valid, errors
+
+        return self._bulk_insert('members', columns, members, prepare, chunk_size)
+
+    def bulk_add_monthly_payments(self, payments: Iterable[Dict], chunk_size: int = BULK_CHUNK_SIZE) -> Dict:
+        # Same defaults as add_monthly_payment: group fee, today, the payment date's month, period from date and month
+        def prepare(cursor, chunk):
+            default_fees = self._member_default_fees(cursor, chunk, 'groups g ON m.group_id = g.id', 'g.default_fee')
+            today = date.today()
+            now = datetime.now()
+            valid, errors = [], []
+            for index, row in chunk:
+                if row.get('member_id') not in default_fees:
+                    errors.append({'index': index, 'error': "The member_id does not exist. Please provide a valid member ID."})
+                    continue
+                amount = row.get('amount')
+                payment_date = row.get('payment_date') or today.isoformat()
+                try:
+                    month = row.get('month') or calendar.month_name[
+                        row['period'] % 100 if row.get('period') else date.fromisoformat(str(payment_date)[:10]).month]
+                    period = row.get('period') or self.payment_period(payment_date, month)
+                except ValueError as e:
+                    errors.append({'index': index, 'error': f"Invalid payment_date: {e}"})
+                    continue
+                valid.append((index, [
+                    row['member_id'],
+                    amount if amount is not None else default_fees[row['member_id']],
+                    payment_date,
+                    month,
+                    period,
+                    row.get('comment'),
+                    now
+                ]))
+            return valid, errors
+
+        columns = ['member_id', 'amount', 'payment_date', 'month', 'period', 'comment', 'recorded_at']
+        return self._bulk_insert('monthly_payments', columns, payments, prepare, chunk_size)
+
+    def bulk_add_insurance_payments(self, payments: Iterable[Dict], chunk_size: int = BULK_CHUNK_SIZE) -> Dict:
+        # Same defaults as add_insurance_payment: insurance type fee, today
+        def prepare(cursor, chunk):
+            default_fees = self._member_default_fees(cursor, chunk, 'insurance_types it ON m.insurance_type_id = it.id', 'it.fee')
+            today = date.today().isoformat()
+            now = datetime.now()
+            valid, errors = [], []
+            for index, row in chunk:
+                if row.get('member_id') not in default_fees:
+                    errors.append({'index': index, 'error': "The member_id does not exist. Please provide a valid member ID."})
+                    continue
+                amount = row.get('amount')
+                valid.append((index, [
+                    row['member_id'],
+                    amount if amount is not None else default_fees[row['member_id']],
+                    row.get('payment_date') or today,
+                    row.get('comment'),
+                    now
+                ]))
+            return valid, errors
+
+        columns = ['member_id', 'amount', 'payment_date', 'comment', 'recorded_at']
+        return self._bulk_insert('insurance_payments', columns, payments, prepare, chunk_size)
+
+    def bulk_add_other_payments(self, payments: Iterable[Dict], chunk_size: int = BULK_CHUNK_SIZE) -> Dict:
+        def prepare(cursor, chunk):
+            member_ids = self._existing_member_ids(cursor, chunk)
+            now = datetime.now()
+            valid, errors = [], []
+            for index, row in chunk:
+                missing = [c for c in ('amount', 'payment_date', 'transaction_type') if row.get(c) in (None, '')]
+                if missing:
+                    errors.append({'index': index, 'error': f"Missing required field(s): {', '.join(missing)}."})
+                elif row.get('member_id') not in member_ids:
+                    errors.append({'index': index, 'error': "The member_id does not exist. Please provide a valid member ID."})
+                else:
+                    valid.append((index, [
+                        row['member_id'], row['amount'], row['payment_date'], row['transaction_type'], row.get('comment'), now
+                    ]))
+            return valid, errors
+
+        columns = ['member_id', 'amount', 'payment_date', 'transaction_type', 'comment', 'recorded_at']
+        return self._bulk_insert('other_payments', columns, payments, prepare, chunk_size)
+
+    def _existing_member_ids(self, cursor, chunk) -> set:
+        ids = list({row.get('member_id') for _, row in chunk if row.get('member_id') is not None})
+        if not ids:
+            return set()
+        cursor.execute(f'SELECT id FROM members WHERE id IN ({", ".join("?" * len(ids))})', ids)
+        return {row[0] for row in cursor.fetchall()}
+
+    def _member_default_fees(self, cursor, chunk, fee_join: str, fee_column: str) -> Dict[int, float]:
+        # member_id -> default fee for every existing member referenced in the chunk
+        ids = list({row.get('member_id') for _, row in chunk if row.get('member_id') is not None})
+        if not ids:
+            return {}
+        cursor.execute(f'''
+            SELECT m.id, {fee_column} FROM members m LEFT JOIN {fee_join}
+            WHERE m.id IN ({", ".join("?" * len(ids))})
+        ''', ids)
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def _bulk_insert(self, table: str, columns: List[str], rows: Iterable[Dict], prepare, chunk_size: int) -> Dict:
+        report = {'inserted': 0, 'errors': []}
+        sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+        cursor = self._connect().cursor()
+
+        def flush(chunk):
+            valid, errors = prepare(cursor, chunk)
+            report['errors'].extend(errors)
+            if not valid:
+                return
+            try:
+                with self._write() as write:
+                    write.executemany(sql, [values for _, values in valid])
+                report['inserted'] += len(valid)
+                return
+            except sqlite3.IntegrityError:
+                pass
+            # Something slipped past validation: insert row by row to find out which rows fail
+            with self._write() as write:
+                for index, values in valid:
+                    write.execute('SAVEPOINT bulk_row')
+                    try:
+                        write.execute(sql, values)
+                        report['inserted'] += 1
+                    except sqlite3.IntegrityError as e:
+                        write.execute('ROLLBACK TO bulk_row')
+                        report['errors'].append({'index': index, 'error': str(e)})
+                    write.execute('RELEASE bulk_row')
+
+        chunk = []
+        for index, row in enumerate(rows):
+            chunk.append((index, row))
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+        report['errors'].sort(key=lambda e: e['index'])
+        return report
+
+    def rebuild_payment_summaries(self, verify_only: bool = False) -> Dict[str, int]:
+        # Compare every rollup table with the raw payments and return, per table, how many rows differ
+        # (rows in the table but not in the recomputation plus rows in the recomputation but not in the table).
+        # Unless verify_only is set, tables that differ are rebuilt from scratch in one transaction.
+        mismatches = {}
+        conn = self._connect()
+        cursor = conn.cursor()
+        for table, (exact_columns, amount_columns, query) in PAYMENT_SUMMARIES.items():
+            compared = ', '.join(exact_columns + [f'ROUND({c}, 2)' for c in amount_columns])
+            count = 0
+            for left, right in ((table, f'({query})'), (f'({query})', table)):
+                cursor.execute(f'SELECT COUNT(*) FROM (SELECT {compared} FROM {left} EXCEPT SELECT {compared} FROM {right})')
+                count += cursor.fetchone()[0]
+            mismatches[table] = count
+        if not verify_only and any(mismatches.values()):
+            with self._write() as cursor:
+                for table, (exact_columns, amount_columns, query) in PAYMENT_SUMMARIES.items():
+                    if mismatches[table]:
+                        columns = ', '.join(exact_columns + amount_columns)
+                        cursor.execute(f'DELETE FROM {table}')
+                        cursor.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM ({query})')
+        return mismatches
 
     def get_member_statistics(self) -> dict:
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM members WHERE status = 'active'")
-            active = cursor.fetchone()[0]
-            cursor.execute("SELECT COUNT(*) FROM members WHERE status = 'archived'")
-            archived = cursor.fetchone()[0]
-            cursor.execute("SELECT COUNT(*) FROM members")
-            total = cursor.fetchone()[0]
-            return {
-                'active': active,
-                'archived': archived,
-                'total': total,
-                'active_ratio': f"{active}/{total}" if total > 0 else "0/0"
-            }
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM members WHERE status = 'active'")
+        active = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM members WHERE status = 'archived'")
+        archived = cursor.fetchone()[0]
+        cursor.execute("SELECT COUNT(*) FROM members")
+        total = cursor.fetchone()[0]
+        return {
+            'active': active,
+            'archived': archived,
+            'total': total,
+            'active_ratio': f"{active}/{total}" if total > 0 else "0/0"
+        }
 
-    def get_monthly_payment_coverage(self) -> dict:
-        import calendar
+    def get_monthly_payment_coverage(self, period: Optional[int] = None) -> dict:
         from datetime import date
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            # Get current month name
-            current_month = calendar.month_name[date.today().month]
-            # Count unique members who paid for the current month
-            cursor.execute("""
-                SELECT COUNT(DISTINCT member_id) FROM monthly_payments WHERE month = ?
-            """, (current_month,))
-            paid_members = cursor.fetchone()[0]
-            # Count active members
-            cursor.execute("SELECT COUNT(*) FROM members WHERE status = 'active'")
-            active_members = cursor.fetchone()[0]
-            percent = (paid_members / active_members * 100) if active_members > 0 else 0
-            return {
-                'paid_members': paid_members,
-                'active_members': active_members,
-                'percentage': percent
-            }
+        conn = self._connect()
+        cursor = conn.cursor()
+        # Default to the current month (YYYYMM)
+        if period is None:
+            period = date.today().year * 100 + date.today().month
+        # Count unique members who paid for that month (kept up to date by triggers)
+        cursor.execute('SELECT paid_members FROM period_payment_summary WHERE period = ?', (period,))
+        row = cursor.fetchone()
+        paid_members = row[0] if row else 0
+        # Count active members
+        cursor.execute("SELECT COUNT(*) FROM members WHERE status = 'active'")
+        active_members = cursor.fetchone()[0]
+        percent = (paid_members / active_members * 100) if active_members > 0 else 0
+        return {
+            'paid_members': paid_members,
+            'active_members': active_members,
+            'percentage': percent
+        }
+
+    def get_period_payment_totals(self, start_period: int, end_period: int) -> List[Dict]:
+        # Per-month (YYYYMM, inclusive range) paying members, payment count and amount, oldest first
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT period, paid_members, payment_count, total_amount FROM period_payment_summary
+            WHERE period BETWEEN ? AND ?
+            ORDER BY period
+        ''', (start_period, end_period))
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_unpaid_insurance_count(self) -> dict:
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            # Count active members
-            cursor.execute("SELECT COUNT(*) FROM members WHERE status = 'active'")
-            active_members = cursor.fetchone()[0]
-            # Count unique members who have made an insurance payment
-            cursor.execute("SELECT COUNT(DISTINCT member_id) FROM insurance_payments")
-            paid_members = cursor.fetchone()[0]
-            unpaid = active_members - paid_members
-            return {
-                'active_members': active_members,
-                'paid_members': paid_members,
-                'unpaid_members': unpaid,
-                'percentage': f"{unpaid}/{active_members}" if active_members > 0 else "0/0"
-            }
+        conn = self._connect()
+        cursor = conn.cursor()
+        # Active members, and how many of them have made an insurance payment
+        cursor.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(EXISTS (
+                       SELECT 1 FROM member_payment_summary ps WHERE ps.member_id = m.id AND ps.insurance_count > 0
+                   )), 0)
+            FROM members m
+            WHERE m.status = 'active'
+        ''')
+        active_members, paid_members = cursor.fetchone()
+        unpaid = active_members - paid_members
+        return {
+            'active_members': active_members,
+            'paid_members': paid_members,
+            'unpaid_members': unpaid,
+            'percentage': f"{unpaid}/{active_members}" if active_members > 0 else "0/0"
+        }
 
     def get_new_members_this_month(self) -> int:
         from datetime import date
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            today = date.today()
-            year = today.year
-            month = today.month
-            # SQLite strftime('%Y', ...) and strftime('%m', ...) for year and month
-            cursor.execute('''
-                SELECT COUNT(*) FROM members
-                WHERE status = 'active'
-                  AND strftime('%Y', enrollment_date) = ?
-                  AND strftime('%m', enrollment_date) = ?
-            ''', (str(year), f"{month:02d}"))
-            count = cursor.fetchone()[0]
-            return count
-
-    def get_unpaid_members_for_month(self, month_number: int) -> list:
-        import calendar
+        conn = self._connect()
+        cursor = conn.cursor()
+        today = date.today()
+        year = today.year
+        month = today.month
+        # SQLite strftime('%Y', ...) and strftime('%m', ...) for year and month
+        cursor.execute('''
+            SELECT COUNT(*) FROM members
+            WHERE status = 'active'
+              AND strftime('%Y', enrollment_date) = ?
+              AND strftime('%m', enrollment_date) = ?
+        ''', (str(year), f"{month:02d}"))
+        count = cursor.fetchone()[0]
+        return count
+
+    def get_dashboard_snapshot(self) -> dict:
+        # All overview KPIs from a single statement, so they come from one read transaction and agree
+        # with each other. Payment coverage only counts active members.
+        today = date.today()
+        month_start = today.replace(day=1)
+        next_month_start = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        current_month = calendar.month_name[today.month]
+        current_period = today.year * 100 + today.month
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT
+                COUNT(*) AS total,
+                COALESCE(SUM(m.status = 'active'), 0) AS active,
+                COALESCE(SUM(m.status = 'archived'), 0) AS archived,
+                COALESCE(SUM(m.status = 'active' AND m.enrollment_date >= ? AND m.enrollment_date < ?), 0) AS new_members,
+                COALESCE(SUM(m.status = 'active' AND EXISTS (
+                    SELECT 1 FROM member_period_payments mp WHERE mp.member_id = m.id AND mp.period = ?
+                )), 0) AS paid_monthly,
+                COALESCE(SUM(m.status = 'active' AND EXISTS (
+                    SELECT 1 FROM member_payment_summary ps WHERE ps.member_id = m.id AND ps.insurance_count > 0
+                )), 0) AS paid_insurance
+            FROM members m
+        ''', (month_start.isoformat(), next_month_start.isoformat(), current_period))
+        row = cursor.fetchone()
+        total, active, archived = row['total'], row['active'], row['archived']
+        unpaid_insurance = active - row['paid_insurance']
+        return {
+            'month': current_month,
+            'period': current_period,
+            'members': {
+                'active': active,
+                'archived': archived,
+                'total': total,
+                'active_ratio': f"{active}/{total}" if total > 0 else "0/0"
+            },
+            'monthly_payment_coverage': {
+                'paid_members': row['paid_monthly'],
+                'active_members': active,
+                'percentage': (row['paid_monthly'] / active * 100) if active > 0 else 0
+            },
+            'unpaid_insurance': {
+                'active_members': active,
+                'paid_members': row['paid_insurance'],
+                'unpaid_members': unpaid_insurance,
+                'percentage': f"{unpaid_insurance}/{active}" if active > 0 else "0/0"
+            },
+            'new_members_this_month': row['new_members']
+        }
+
+    def get_unpaid_members_for_month(self, month_number: int, year: Optional[int] = None) -> list:
         if not (1 <= month_number <= 12):
             print("Invalid month number. Must be between 1 and 12.")
             return []
-        month_name = calendar.month_name[month_number]
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            # Get IDs of active members who did not pay for the given month
-            cursor.execute('''
-                SELECT * FROM members
-                WHERE status = 'active'
-                  AND id NOT IN (
-                      SELECT member_id FROM monthly_payments WHERE month = ?
-                  )
-            ''', (month_name,))
-            return [dict(row) for row in cursor.fetchall()]
+        # The month of the given year, by default the current year
+        period = (year if year is not None else date.today().year) * 100 + month_number
+        conn = self._connect()
+        cursor = conn.cursor()
+        # Active members without a payment for that month: one primary-key probe of the rollup per member
+        cursor.execute('''
+            SELECT m.* FROM members m
+            WHERE m.status = 'active'
+              AND NOT EXISTS (
+                  SELECT 1 FROM member_period_payments mp WHERE mp.member_id = m.id AND mp.period = ?
+              )
+            ORDER BY m.id
+        ''', (period,))
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_unpaid_insurance_members(self) -> list:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM members
-                WHERE status = 'active'
-                  AND id NOT IN (
-                      SELECT member_id FROM insurance_payments
-                  )
-            ''')
-            return [dict(row) for row in cursor.fetchall()]
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT m.* FROM members m
+            WHERE m.status = 'active'
+              AND NOT EXISTS (
+                  SELECT 1 FROM member_payment_summary ps WHERE ps.member_id = m.id AND ps.insurance_count > 0
+              )
+            ORDER BY m.id
+        ''')
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_unpaid_members_as_of(self, as_of: str, kind: str = 'monthly') -> list:
+        # Active members enrolled by as_of (YYYY-MM-DD) who had not paid by that date: for 'monthly', for the
+        # month as_of falls in; for 'insurance', at all. Payments dated after as_of do not count.
+        if kind not in ('monthly', 'insurance'):
+            print("Invalid kind. Must be 'monthly' or 'insurance'.")
+            return []
+        if kind == 'monthly':
+            period = int(as_of[:4]) * 100 + int(as_of[5:7])
+            paid = '''SELECT 1 FROM monthly_payments p
+                      WHERE p.member_id = m.id AND p.period = :period AND p.payment_date <= :as_of'''
+        else:
+            period = None
+            paid = 'SELECT 1 FROM insurance_payments p WHERE p.member_id = m.id AND p.payment_date <= :as_of'
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT m.* FROM members m
+            WHERE m.status = 'active' AND m.enrollment_date <= :as_of
+              AND NOT EXISTS ({paid})
+            ORDER BY m.id
+        ''', {'as_of': as_of, 'period': period})
+        return [dict(row) for row in cursor.fetchall()]
 
     def get_all_payments_for_member(self, member_id: int) -> list:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            payments = []
-            # Monthly payments
-            cursor.execute('''
-                SELECT member_id, payment_date, 'monthly' AS payment_type, amount, comment
-                FROM monthly_payments
-                WHERE member_id = ?
-            ''', (member_id,))
-            payments.extend([dict(row) for row in cursor.fetchall()])
-            # Insurance payments
-            cursor.execute('''
-                SELECT member_id, payment_date, 'insurance' AS payment_type, amount, comment
-                FROM insurance_payments
-                WHERE member_id = ?
-            ''', (member_id,))
-            payments.extend([dict(row) for row in cursor.fetchall()])
-            # Other payments
+        # Oldest first, read from the transactions ledger view
+        return [
+            {k: t[k] for k in ('member_id', 'payment_date', 'payment_type', 'amount', 'comment')}
+            for t in self.iter_transactions(member_id=member_id, newest_first=False)
+        ]
+
+    def iter_transactions(self, member_id: Optional[int] = None, since: Optional[str] = None, until: Optional[str] = None,
+                          kind: Optional[str] = None, after_cursor: Optional[tuple] = None, limit: Optional[int] = None,
+                          newest_first: bool = True) -> Iterator[Dict]:
+        # Rows of the transactions ledger (all payment kinds), with member names, in (payment_date, kind, id) order.
+        # Every row carries a 'cursor'; pass the last one back as after_cursor to get the next page.
+        conditions, params = [], []
+        if member_id is not None:
+            conditions.append('t.member_id = ?')
+            params.append(member_id)
+        if since is not None:
+            conditions.append('t.payment_date >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('t.payment_date <= ?')
+            params.append(until)
+        if kind is not None:
+            if kind not in TRANSACTION_KINDS:
+                print(f"Invalid kind '{kind}'. Must be one of {', '.join(TRANSACTION_KINDS)}.")
+                return
+            conditions.append('t.kind = ?')
+            params.append(kind)
+        if after_cursor is not None:
+            conditions.append(f'(t.payment_date, t.kind, t.id) {"<" if newest_first else ">"} (?, ?, ?)')
+            params.extend(after_cursor)
+        where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+        direction = 'DESC' if newest_first else 'ASC'
+        rows = self._iter_rows(f'''
+            SELECT t.*,
+                   (SELECT first_name FROM members WHERE id = t.member_id) AS first_name,
+                   (SELECT last_name FROM members WHERE id = t.member_id) AS last_name
+            FROM transactions t
+            {where}
+            ORDER BY t.payment_date {direction}, t.kind {direction}, t.id {direction}
+            LIMIT ?
+        ''', params + [limit if limit is not None else -1], min(limit or ITER_BATCH_SIZE, ITER_BATCH_SIZE))
+        for row in rows:
+            row['cursor'] = (row['payment_date'], row['kind'], row['id'])
+            yield row
+
+    # Reminder jobs: the persistent queue behind database.messaging.ReminderDispatcher
+    def enqueue_reminder_jobs(self, run_id: str, jobs: Iterable[tuple]) -> int:
+        # jobs are (phone_number, message) pairs; numbers already queued for the run keep their row and
+        # status, so enqueueing a run again is how it is resumed. Numbers whose job failed go back to
+        # pending with the new message. Returns how many jobs were added or requeued.
+        with self._write() as cursor:
+            cursor.executemany('''
+                INSERT INTO reminder_jobs (run_id, phone_number, message, recorded_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (run_id, phone_number) DO UPDATE SET
+                    status = 'pending', message = excluded.message, attempts = 0, next_attempt_at = NULL,
+                    last_error = NULL
+                WHERE reminder_jobs.status = 'failed'
+            ''', [(run_id, phone_number, message, datetime.now()) for phone_number, message in jobs])
+            return cursor.rowcount
+
+    def reset_interrupted_reminder_jobs(self, run_id: str) -> int:
+        # Jobs left 'sending' by a run that stopped midway go back to the queue
+        with self._write() as cursor:
+            cursor.execute("UPDATE reminder_jobs SET status = 'pending' WHERE run_id = ? AND status = 'sending'", (run_id,))
+            return cursor.rowcount
+
+    def claim_reminder_job(self, run_id: str) -> Optional[Dict]:
+        # Atomically mark the next due pending job as 'sending' and return it, or None if none is due
+        now = datetime.now().isoformat(sep=' ', timespec='milliseconds')
+        with self._write() as cursor:
             cursor.execute('''
-                SELECT member_id, payment_date, 
-                    CASE 
-                        WHEN transaction_type IS NOT NULL THEN transaction_type
-                        ELSE 'other'
-                    END AS payment_type, 
-                    amount, comment
-                FROM other_payments
-                WHERE member_id = ?
-            ''', (member_id,))
-            payments.extend([dict(row) for row in cursor.fetchall()])
-            # Sort by payment_date (optional)
-            payments.sort(key=lambda x: x['payment_date'])
-            return payments
-
-def send_whatsapp_reminders(phone_numbers: list, message: str = "Hi member, this is a reminder to pay your gym fees."):
-    driver = webdriver.Chrome()
-    driver.get("https://web.whatsapp.com/")
-    try:
-        # Wait for either the popup or the search bar
-        WebDriverWait(driver, 120).until(
-            lambda d: (
-                d.find_elements(By.XPATH, '//button[.//span[text()="Continue" or text()="Continuer" or text()="OK" or text()="Ok" or text()="Got it" or text()="D\'accord"]]') or
-                d.find_elements(By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]')
-            )
-        )
-        # Check for popup
-        popups = driver.find_elements(By.XPATH, '//button[.//span[text()="Continue" or text()="Continuer" or text()="OK" or text()="Ok" or text()="Got it" or text()="D\'accord"]]')
-        if popups:
-            popups[0].click()
-            print("Closed popup.")
-            # Wait for the search bar after closing popup
-            WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]'))
-            )
-        else:
-            print("No popup detected. Proceeding to send messages...")
-        print("Logged in to WhatsApp Web. Starting to send messages...")
-    except Exception as e:
-        print("Login to WhatsApp Web failed or timed out.")
-        driver.quit()
-        return
-
-    for number in phone_numbers:
-        url = f"https://web.whatsapp.com/send?phone={number}"
-        driver.get(url)
-        try:
-            # Wait for the chat header (contact name) to ensure chat is loaded
-            WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.XPATH, '//header//span[@title]'))
-            )
-            # Now wait for the message box at the bottom
-            WebDriverWait(driver, 30).until(
-                EC.presence_of_element_located((By.XPATH, '//footer//div[@contenteditable="true" and @data-tab]'))
-            )
-            time.sleep(1)
-            message_box = driver.find_element(By.XPATH, '//footer//div[@contenteditable="true" and @data-tab]')
-            message_box.click()
-            message_box.send_keys(Keys.CONTROL, 'a')
-            message_box.send_keys(Keys.DELETE)
-            time.sleep(0.2)
-            message_box.send_keys(message)
-            time.sleep(0.2)
-            message_box.send_keys(Keys.ENTER)
-            print(f"Message sent to {number}")
-            time.sleep(2)
-        except Exception as e:
-            print(f"Failed to send to {number}: {e}")
+                UPDATE reminder_jobs SET status = 'sending', attempts = attempts + 1
+                WHERE id = (
+                    SELECT id FROM reminder_jobs
+                    WHERE run_id = ? AND status = 'pending' AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+                    ORDER BY next_attempt_at IS NOT NULL, next_attempt_at, id
+                    LIMIT 1
+                )
+                RETURNING id, run_id, phone_number, message, attempts
+            ''', (run_id, now))
+            row = cursor.fetchone()
+            return dict(row) if row else None
 
-    driver.quit()
+    def finish_reminder_job(self, job_id: int, error: Optional[str] = None, retry_at: Optional[datetime] = None) -> bool:
+        # Record the outcome of a claimed job: sent (no error), back to pending until retry_at, or failed
+        with self._write() as cursor:
+            if error is None:
+                cursor.execute('''
+                    UPDATE reminder_jobs SET status = 'sent', sent_at = ?, last_error = NULL, next_attempt_at = NULL
+                    WHERE id = ?
+                ''', (datetime.now(), job_id))
+            elif retry_at is not None:
+                cursor.execute('''
+                    UPDATE reminder_jobs SET status = 'pending', last_error = ?, next_attempt_at = ? WHERE id = ?
+                ''', (error, retry_at.isoformat(sep=' ', timespec='milliseconds'), job_id))
+            else:
+                cursor.execute("UPDATE reminder_jobs SET status = 'failed', last_error = ? WHERE id = ?", (error, job_id))
+            return cursor.rowcount > 0
+
+    def get_next_reminder_retry(self, run_id: str) -> Optional[datetime]:
+        # When the earliest pending job of the run becomes due (now if one already is), or None if none is pending
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT COUNT(*), MAX(next_attempt_at IS NULL), MIN(next_attempt_at)
+            FROM reminder_jobs WHERE run_id = ? AND status = 'pending'
+        ''', (run_id,))
+        pending, any_due, earliest = cursor.fetchone()
+        if not pending:
+            return None
+        return datetime.now() if any_due else datetime.fromisoformat(earliest)
+
+    def get_reminder_jobs(self, run_id: str) -> List[Dict]:
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM reminder_jobs WHERE run_id = ? ORDER BY id', (run_id,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_reminder_run_status(self, run_id: str) -> Dict[str, int]:
+        # Number of jobs of the run in each status
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT status, COUNT(*) FROM reminder_jobs WHERE run_id = ? GROUP BY status', (run_id,))
+        counts = {'pending': 0, 'sending': 0, 'sent': 0, 'failed': 0}
+        counts.update({row[0]: row[1] for row in cursor.fetchall()})
+        return counts
+
+    # Reminder campaigns (see database.campaigns)
+    def get_recently_reminded_member_ids(self, kind: str, since: datetime) -> set:
+        # Members a campaign of this kind sent a reminder to at or after `since`. Jobs that failed or were
+        # never sent do not count, so an outage does not hold members back for the whole cooldown.
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT DISTINCT l.member_id FROM reminder_campaign_log l
+            JOIN reminder_jobs j ON j.run_id = l.run_id AND j.phone_number = l.phone_number
+            WHERE l.kind = ? AND l.status = 'queued' AND j.status = 'sent' AND j.sent_at >= ?
+        ''', (kind, since))
+        return {row[0] for row in cursor.fetchall()}
+
+    def add_reminder_campaign_log(self, run_id: str, kind: str, period: Optional[int], entries: Iterable[Dict]) -> int:
+        # entries: dicts with member_id, status ('queued' or 'skipped') and optionally phone_number,
+        # amount_due, message and reason
+        now = datetime.now()
+        rows = [
+            (run_id, kind, period, e['member_id'], e.get('phone_number'), e.get('amount_due'), e.get('message'),
+             e['status'], e.get('reason'), now)
+            for e in entries
+        ]
+        with self._write() as cursor:
+            cursor.executemany('''
+                INSERT INTO reminder_campaign_log
+                    (run_id, kind, period, member_id, phone_number, amount_due, message, status, reason, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            return len(rows)
+
+    def get_reminder_campaign_log(self, run_id: str) -> List[Dict]:
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM reminder_campaign_log WHERE run_id = ? ORDER BY id', (run_id,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    # Import checkpoints (see database.importer)
+    def get_import_checkpoint(self, name: str) -> Optional[Dict]:
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT rows_done, inserted, skipped, errors FROM import_checkpoints WHERE name = ?', (name,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
 
-  
\ No newline at end of file
+    def save_import_checkpoint(self, name: str, state: Dict):
+        # state: rows_done, inserted, skipped and errors. Call inside the transaction() that writes the batch.
+        with self._write() as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO import_checkpoints (name, rows_done, inserted, skipped, errors, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (name, state['rows_done'], state['inserted'], state['skipped'], state['errors'], datetime.now()))
+
+    def delete_import_checkpoint(self, name: str) -> bool:
+        with self._write() as cursor:
+            cursor.execute('DELETE FROM import_checkpoints WHERE name = ?', (name,))
+            return cursor.rowcount > 0
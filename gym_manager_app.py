@@ -1,11 +1,14 @@
 import sys
+import time
+STARTUP_STARTED = time.perf_counter()
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QStackedWidget, QSizePolicy, QFrame, QTableWidget, QTableWidgetItem, QHeaderView, QDialog, QLineEdit, QComboBox, QDialogButtonBox, QMessageBox
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton, QLabel, QStackedWidget, QSizePolicy, QFrame, QTableView, QStyledItemDelegate, QHeaderView, QDialog, QLineEdit, QComboBox, QDialogButtonBox, QMessageBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QRect, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QPainter
 from database.models import GymDB
 from datetime import date
+import sqlite3
 
 # Arabic section names
 # Add 'overview' section
@@ -42,6 +45,9 @@ MATERIAL_ACTIVE = '#1565C0'  # Material Blue 800
 MATERIAL_TEXT = '#222'
 MATERIAL_FONT = 'Segoe UI, Arial, sans-serif'
 
+# Delay between the last keystroke in the members search bar and the query
+SEARCH_DEBOUNCE_MS = 250
+
 ARABIC_HEADERS = [
     'الاسم الأول',  # First Name
     'اسم العائلة',  # Last Name
@@ -101,7 +107,7 @@ class MenuButton(QPushButton):
             ''')
 
 class AddMemberDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, db, parent=None):
         super().__init__(parent)
         self.setWindowTitle('إضافة عضو جديد')
         self.setLayoutDirection(Qt.RightToLeft)
@@ -115,7 +121,6 @@ class AddMemberDialog(QDialog):
         self.group = QComboBox()
         self.insurance_type = QComboBox()
         # Populate group and insurance type from DB
-        db = GymDB()
         self.group.addItems([g['name'] for g in db.get_groups()])
         self.insurance_type.addItems([i['name'] for i in db.get_insurance_types()])
         layout.addWidget(self.first_name)
@@ -152,6 +157,217 @@ class MemberProfileWidget(QWidget):
         layout.addWidget(back_btn, alignment=Qt.AlignCenter)
         self.setLayout(layout)
 
+class OverviewWidget(QWidget):
+    # KPI cards for the overview section, all filled from one GymDB.get_dashboard_snapshot() call
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setLayoutDirection(Qt.RightToLeft)
+        layout = QGridLayout()
+        self.values = {}
+        cards = [
+            ('active_members', 'الأعضاء النشطون'),
+            ('new_members', 'أعضاء جدد هذا الشهر'),
+            ('monthly_coverage', 'نسبة أداء الاشتراك الشهري'),
+            ('unpaid_insurance', 'لم يؤدوا التأمين'),
+        ]
+        for idx, (key, title) in enumerate(cards):
+            card = QFrame()
+            card.setStyleSheet(f'background: {MATERIAL_PRIMARY_LIGHT}; border-radius: 12px;')
+            card_layout = QVBoxLayout()
+            title_label = QLabel(title)
+            title_label.setAlignment(Qt.AlignCenter)
+            title_label.setFont(QFont(MATERIAL_FONT, 13))
+            value_label = QLabel('-')
+            value_label.setAlignment(Qt.AlignCenter)
+            value_label.setFont(QFont(MATERIAL_FONT, 22, QFont.Bold))
+            value_label.setStyleSheet(f'color: {MATERIAL_ACTIVE};')
+            card_layout.addWidget(title_label)
+            card_layout.addWidget(value_label)
+            card.setLayout(card_layout)
+            layout.addWidget(card, idx // 2, idx % 2)
+            self.values[key] = value_label
+        self.setLayout(layout)
+
+    def update_snapshot(self, snapshot):
+        coverage = snapshot['monthly_payment_coverage']
+        self.values['active_members'].setText(snapshot['members']['active_ratio'])
+        self.values['new_members'].setText(str(snapshot['new_members_this_month']))
+        self.values['monthly_coverage'].setText(f"{coverage['percentage']:.0f}% ({coverage['paid_members']}/{coverage['active_members']})")
+        self.values['unpaid_insurance'].setText(snapshot['unpaid_insurance']['percentage'])
+
+class MembersTableModel(QAbstractTableModel):
+    # Members list backed by GymDB.query_members(); rows are fetched page by page as the view scrolls
+    PAGE_SIZE = 100
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.filters = {}
+        self.members = []
+        self.total = 0
+
+    def set_filters(self, **filters):
+        self.apply_result(filters, self.db.query_members(**filters, limit=self.PAGE_SIZE, offset=0))
+
+    def apply_result(self, filters, result):
+        # Show the first page of a query_members() result that was computed elsewhere (e.g. on a worker thread)
+        self.beginResetModel()
+        self.filters = filters
+        self.members = result['members']
+        self.total = result['total']
+        self.endResetModel()
+
+    def member_at(self, row):
+        return self.members[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.members)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(ARABIC_HEADERS) + 1
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.members) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        result = self.db.query_members(**self.filters, limit=self.PAGE_SIZE, offset=len(self.members))
+        rows = result['members']
+        self.total = result['total']
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.members), len(self.members) + len(rows) - 1)
+        self.members.extend(rows)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        m = self.members[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole and column > 0:
+            values = [m['first_name'], m['last_name'], 'ذكر' if m['sex'] == 'M' else 'أنثى', m['group_name'] or '', m['insurance_type_name'] or '']
+            return values[column - 1]
+        if role == Qt.ToolTipRole and column == 0:
+            return 'عرض الملف الشخصي'
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return ['', *ARABIC_HEADERS][section]
+        return super().headerData(section, orientation, role)
+
+TRANSACTION_HEADERS = ['التاريخ', 'العضو', 'النوع', 'المبلغ', 'ملاحظة']
+TRANSACTION_KIND_LABELS = {'monthly': 'اشتراك شهري', 'insurance': 'تأمين'}
+
+class TransactionsTableModel(QAbstractTableModel):
+    # Transactions ledger, newest first; each page continues from the cursor of the last loaded row
+    PAGE_SIZE = 100
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.transactions = []
+        self.exhausted = False
+
+    def refresh(self):
+        self.beginResetModel()
+        self.transactions = list(self.db.iter_transactions(limit=self.PAGE_SIZE))
+        self.exhausted = len(self.transactions) < self.PAGE_SIZE
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.transactions)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(TRANSACTION_HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and bool(self.transactions) and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.transactions:
+            return
+        rows = list(self.db.iter_transactions(after_cursor=self.transactions[-1]['cursor'], limit=self.PAGE_SIZE))
+        self.exhausted = len(rows) < self.PAGE_SIZE
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.transactions), len(self.transactions) + len(rows) - 1)
+        self.transactions.extend(rows)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        t = self.transactions[index.row()]
+        if role == Qt.DisplayRole:
+            values = [
+                t['payment_date'],
+                f"{t['first_name'] or ''} {t['last_name'] or ''}".strip(),
+                TRANSACTION_KIND_LABELS.get(t['kind'], t['payment_type']),
+                f"{t['amount']:.2f}",
+                t['comment'] or '',
+            ]
+            return values[index.column()]
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return TRANSACTION_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+class MembersQuerySignals(QObject):
+    # (generation, filters, result) of a finished members query
+    finished = pyqtSignal(int, dict, dict)
+
+class MembersQueryWorker(QRunnable):
+    # Runs the first-page members query off the GUI thread; gives up as soon as a newer query is requested
+    def __init__(self, db, generation, current_generation, filters, signals):
+        super().__init__()
+        self.db = db
+        self.generation = generation
+        self.current_generation = current_generation
+        self.filters = filters
+        self.signals = signals
+
+    def run(self):
+        is_stale = lambda: self.current_generation() != self.generation
+        if is_stale():
+            return
+        try:
+            with self.db.cancellable(is_stale):
+                result = self.db.query_members(**self.filters, limit=MembersTableModel.PAGE_SIZE, offset=0)
+        except sqlite3.OperationalError as e:
+            if not is_stale():
+                print(f"Error querying members: {e}")
+            return
+        self.signals.finished.emit(self.generation, self.filters, result)
+
+class ProfileButtonDelegate(QStyledItemDelegate):
+    # Paints the eye icon in the profile column and reports clicks, instead of one QPushButton per row
+    clicked = pyqtSignal(QModelIndex)
+
+    def __init__(self, icon, parent=None):
+        super().__init__(parent)
+        self.icon = icon
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        rect = QRect(0, 0, 24, 24)
+        rect.moveCenter(option.rect.center())
+        self.icon.paint(painter, rect)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            self.clicked.emit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -159,6 +375,11 @@ class MainWindow(QMainWindow):
         self.resize(1100, 700)
         self.setStyleSheet(f'background: {MATERIAL_BG}; font-family: {MATERIAL_FONT};')
         self.active_section = 'overview'
+        # Single database handle shared by every section for the window's lifetime; it only connects on first use
+        self.db = GymDB()
+        self.database_ready = False
+        # Milliseconds from startup to the first paint and to the first section being loaded
+        self.startup_times = {}
         # Define EYE_ICON after QApplication is constructed
         self.EYE_ICON = QIcon.fromTheme('view-preview')
         if self.EYE_ICON.isNull():
@@ -256,102 +477,169 @@ class MainWindow(QMainWindow):
 
         menu_layout.addStretch()
 
-        # Main content area
+        # Main content area. Sections are built on their first visit (see build_section); until the
+        # database is ready the stack only holds a loading label, so the first frame needs no queries
         self.stack = QStackedWidget()
         self.section_widgets = {}
-        # Add all section widgets to the stack first
-        for key in ['overview', 'members', 'monthly_payments', 'insurance_payments', 'other_payments', 'payments', 'transactions_history', 'settings']:
-            w = QWidget()
-            layout = QVBoxLayout()
-            if key == 'members':
-                # --- Filter and Search Bar ---
-                filter_layout = QHBoxLayout()
-                # Search bar
-                search_bar = QLineEdit()
-                search_bar.setPlaceholderText('بحث بالاسم...')
-                search_bar.setFixedWidth(200)
-                search_bar.setStyleSheet('font-size: 12pt; padding: 6px 12px; border-radius: 8px; border: 1px solid #bbb;')
-                filter_layout.addWidget(search_bar)
-                # Sex filter
-                sex_filter = QComboBox()
-                sex_filter.addItem('الجنس')
-                sex_filter.addItems(['ذكر', 'أنثى'])
-                sex_filter.setFixedWidth(100)
-                filter_layout.addWidget(sex_filter)
-                # Group filter
-                group_filter = QComboBox()
-                group_filter.addItem('المجموعة')
-                db = GymDB()
-                group_filter.addItems([g['name'] for g in db.get_groups()])
-                group_filter.setFixedWidth(130)
-                filter_layout.addWidget(group_filter)
-                # Insurance type filter
-                insurance_filter = QComboBox()
-                insurance_filter.addItem('نوع التأمين')
-                insurance_filter.addItems([i['name'] for i in db.get_insurance_types()])
-                insurance_filter.setFixedWidth(130)
-                filter_layout.addWidget(insurance_filter)
-                filter_layout.addStretch()
-                layout.addLayout(filter_layout)
-                # Add New Member button
-                add_btn = QPushButton('إضافة عضو جديد')
-                add_btn.setStyleSheet(f'background: {MATERIAL_PRIMARY}; color: white; font-weight: bold; border-radius: 8px; padding: 8px 24px; font-size: 13pt;')
-                add_btn.setCursor(Qt.PointingHandCursor)
-                layout.addWidget(add_btn, alignment=Qt.AlignRight)
-                # Members table
-                table = QTableWidget()
-                table.setColumnCount(6)
-                table.setHorizontalHeaderLabels(['', *ARABIC_HEADERS])
-                table.setRowCount(0)  # Will fill with data later
-                table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-                table.setLayoutDirection(Qt.RightToLeft)
-                table.setStyleSheet('font-size: 13pt;')
-                table.horizontalHeader().setStyleSheet(f'''
-                    QHeaderView::section {{
-                        background-color: {MATERIAL_PRIMARY};
-                        color: white;
-                        font-weight: bold;
-                        font-size: 14pt;
-                        border: none;
-                        padding: 8px 0px;
-                    }}
-                ''')
-                layout.addWidget(table)
-                w.setLayout(layout)
-                self.section_widgets[key] = w
-                self.stack.addWidget(w)
-                # Store widgets for later use
-                self.members_table = table
-                self.add_member_btn = add_btn
-                self.members_search_bar = search_bar
-                self.members_sex_filter = sex_filter
-                self.members_group_filter = group_filter
-                self.members_insurance_filter = insurance_filter
-                self.members_profile_widget = None
-            else:
-                label = QLabel(f'This is the {key.replace("_", " ")} section')
-                label.setAlignment(Qt.AlignCenter)
-                label.setFont(QFont(MATERIAL_FONT, 18, QFont.Bold))
-                layout.addWidget(label)
-                w.setLayout(layout)
-                self.section_widgets[key] = w
-                self.stack.addWidget(w)
+        loading = QLabel('جار التحميل...')
+        loading.setAlignment(Qt.AlignCenter)
+        loading.setFont(QFont(MATERIAL_FONT, 18, QFont.Bold))
+        self.stack.addWidget(loading)
 
         # Add widgets to the main layout after all widgets are created
         main_layout.addWidget(self.stack)
         main_layout.addWidget(menu_widget)
 
+        # Members queries run on a single background thread; only the latest request's result is shown
+        self.members_query_generation = 0
+        self.members_query_pool = QThreadPool(self)
+        self.members_query_pool.setMaxThreadCount(1)
+        self.members_query_pool.setExpiryTimeout(-1)  # keep the thread, and its DB connection, alive
+        self.members_query_signals = MembersQuerySignals(self)
+        self.members_query_signals.finished.connect(self.on_members_query_finished)
+
+        # Default section
+        self.switch_section('overview')
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if 'first_paint' not in self.startup_times:
+            self.startup_times['first_paint'] = (time.perf_counter() - STARTUP_STARTED) * 1000
+            # Database work starts once the first frame is on screen
+            QTimer.singleShot(0, self.load_initial_data)
+
+    def load_initial_data(self):
+        # Bring older database files up to the current schema (indexes etc.)
+        self.db.migrate()
+        self.database_ready = True
+        self.switch_section(self.active_section)
+        self.startup_times['ready'] = (time.perf_counter() - STARTUP_STARTED) * 1000
+        print(f"Startup: first paint after {self.startup_times['first_paint']:.0f} ms, "
+              f"ready after {self.startup_times['ready']:.0f} ms")
+
+    def build_section(self, key):
+        w = QWidget()
+        layout = QVBoxLayout()
+        if key == 'members':
+            self.build_members_section(layout)
+        elif key == 'overview':
+            self.overview_widget = OverviewWidget()
+            layout.addWidget(self.overview_widget)
+            layout.addStretch()
+        elif key == 'transactions_history':
+            self.build_transactions_section(layout)
+        else:
+            label = QLabel(f'This is the {key.replace("_", " ")} section')
+            label.setAlignment(Qt.AlignCenter)
+            label.setFont(QFont(MATERIAL_FONT, 18, QFont.Bold))
+            layout.addWidget(label)
+        w.setLayout(layout)
+        self.section_widgets[key] = w
+        self.stack.addWidget(w)
+        return w
+
+    def build_members_section(self, layout):
+        # --- Filter and Search Bar ---
+        filter_layout = QHBoxLayout()
+        # Search bar
+        search_bar = QLineEdit()
+        search_bar.setPlaceholderText('بحث بالاسم...')
+        search_bar.setFixedWidth(200)
+        search_bar.setStyleSheet('font-size: 12pt; padding: 6px 12px; border-radius: 8px; border: 1px solid #bbb;')
+        filter_layout.addWidget(search_bar)
+        # Sex filter
+        sex_filter = QComboBox()
+        sex_filter.addItem('الجنس')
+        sex_filter.addItems(['ذكر', 'أنثى'])
+        sex_filter.setFixedWidth(100)
+        filter_layout.addWidget(sex_filter)
+        # Group filter
+        group_filter = QComboBox()
+        group_filter.addItem('المجموعة')
+        for g in self.db.get_groups():
+            group_filter.addItem(g['name'], g['id'])
+        group_filter.setFixedWidth(130)
+        filter_layout.addWidget(group_filter)
+        # Insurance type filter
+        insurance_filter = QComboBox()
+        insurance_filter.addItem('نوع التأمين')
+        for i in self.db.get_insurance_types():
+            insurance_filter.addItem(i['name'], i['id'])
+        insurance_filter.setFixedWidth(130)
+        filter_layout.addWidget(insurance_filter)
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
+        # Add New Member button
+        add_btn = QPushButton('إضافة عضو جديد')
+        add_btn.setStyleSheet(f'background: {MATERIAL_PRIMARY}; color: white; font-weight: bold; border-radius: 8px; padding: 8px 24px; font-size: 13pt;')
+        add_btn.setCursor(Qt.PointingHandCursor)
+        layout.addWidget(add_btn, alignment=Qt.AlignRight)
+        # Members table
+        table = QTableView()
+        self.members_model = MembersTableModel(self.db, table)
+        table.setModel(self.members_model)
+        profile_delegate = ProfileButtonDelegate(self.EYE_ICON, table)
+        profile_delegate.clicked.connect(self.on_member_profile_clicked)
+        table.setItemDelegateForColumn(0, profile_delegate)
+        table.setSelectionBehavior(QTableView.SelectRows)
+        table.setEditTriggers(QTableView.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.setLayoutDirection(Qt.RightToLeft)
+        table.setStyleSheet('font-size: 13pt;')
+        table.horizontalHeader().setStyleSheet(f'''
+            QHeaderView::section {{
+                background-color: {MATERIAL_PRIMARY};
+                color: white;
+                font-weight: bold;
+                font-size: 14pt;
+                border: none;
+                padding: 8px 0px;
+            }}
+        ''')
+        layout.addWidget(table)
+        # Store widgets for later use
+        self.members_table = table
+        self.add_member_btn = add_btn
+        self.members_search_bar = search_bar
+        self.members_sex_filter = sex_filter
+        self.members_group_filter = group_filter
+        self.members_insurance_filter = insurance_filter
+        self.members_profile_widget = None
         # Connect add member button
         self.add_member_btn.clicked.connect(self.open_add_member_dialog)
+        # Typing is debounced so a query only starts once the user pauses
+        self.members_search_timer = QTimer(self)
+        self.members_search_timer.setSingleShot(True)
+        self.members_search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.members_search_timer.timeout.connect(self.refresh_members_table)
         # Connect search and filter signals
-        self.members_search_bar.textChanged.connect(self.refresh_members_table)
+        self.members_search_bar.textChanged.connect(self.members_search_timer.start)
         self.members_sex_filter.currentIndexChanged.connect(self.refresh_members_table)
         self.members_group_filter.currentIndexChanged.connect(self.refresh_members_table)
         self.members_insurance_filter.currentIndexChanged.connect(self.refresh_members_table)
         self.refresh_members_table()
 
-        # Default section
-        self.switch_section('overview')
+    def build_transactions_section(self, layout):
+        table = QTableView()
+        self.transactions_model = TransactionsTableModel(self.db, table)
+        table.setModel(self.transactions_model)
+        table.setSelectionBehavior(QTableView.SelectRows)
+        table.setEditTriggers(QTableView.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.setLayoutDirection(Qt.RightToLeft)
+        table.setStyleSheet('font-size: 13pt;')
+        table.horizontalHeader().setStyleSheet(f'''
+            QHeaderView::section {{
+                background-color: {MATERIAL_PRIMARY};
+                color: white;
+                font-weight: bold;
+                font-size: 14pt;
+                border: none;
+                padding: 8px 0px;
+            }}
+        ''')
+        layout.addWidget(table)
+        self.transactions_table = table
 
     def switch_section(self, section):
         # Set all buttons to inactive
@@ -364,20 +652,26 @@ class MainWindow(QMainWindow):
             self.menu_buttons[section].set_active(True)
         elif section in self.submenu_buttons:
             self.submenu_buttons[section].set_active(True)
-        # Find the widget index for the section
-        widget = self.section_widgets.get(section)
-        if widget:
-            self.stack.setCurrentWidget(widget)
         self.active_section = section
+        # Before the database is ready only the buttons change; load_initial_data shows the section
+        if not self.database_ready:
+            return
+        # Find the widget for the section, building it on the first visit
+        widget = self.section_widgets.get(section) or self.build_section(section)
+        self.stack.setCurrentWidget(widget)
+        if section == 'overview':
+            self.overview_widget.update_snapshot(self.db.get_dashboard_snapshot())
+        elif section == 'transactions_history':
+            self.transactions_model.refresh()
 
     def open_add_member_dialog(self):
-        dialog = AddMemberDialog(self)
+        dialog = AddMemberDialog(self.db, self)
         if dialog.exec_() == QDialog.Accepted:
             data = dialog.get_data()
-            db = GymDB()
+            db = self.db
             # Find group_id and insurance_type_id
-            group_id = next((g['id'] for g in db.get_groups() if g['name'] == data['group']), None)
-            insurance_type_id = next((i['id'] for i in db.get_insurance_types() if i['name'] == data['insurance_type']), None)
+            group_id = db.get_group_id_by_name(data['group'])
+            insurance_type_id = db.get_insurance_type_id_by_name(data['insurance_type'])
             if group_id and insurance_type_id:
                 # Use default values for missing fields
                 db.add_member(
@@ -411,49 +705,39 @@ class MainWindow(QMainWindow):
     def back_to_members(self):
         self.stack.setCurrentWidget(self.section_widgets['members'])
 
+    def closeEvent(self, event):
+        # Invalidate and drop pending members queries before the connections go away
+        self.members_query_generation += 1
+        self.members_query_pool.clear()
+        self.members_query_pool.waitForDone()
+        self.db.close()
+        super().closeEvent(event)
+
+    def on_member_profile_clicked(self, index):
+        m = self.members_model.member_at(index.row())
+        self.show_member_profile(m['first_name'], m['last_name'])
+
     def refresh_members_table(self):
-        db = GymDB()
-        members = db.get_members()
-        # Sort by enrollment_date descending
-        members.sort(key=lambda m: m['enrollment_date'], reverse=True)
-        # Apply search and filters
-        search_text = self.members_search_bar.text().strip()
-        sex = self.members_sex_filter.currentText()
-        group = self.members_group_filter.currentText()
-        insurance = self.members_insurance_filter.currentText()
-        filtered = []
-        for m in members:
-            group_name = next((g['name'] for g in db.get_groups() if g['id'] == m['group_id']), '')
-            insurance_name = next((i['name'] for i in db.get_insurance_types() if i['id'] == m['insurance_type_id']), '')
-            row_data = [m['first_name'], m['last_name'], 'ذكر' if m['sex'] == 'M' else 'أنثى', group_name, insurance_name]
-            # Search by name
-            if search_text and not (search_text in m['first_name'] or search_text in m['last_name']):
-                continue
-            # Filter by sex
-            if sex != 'الجنس' and row_data[2] != sex:
-                continue
-            # Filter by group
-            if group != 'المجموعة' and row_data[3] != group:
-                continue
-            # Filter by insurance type
-            if insurance != 'نوع التأمين' and row_data[4] != insurance:
-                continue
-            filtered.append((m['first_name'], m['last_name'], *row_data))
-        self.members_table.setRowCount(len(filtered))
-        for row_idx, row_data in enumerate(filtered):
-            first_name, last_name, *table_row = row_data
-            # Eye icon button
-            btn = QPushButton()
-            btn.setIcon(self.EYE_ICON)
-            btn.setToolTip('عرض الملف الشخصي')
-            btn.setCursor(Qt.PointingHandCursor)
-            btn.setStyleSheet('border: none;')
-            btn.clicked.connect(lambda checked, fn=first_name, ln=last_name: self.show_member_profile(fn, ln))
-            self.members_table.setCellWidget(row_idx, 0, btn)
-            for col_idx, value in enumerate(table_row):
-                item = QTableWidgetItem(value)
-                item.setTextAlignment(Qt.AlignCenter)
-                self.members_table.setItem(row_idx, col_idx + 1, item)
+        # Search, filters and ordering are all applied by the database query, on the worker thread
+        self.members_search_timer.stop()
+        sex = {'ذكر': 'M', 'أنثى': 'F'}.get(self.members_sex_filter.currentText())
+        filters = dict(
+            search=self.members_search_bar.text().strip() or None,
+            sex=sex,
+            group_id=self.members_group_filter.currentData(),
+            insurance_type_id=self.members_insurance_filter.currentData(),
+            order_by='-enrollment_date'
+        )
+        # Bumping the generation makes any in-flight query abort; queued ones are dropped outright
+        self.members_query_generation += 1
+        self.members_query_pool.clear()
+        self.members_query_pool.start(MembersQueryWorker(
+            self.db, self.members_query_generation, lambda: self.members_query_generation, filters, self.members_query_signals
+        ))
+
+    def on_members_query_finished(self, generation, filters, result):
+        if generation == self.members_query_generation:
+            self.members_model.apply_result(filters, result)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
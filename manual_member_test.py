@@ -17,39 +17,30 @@ def random_date(start, end):
 
 db = GymDB()
 
-for i in range(40):
-    fn = random.choice(first_names)
-    ln = random.choice(last_names)
-    cin = f"CIN{1000+i}"
-    birth = random_date(date(1980, 1, 1), date(2015, 12, 31)).isoformat()
-    sex = random.choice(sexes)
-    phone = f"06{random.randint(10000000, 99999999)}"
-    address = random.choice(addresses)
-    enroll = random_date(date(2020, 1, 1), date.today()).isoformat()
-    group_id = random.choice(group_ids)
-    insurance_type_id = random.choice(insurance_type_ids)
-    ec_name = random.choice(first_names) + " " + random.choice(last_names)
-    ec_phone = f"06{random.randint(10000000, 99999999)}"
-    ec_rel = random.choice(relationships)
-    status = random.choice(["active", "archived"])
-    db.add_member(
-        first_name=fn,
-        last_name=ln,
-        cin=cin,
-        birth_date=birth,
-        sex=sex,
-        phone_number=phone,
-        address=address,
-        enrollment_date=enroll,
-        group_id=group_id,
-        insurance_type_id=insurance_type_id,
-        emergency_contact_name=ec_name,
-        emergency_contact_phone=ec_phone,
-        emergency_contact_relationship=ec_rel,
-        status=status
-    )
-
-print("Added 40 diverse members for testing.")
+def generate_members(count):
+    for i in range(count):
+        yield dict(
+            first_name=random.choice(first_names),
+            last_name=random.choice(last_names),
+            cin=f"CIN{1000+i}",
+            birth_date=random_date(date(1980, 1, 1), date(2015, 12, 31)).isoformat(),
+            sex=random.choice(sexes),
+            phone_number=f"06{random.randint(10000000, 99999999)}",
+            address=random.choice(addresses),
+            enrollment_date=random_date(date(2020, 1, 1), date.today()).isoformat(),
+            group_id=random.choice(group_ids),
+            insurance_type_id=random.choice(insurance_type_ids),
+            emergency_contact_name=random.choice(first_names) + " " + random.choice(last_names),
+            emergency_contact_phone=f"06{random.randint(10000000, 99999999)}",
+            emergency_contact_relationship=random.choice(relationships),
+            status=random.choice(["active", "archived"])
+        )
+
+report = db.bulk_add_members(generate_members(40))
+for error in report['errors']:
+    print(f"Row {error['index']}: {error['error']}")
+
+print(f"Added {report['inserted']} diverse members for testing.")
 
 
 
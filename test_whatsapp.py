@@ -1,4 +1,4 @@
-from database.models import send_whatsapp_reminders
+from database.messaging import send_whatsapp_reminders
 
 phone_numbers = [
     "212720735797",
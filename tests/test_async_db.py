@@ -0,0 +1,47 @@
+import asyncio
+import os
+import tempfile
+import threading
+from database.async_db import AsyncGymDB
+from database.models import GymDB
+
+def _fresh_path():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    GymDB(db_path=path).init_db()
+    return path
+
+def _member(cin):
+    return dict(
+        first_name='Ali', last_name='Bennani', cin=cin, birth_date='2000-01-01', sex='M', phone_number='0612345678',
+        address='-', enrollment_date='2024-01-15', group_id=1, insurance_type_id=1, emergency_contact_name='-',
+        emergency_contact_phone='-', emergency_contact_relationship='other'
+    )
+
+def test_async_facade_runs_every_call_on_one_connection():
+    path = _fresh_path()
+
+    async def scenario():
+        async with AsyncGymDB(path) as db:
+            ids = await db.gather(*(db.add_member(**_member(f'CIN{i}')) for i in range(5)))
+            assert all(ids)
+            await db.add_monthly_payment(ids[0], 200, '2024-03-05', 'March')
+            members, stats, unpaid = await db.gather(
+                db.query_members(limit=2), db.get_member_statistics(), db.get_unpaid_members_for_month(3, 2024)
+            )
+            assert members['total'] == 5 and len(members['members']) == 2
+            assert len(unpaid) == 4
+            rows = [m['cin'] async for m in db.iter_members(batch_size=2)]
+            assert rows == [f'CIN{i}' for i in range(5)]
+            assert db.payment_period('2024-01-03', 'December') == 202312
+            # Nothing ran on the event loop's thread: one connection, opened by the database thread
+            assert len(db.db._connections) == 1
+            thread = await db.run(threading.current_thread)
+            assert thread is not threading.current_thread()
+
+    asyncio.run(scenario())
+    os.remove(path)
+
+if __name__ == '__main__':
+    test_async_facade_runs_every_call_on_one_connection()
+    print('All tests passed!')
@@ -0,0 +1,38 @@
+import os
+import tempfile
+from benchmarks.compare import compare
+from benchmarks.seed import seed
+from benchmarks.suite import run_suite
+from database.models import GymDB
+
+def test_seed_is_reproducible():
+    with tempfile.TemporaryDirectory() as workdir:
+        first = seed(os.path.join(workdir, 'a.db'), members=30, seed=7)
+        second = seed(os.path.join(workdir, 'b.db'), members=30, seed=7)
+        assert first == second and first['monthly_payments'] > 0
+        with GymDB(os.path.join(workdir, 'a.db')) as a, GymDB(os.path.join(workdir, 'b.db')) as b:
+            assert a.get_monthly_payments() and [
+                (p['member_id'], p['payment_date']) for p in a.get_monthly_payments()
+            ] == [(p['member_id'], p['payment_date']) for p in b.get_monthly_payments()]
+
+def test_suite_covers_every_public_method():
+    # A new public GymDB method needs a case in benchmarks/suite.py (or an entry in SKIPPED)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'bench.db')
+        seed(path, members=30)
+        suite = run_suite(path, runs=1, gui=False)
+        assert suite['not_benchmarked'] == []
+        assert all(result['runs'] == 1 for result in suite['results'].values())
+
+def test_compare_flags_regressions_only_above_threshold_and_noise_floor():
+    before = {'results': {'fast': {'median_ms': 0.1}, 'slow': {'median_ms': 10.0}, 'gone': {'median_ms': 1.0}}}
+    after = {'results': {'fast': {'median_ms': 0.3}, 'slow': {'median_ms': 15.0}, 'new': {'median_ms': 1.0}}}
+    rows = {row[0]: row for row in compare(before, after, threshold=25, min_ms=1.0)}
+    assert rows['slow'][4] and not rows['fast'][4]
+    assert rows['gone'][2] is None and rows['new'][1] is None
+
+if __name__ == '__main__':
+    test_seed_is_reproducible()
+    test_suite_covers_every_public_method()
+    test_compare_flags_regressions_only_above_threshold_and_noise_floor()
+    print('All tests passed!')
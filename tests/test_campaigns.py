@@ -0,0 +1,127 @@
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from database.models import GymDB
+from database.messaging import FakeTransport
+from database.campaigns import normalize_phone, run_campaign
+
+
+def _member(db, cin, first_name, phone_number, group_id=1):
+    return db.add_member(first_name, 'Bennani', cin, '2010-01-01', 'M', phone_number, '-', '2024-01-01',
+                         group_id, 1, '-', '-', 'other')
+
+
+def test_normalize_phone_to_e164():
+    assert normalize_phone('06 12-34.56 78') == '+212612345678'
+    assert normalize_phone('+212 6 12 34 56 78') == '+212612345678'
+    assert normalize_phone('00212612345678') == '+212612345678'
+    assert normalize_phone('612345678') == '+212612345678'
+    assert normalize_phone('+33 6 12 34 56 78') == '+33612345678'
+    assert normalize_phone('-') is None and normalize_phone('12') is None
+
+
+def test_monthly_campaign_logs_dedupes_and_respects_cooldown():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(path)
+    db.init_db()
+    today = date.today()
+    ali = _member(db, 'C1', 'Ali', '0612345678')
+    sara = _member(db, 'C2', 'Sara', '+212 612 345 678', group_id=2)
+    paid = _member(db, 'C3', 'Omar', '0699999999')
+    nophone = _member(db, 'C4', 'Nadia', '-')
+    db.add_monthly_payment(paid, payment_date=today.isoformat(), period=today.year * 100 + today.month)
+    transport = FakeTransport()
+    summary = run_campaign(db, 'monthly', template='{name}: {amount:g} MAD', batch_size=1,
+                           transport_factory=lambda worker: transport)
+    assert (summary['targeted'], summary['messages'], summary['skipped']) == (3, 1, 1)
+    assert summary['status']['sent'] == 1
+    assert transport.sent == [('+212612345678', 'Ali Bennani & Sara Bennani: 220 MAD')]
+    log = {entry['member_id']: entry for entry in db.get_reminder_campaign_log(summary['run_id'])}
+    assert log[ali]['status'] == log[sara]['status'] == 'queued' and log[nophone]['status'] == 'skipped'
+    # Another run within the cooldown skips the members just reminded
+    again = run_campaign(db, 'monthly', run_id='second', transport_factory=lambda worker: transport)
+    assert (again['messages'], again['skipped']) == (0, 3)
+    db.close()
+    os.remove(path)
+
+
+def test_campaign_interrupted_while_queueing_is_resumed():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(path)
+    db.init_db()
+    ali = _member(db, 'C1', 'Ali', '0612345678')
+
+    def crash(run_id, jobs):
+        raise RuntimeError('crashed before the jobs were queued')
+    db.enqueue_reminder_jobs = crash
+    try:
+        run_campaign(db, 'monthly', run_id='resume', transport_factory=lambda worker: FakeTransport())
+        assert False, 'the crash should propagate'
+    except RuntimeError:
+        pass
+    # The log rows went with the jobs, so the member is planned again on the next run
+    assert [e for e in db.get_reminder_campaign_log('resume') if e['status'] == 'queued'] == []
+    del db.enqueue_reminder_jobs
+    transport = FakeTransport()
+    summary = run_campaign(db, 'monthly', run_id='resume', transport_factory=lambda worker: transport)
+    assert summary['status']['sent'] == 1 and transport.sent[0][0] == '+212612345678'
+    assert [e['member_id'] for e in db.get_reminder_campaign_log('resume') if e['status'] == 'queued'] == [ali]
+    db.close()
+    os.remove(path)
+
+
+def test_cooldown_only_counts_reminders_that_were_sent():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(path)
+    db.init_db()
+    ali = _member(db, 'C1', 'Ali', '0612345678')
+    _member(db, 'C2', 'Omar', '0699999999')
+    outage = FakeTransport(failures={'+212612345678': 'permanent'})
+    first = run_campaign(db, 'monthly', run_id='first', transport_factory=lambda worker: outage)
+    assert (first['status']['sent'], first['status']['failed']) == (1, 1)
+    transport = FakeTransport()
+    again = run_campaign(db, 'monthly', run_id='second', transport_factory=lambda worker: transport)
+    # Omar was reminded and is in his cooldown; Ali's reminder never went out
+    assert (again['messages'], again['skipped']) == (1, 1)
+    assert transport.sent[0][0] == '+212612345678'
+    assert db.get_recently_reminded_member_ids('monthly', datetime.now() - timedelta(days=1)) >= {ali}
+    db.close()
+    os.remove(path)
+
+
+def test_resumed_campaign_retries_failures_and_logs_only_queued_jobs():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(path)
+    db.init_db()
+    ali = _member(db, 'C1', 'Ali', '0612345678')
+    omar = _member(db, 'C2', 'Omar', '0699999999')
+    outage = FakeTransport(failures={'+212699999999': 'permanent'})
+    first = run_campaign(db, 'monthly', cooldown_days=0, transport_factory=lambda worker: outage)
+    assert first['run_id'].endswith(date.today().strftime('%Y%m%d'))
+    assert (first['status']['sent'], first['status']['failed']) == (1, 1)
+    # A sibling joins with Ali's phone: Ali's reminder already went out in this run
+    sara = _member(db, 'C3', 'Sara', '0612345678')
+    transport = FakeTransport()
+    again = run_campaign(db, 'monthly', cooldown_days=0, transport_factory=lambda worker: transport)
+    assert again['run_id'] == first['run_id']
+    assert (again['targeted'], again['messages'], again['skipped']) == (2, 1, 1)
+    assert [number for number, _ in transport.sent] == ['+212699999999']
+    assert again['status'] == {'pending': 0, 'sending': 0, 'sent': 2, 'failed': 0}
+    log = db.get_reminder_campaign_log(first['run_id'])
+    assert [(e['member_id'], e['status']) for e in log if e['member_id'] == sara] == [(sara, 'skipped')]
+    assert [e['member_id'] for e in log if e['status'] == 'queued'] == [ali, omar, omar]
+    db.close()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    test_normalize_phone_to_e164()
+    test_monthly_campaign_logs_dedupes_and_respects_cooldown()
+    test_campaign_interrupted_while_queueing_is_resumed()
+    test_cooldown_only_counts_reminders_that_were_sent()
+    test_resumed_campaign_retries_failures_and_logs_only_queued_jobs()
+    print('All tests passed!')
@@ -0,0 +1,18 @@
+import os
+import tempfile
+from benchmarks.concurrency import stress
+from benchmarks.seed import seed
+
+def test_concurrent_reader_and_writer_processes_never_hit_locks():
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'stress.db')
+        seed(path, members=50)
+        report = stress(path, readers=2, writers=2, seconds=1.0)
+        assert report['journal_mode'] == 'wal'
+        for role in ('readers', 'writers'):
+            assert report[role]['operations'] > 0
+            assert report[role]['errors'] == 0, report[role]['first_error']
+
+if __name__ == '__main__':
+    test_concurrent_reader_and_writer_processes_never_hit_locks()
+    print('All tests passed!')
@@ -0,0 +1,33 @@
+import csv
+import os
+import tempfile
+from database.models import GymDB
+from database.exporter import export
+
+
+def test_export_payments_to_csv_streams_date_range():
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(db_path)
+    db.init_db()
+    member_id = db.add_member('Ali', 'Bennani', 'CIN1', '2000-01-01', 'M', '0612345678', '-', '2023-01-01',
+                              1, 1, '-', '-', 'other')
+    db.bulk_add_monthly_payments(
+        {'member_id': member_id, 'amount': 120, 'payment_date': f'2023-{m:02d}-05', 'month': str(m)} for m in range(1, 13)
+    )
+    db.add_monthly_payment(member_id, amount=99.5, payment_date='2024-01-05', month='January')
+    fd, out_path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    count = export(db, 'monthly_payments', out_path, 'csv', since='2023-06-01', until='2023-12-31', batch_size=4)
+    with open(out_path, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    assert count == len(rows) == 7
+    assert rows[0]['payment_date'] == '2023-06-05' and rows[0]['first_name'] == 'Ali'
+    db.close()
+    for path in (db_path, out_path):
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    test_export_payments_to_csv_streams_date_range()
+    print('All tests passed!')
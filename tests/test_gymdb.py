@@ -1,6 +1,38 @@
 import os
+import shutil
 import sqlite3
+import tempfile
+import threading
 from database.models import GymDB
+from database.migrations import LATEST_VERSION
+
+def _fresh_db():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(db_path=path)
+    db.init_db()
+    db.add_other_payments_table()
+    return db, path
+
+def _add_member(db, **overrides):
+    data = dict(
+        first_name='Ali', last_name='Bennani', cin='CIN1', birth_date='2000-01-01', sex='M',
+        phone_number='0612345678', address='-', enrollment_date='2024-01-15', group_id=1,
+        insurance_type_id=1, emergency_contact_name='-', emergency_contact_phone='-',
+        emergency_contact_relationship='other', status='active'
+    )
+    data.update(overrides)
+    return db.add_member(**data)
+
+def _unmigrated_copy():
+    # The tracked sample database, created before versioned migrations
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    shutil.copy(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gym_payments.db'), path)
+    with sqlite3.connect(path) as conn:
+        conn.execute('PRAGMA user_version = 0')
+    conn.close()
+    return path
 
 def test_groups_crud():
     db = GymDB(db_path='test_gym_payments.db')
@@ -39,7 +71,473 @@ def test_insurance_types_crud():
     assert db.delete_insurance_type(ins_id)
     assert not any(i['id'] == ins_id for i in db.get_insurance_types())
 
+def test_connection_is_reused_per_thread():
+    db, path = _fresh_db()
+    with db:
+        assert db._connect() is db._connect()
+        other = []
+        t = threading.Thread(target=lambda: other.append(db._connect()))
+        t.start()
+        t.join()
+        assert other[0] is not db._connect()
+        # The thread has ended, so its connection is closed and forgotten
+        assert db._connections == [db._connect()]
+        try:
+            other[0].execute('SELECT 1')
+            assert False, 'the finished thread\'s connection should be closed'
+        except sqlite3.ProgrammingError:
+            pass
+        db.add_group('Reuse Group', 10)
+    # The connections are closed on exit; the next call reconnects transparently
+    assert any(g['name'] == 'Reuse Group' for g in db.get_groups())
+    db.close()
+    os.remove(path)
+
+def test_close_returns_with_connections_open_in_other_threads():
+    db, path = _fresh_db()
+    db.close()
+    result = []
+
+    def use_and_close():
+        with GymDB(db_path=path) as other:
+            other.get_groups()
+            t = threading.Thread(target=other.get_groups)
+            t.start()
+            t.join()
+            threading.Thread(target=lambda: (other.get_groups(), threading.Event().wait(0.5))).start()
+        result.append('closed')
+    closer = threading.Thread(target=use_and_close, daemon=True)
+    closer.start()
+    closer.join(10)
+    assert result == ['closed'], 'close() hung'
+    os.remove(path)
+
+def test_members_with_details_joins_names():
+    db, path = _fresh_db()
+    member_id = _add_member(db, group_id=2, insurance_type_id=3)
+    member = [m for m in db.get_members_with_details() if m['id'] == member_id][0]
+    assert member['group_name'] == 'Wushu-Sanda Children'
+    assert member['insurance_type_name'] == 'Full-contact & Wushu'
+    db.close()
+    os.remove(path)
+
+def test_query_members_filters_sorts_and_pages():
+    db, path = _fresh_db()
+    _add_member(db, first_name='Sara', sex='F', enrollment_date='2024-03-01')
+    _add_member(db, first_name='Salma', sex='F', enrollment_date='2024-05-01', group_id=2)
+    _add_member(db, first_name='Omar', sex='M', enrollment_date='2024-04-01')
+    result = db.query_members(search='Sa', sex='F', order_by='-enrollment_date', limit=1)
+    assert result['total'] == 2
+    assert [m['first_name'] for m in result['members']] == ['Salma']
+    assert result['members'][0]['group_name'] == 'Wushu-Sanda Children'
+    assert [m['first_name'] for m in db.query_members(search='Sa', offset=1, limit=1)['members']] == ['Sara']
+    assert db.query_members(group_id=2, offset=5)['total'] == 1
+    assert db.query_members(search='%')['total'] == 0
+    db.close()
+    os.remove(path)
+
+def test_migrate_upgrades_existing_database_in_place():
+    db, path = _fresh_db()
+    member_id = _add_member(db)
+    # Simulate a database created before versioned migrations existed
+    with sqlite3.connect(path) as conn:
+        conn.execute('DROP INDEX idx_monthly_payments_member_month')
+        conn.execute('PRAGMA user_version = 0')
+    conn.close()
+    assert db.migrate() == LATEST_VERSION
+    assert db.get_member_by_id(member_id) is not None
+    plan = db._connect().execute(
+        'EXPLAIN QUERY PLAN SELECT 1 FROM monthly_payments WHERE member_id = ? AND month = ?', (member_id, 'July')
+    ).fetchall()
+    assert any('COVERING INDEX' in row[3] for row in plan)
+    assert db.migrate() == LATEST_VERSION
+    db.close()
+    os.remove(path)
+
+
+def test_rollup_reads_migrate_an_old_database_first():
+    path = _unmigrated_copy()
+    db = GymDB(db_path=path)
+    coverage = db.get_monthly_payment_coverage()
+    assert coverage['active_members'] == db.get_member_statistics()['active']
+    assert db.get_unpaid_insurance_count()['unpaid_members'] == len(db.get_unpaid_insurance_members())
+    assert db.get_dashboard_snapshot()['monthly_payment_coverage'] == coverage
+    assert not any(db.rebuild_payment_summaries(verify_only=True).values())
+    assert db._connect().execute('PRAGMA user_version').fetchone()[0] == LATEST_VERSION
+    db.close()
+    os.remove(path)
+
+
+def test_monthly_payments_work_on_an_old_database():
+    path = _unmigrated_copy()
+    db = GymDB(db_path=path)
+    member_id = db.get_members()[0]['id']
+    before = len(db.get_all_payments_for_member(member_id))
+    payment_id = db.add_monthly_payment(member_id, 200, '2024-03-05', 'March')
+    assert payment_id is not None
+    assert db.get_monthly_payment_by_id(payment_id)['period'] == 202403
+    assert len(db.get_all_payments_for_member(member_id)) == before + 1
+    assert member_id not in [m['id'] for m in db.get_unpaid_members_for_month(3, 2024)]
+    db.close()
+    os.remove(path)
+
+def test_cancellable_interrupts_running_query():
+    db, path = _fresh_db()
+    for i in range(50):
+        _add_member(db, cin=f'CIN{i}')
+    try:
+        with db.cancellable(lambda: True):
+            db.query_members(search='Ali')
+        assert False, 'query should have been interrupted'
+    except sqlite3.OperationalError as e:
+        assert 'interrupted' in str(e)
+    # The handler is removed once the block exits
+    assert db.query_members(search='Ali')['total'] == 50
+    db.close()
+    os.remove(path)
+
+def test_dashboard_snapshot_counts_active_members_only():
+    import calendar
+    from datetime import date
+    db, path = _fresh_db()
+    today = date.today()
+    paid = _add_member(db, enrollment_date=today.isoformat())
+    _add_member(db, cin='CIN2', enrollment_date='2020-01-01')
+    archived = _add_member(db, cin='CIN3', status='archived')
+    db.add_monthly_payment(paid, month=calendar.month_name[today.month])
+    db.add_monthly_payment(archived, month=calendar.month_name[today.month])
+    db.add_insurance_payment(archived)
+    snapshot = db.get_dashboard_snapshot()
+    assert snapshot['members'] == {'active': 2, 'archived': 1, 'total': 3, 'active_ratio': '2/3'}
+    assert snapshot['monthly_payment_coverage']['paid_members'] == 1
+    assert snapshot['monthly_payment_coverage']['percentage'] == 50
+    assert snapshot['unpaid_insurance']['unpaid_members'] == 2
+    assert snapshot['new_members_this_month'] == 1
+    db.close()
+    os.remove(path)
+
+def test_payment_summaries_follow_payment_changes():
+    db, path = _fresh_db()
+    a = _add_member(db)
+    b = _add_member(db, cin='CIN2')
+    p1 = db.add_monthly_payment(a, amount=100, payment_date='2024-03-05', month='March')
+    db.add_monthly_payment(a, amount=50, payment_date='2024-03-05', month='March')
+    p3 = db.add_monthly_payment(b, amount=120, payment_date='2024-03-05', month='March')
+    ins = db.add_insurance_payment(b, amount=150)
+    db.add_other_payment(a, 30, '2024-03-02', 'gloves')
+    db.update_monthly_payment(p3, month='April')
+    db.delete_monthly_payment(p1)
+    db.update_insurance_payment(ins, member_id=a)
+    conn = db._connect()
+    assert dict(conn.execute("SELECT * FROM period_payment_summary WHERE period = 202403").fetchone()) == \
+        {'period': 202403, 'paid_members': 1, 'payment_count': 1, 'total_amount': 50}
+    summary = dict(conn.execute('SELECT * FROM member_payment_summary WHERE member_id = ?', (a,)).fetchone())
+    assert (summary['monthly_total'], summary['insurance_count'], summary['other_total']) == (50, 1, 30)
+    assert set(db.rebuild_payment_summaries(verify_only=True).values()) == {0}
+    # Drift is reported, then repaired by a rebuild
+    conn.execute("UPDATE period_payment_summary SET paid_members = 7")
+    conn.commit()
+    assert db.rebuild_payment_summaries()['period_payment_summary'] > 0
+    assert set(db.rebuild_payment_summaries(verify_only=True).values()) == {0}
+    db.close()
+    os.remove(path)
+
+def test_bulk_add_reports_per_row_errors():
+    db, path = _fresh_db()
+    member = dict(
+        first_name='Ali', last_name='Bennani', cin='CIN1', birth_date='2000-01-01', sex='M',
+        phone_number='0612345678', address='-', enrollment_date='2024-01-15', group_id=1, insurance_type_id=1,
+        emergency_contact_name='-', emergency_contact_phone='-', emergency_contact_relationship='other'
+    )
+    rows = [dict(member, cin=f'CIN{i}') for i in range(7)]
+    rows[2]['group_id'] = 99
+    rows[4]['sex'] = 'X'
+    report = db.bulk_add_members(iter(rows), chunk_size=3)
+    assert report['inserted'] == 5
+    assert [e['index'] for e in report['errors']] == [2, 4]
+    ids = [m['id'] for m in db.get_members()]
+    report = db.bulk_add_monthly_payments([
+        {'member_id': ids[0], 'month': 'March'},
+        {'member_id': 999, 'amount': 10},
+        {'member_id': ids[1], 'amount': 80, 'payment_date': '2024-03-05', 'month': 'March'},
+    ])
+    assert report['inserted'] == 2 and [e['index'] for e in report['errors']] == [1]
+    assert sorted(p['amount'] for p in db.get_monthly_payments()) == [80, 120]
+    assert db.bulk_add_insurance_payments([{'member_id': ids[0]}])['inserted'] == 1
+    report = db.bulk_add_other_payments([{'member_id': ids[0], 'amount': 30, 'payment_date': '2024-03-01'}])
+    assert report['inserted'] == 0 and 'transaction_type' in report['errors'][0]['error']
+    assert set(db.rebuild_payment_summaries(verify_only=True).values()) == {0}
+    db.close()
+    os.remove(path)
+
+def test_transactions_ledger_pages_by_cursor():
+    db, path = _fresh_db()
+    a = _add_member(db)
+    b = _add_member(db, cin='CIN2', first_name='Sara')
+    # Same id (1) in two tables and several payments on one date, so paging relies on the (date, kind, id) cursor
+    db.add_monthly_payment(a, amount=100, payment_date='2024-03-01', month='March')
+    db.add_insurance_payment(b, amount=150, payment_date='2024-03-01')
+    db.add_other_payment(a, 30, '2024-03-01', 'gloves')
+    db.add_monthly_payment(b, amount=120, payment_date='2024-02-01', month='February')
+    db.add_monthly_payment(a, amount=100, payment_date='2024-04-01', month='April')
+    everything = list(db.iter_transactions())
+    assert [(t['payment_date'], t['kind']) for t in everything] == [
+        ('2024-04-01', 'monthly'), ('2024-03-01', 'other'), ('2024-03-01', 'monthly'),
+        ('2024-03-01', 'insurance'), ('2024-02-01', 'monthly')]
+    assert everything[1]['payment_type'] == 'gloves' and everything[3]['first_name'] == 'Sara'
+    pages, cursor = [], None
+    while True:
+        page = list(db.iter_transactions(after_cursor=cursor, limit=2))
+        if not page:
+            break
+        pages.append(page)
+        cursor = page[-1]['cursor']
+    assert [len(p) for p in pages] == [2, 2, 1]
+    assert [t['cursor'] for p in pages for t in p] == [t['cursor'] for t in everything]
+    assert [t['amount'] for t in db.iter_transactions(member_id=a, kind='monthly', since='2024-03-01')] == [100, 100]
+    assert [(p['payment_date'], p['payment_type']) for p in db.get_all_payments_for_member(a)] == [
+        ('2024-03-01', 'monthly'), ('2024-03-01', 'gloves'), ('2024-04-01', 'monthly')]
+    db.close()
+    os.remove(path)
+
+def test_monthly_payments_are_keyed_by_year_and_month():
+    db, path = _fresh_db()
+    a = _add_member(db)
+    b = _add_member(db, cin='CIN2')
+    db.add_monthly_payment(a, amount=100, payment_date='2023-03-02', month='March')
+    db.add_monthly_payment(b, amount=100, payment_date='2024-03-04', month='March')
+    late = db.add_monthly_payment(a, amount=100, payment_date='2024-01-03', month='December')
+    # Rows written without a period (older code, raw SQL) get one from the trigger
+    conn = db._connect()
+    conn.execute("INSERT INTO monthly_payments (member_id, amount, payment_date, month) VALUES (?, 80, '2024-04-01', 'April')", (b,))
+    conn.commit()
+    assert [p['period'] for p in db.get_monthly_payments()] == [202303, 202403, 202312, 202404]
+    assert [m['id'] for m in db.get_unpaid_members_for_month(3, year=2024)] == [a]
+    assert db.get_monthly_payment_coverage(202303)['paid_members'] == 1
+    assert [p['id'] for p in db.iter_monthly_payments(start_period=202312, end_period=202403)] == [2, late]
+    assert [(t['period'], t['total_amount']) for t in db.get_period_payment_totals(202301, 202412)] == \
+        [(202303, 100), (202312, 100), (202403, 100), (202404, 80)]
+    db.update_monthly_payment(late, month='2024-02-01')
+    assert db.get_monthly_payment_by_id(late)['period'] == 202402
+    assert set(db.rebuild_payment_summaries(verify_only=True).values()) == {0}
+    db.close()
+    os.remove(path)
+
+def test_backdated_payment_without_month_uses_its_date():
+    db, path = _fresh_db()
+    member_id = _add_member(db)
+    payment_id = db.add_monthly_payment(member_id, 200, '2024-03-05')
+    payment = db.get_monthly_payment_by_id(payment_id)
+    assert (payment['month'], payment['period']) == ('March', 202403)
+    result = db.bulk_add_monthly_payments([
+        {'member_id': member_id, 'amount': 200, 'payment_date': '2023-11-20'},
+        {'member_id': member_id, 'amount': 200, 'payment_date': 'not a date'},
+    ])
+    assert [e['index'] for e in result['errors']] == [1]
+    payments = sorted((p['period'], p['month']) for p in db.get_monthly_payments())
+    assert payments == [(202311, 'November'), (202403, 'March')]
+    assert member_id not in [m['id'] for m in db.get_unpaid_members_for_month(3, 2024)]
+    db.close()
+    os.remove(path)
+
+def test_reference_cache_is_invalidated_by_writes_and_other_connections():
+    db, path = _fresh_db()
+    lookups = []
+    db._connect().set_trace_callback(lambda sql: lookups.append(sql) if 'FROM groups' in sql else None)
+    assert db.get_group_id_by_name('Cross-Fit') == 1
+    assert db.get_group_name_by_id(2) == 'Wushu-Sanda Children'
+    db.get_groups()
+    assert len(lookups) == 1
+    # Writes through GymDB invalidate the cache
+    kids = db.add_group('Kids', 80)
+    assert db.get_group_name_by_id(kids) == 'Kids' and len(lookups) == 2
+    # So do commits from another connection, seen through PRAGMA data_version
+    with sqlite3.connect(path) as other:
+        other.execute("UPDATE insurance_types SET name = 'Private' WHERE name = 'private'")
+    other.close()
+    assert db.get_insurance_type_id_by_name('Private') == 4
+    assert db.get_insurance_type_id_by_name('private') is None
+    db.close()
+    os.remove(path)
+
+def test_unpaid_queries_skip_archived_members_and_respect_as_of():
+    db, path = _fresh_db()
+    paid = _add_member(db, cin='P1')
+    late = _add_member(db, cin='L1')
+    unpaid = _add_member(db, cin='U1')
+    archived = _add_member(db, cin='A1')
+    newcomer = _add_member(db, cin='N1', enrollment_date='2024-03-20')
+    db.add_monthly_payment(paid, 200, '2024-03-05', 'March')
+    db.add_monthly_payment(late, 200, '2024-03-25', 'March')
+    for member_id in (paid, archived):
+        db.add_insurance_payment(member_id, 150, '2024-03-05')
+    db.update_member(archived, status='archived')
+    assert [m['id'] for m in db.get_unpaid_members_for_month(3, 2024)] == [unpaid, newcomer]
+    assert [m['id'] for m in db.get_unpaid_insurance_members()] == [late, unpaid, newcomer]
+    # The archived member's insurance payment no longer hides an active unpaid member
+    assert db.get_unpaid_insurance_count()['unpaid_members'] == 3
+    # As of March 10th the late payer had not paid yet and N1 was not enrolled yet
+    assert [m['cin'] for m in db.get_unpaid_members_as_of('2024-03-10')] == ['L1', 'U1']
+    assert [m['cin'] for m in db.get_unpaid_members_as_of('2024-03-31')] == ['U1', 'N1']
+    assert [m['cin'] for m in db.get_unpaid_members_as_of('2024-03-01', kind='insurance')] == ['P1', 'L1', 'U1']
+    db.close()
+    os.remove(path)
+
+def test_writes_wait_for_another_writer_instead_of_failing():
+    db, path = _fresh_db()
+    assert db._connect().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    # No busy timeout at all: only the retries with backoff keep the write from failing
+    impatient = GymDB(db_path=path, busy_timeout=0)
+    other = sqlite3.connect(path, check_same_thread=False)
+    other.execute('BEGIN IMMEDIATE')
+    releaser = threading.Timer(0.2, other.commit)
+    releaser.start()
+    group_id = impatient.add_group('Night Boxing', 150)
+    releaser.join()
+    assert group_id and db.get_group_name_by_id(group_id) == 'Night Boxing'
+    # A write that fails inside the transaction leaves nothing behind
+    assert _add_member(impatient, group_id=999) is None
+    assert not impatient._connect().in_transaction
+    other.close()
+    impatient.close()
+    db.close()
+    os.remove(path)
+
+def test_transaction_groups_writes_into_one_commit():
+    db, path = _fresh_db()
+    commits = []
+    db._connect().set_trace_callback(lambda sql: commits.append(sql) if sql.startswith('COMMIT') else None)
+    with db.transaction():
+        member_id = _add_member(db, cin='T1')
+        db.add_monthly_payment(member_id, 200, '2024-03-05', 'March')
+        db.add_insurance_payment(member_id, 150, '2024-03-05')
+        # A failing call inside only undoes its own savepoint
+        assert db.add_monthly_payment(9999, 200, '2024-03-05') is None
+    assert len(commits) == 1
+    assert len(db.get_all_payments_for_member(member_id)) == 2
+    # An exception rolls back the whole group, nested blocks included
+    try:
+        with db.transaction():
+            _add_member(db, cin='T2')
+            with db.transaction():
+                db.add_group('Rolled back', 10)
+            raise RuntimeError('abort')
+    except RuntimeError:
+        pass
+    assert db.get_member_ids_by_cin(['T2']) == {}
+    assert db.get_group_id_by_name('Rolled back') is None
+    # A nested block that raises is undone on its own
+    with db.transaction():
+        _add_member(db, cin='T3')
+        try:
+            with db.transaction():
+                _add_member(db, cin='T4')
+                raise RuntimeError('undo T4 only')
+        except RuntimeError:
+            pass
+    assert set(db.get_member_ids_by_cin(['T3', 'T4'])) == {'T3'}
+    db.close()
+    os.remove(path)
+
+
+def test_reads_inside_transaction_do_not_commit_it():
+    db, path = _fresh_db()
+    member_id = _add_member(db, cin='R1')
+    payment_id = db.add_monthly_payment(member_id, 200, '2024-03-05', 'March')
+    try:
+        with db.transaction():
+            db.add_monthly_payment(member_id, 200, '2024-04-05', 'April')
+            assert db.get_member_by_id(member_id)['cin'] == 'R1'
+            assert db.query_members()['total'] == 1
+            db.get_dashboard_snapshot()
+            # Reads the payment back internally before updating it
+            assert db.update_monthly_payment(payment_id, month='May')
+            assert db.delete_group(db.add_group('Temporary', 10))
+            _add_member(db, cin='R2')
+            raise RuntimeError('abort')
+    except RuntimeError:
+        pass
+    assert [p['month'] for p in db.get_monthly_payments()] == ['March']
+    assert db.get_member_ids_by_cin(['R2']) == {}
+    db.close()
+    os.remove(path)
+
+
+def test_updates_reuse_one_statement_per_column_set():
+    db, path = _fresh_db()
+    member_id = _add_member(db, cin='U1')
+    assert db.update_member(member_id, address='A', phone_number='1')
+    assert db.update_member(member_id, phone_number='2', address='B')
+    # Unknown and excluded keys are dropped, never spliced into the SQL
+    assert db.update_member(member_id, address='C', id=5, nickname='x')
+    assert db.update_member(9999, address='D') is False
+    assert sorted(sql for sql, _ in db._update_statements.values()) == [
+        'UPDATE members SET address = ? WHERE id = ?',
+        'UPDATE members SET address = ?, phone_number = ? WHERE id = ?',
+    ]
+    member = db.get_member_by_id(member_id)
+    assert (member['address'], member['phone_number']) == ('C', '2')
+    try:
+        db._update_statement('members', ['address', 'id'])
+        assert False, 'id must not be updatable'
+    except ValueError:
+        pass
+    db.close()
+    os.remove(path)
+
+
+def test_bulk_update_and_archive_members_in_one_statement():
+    db, path = _fresh_db()
+    adults = db.add_group('Adults', 250)
+    child = _add_member(db, cin='C1', birth_date='2012-05-01')
+    teen = _add_member(db, cin='C2', birth_date='2007-05-01')
+    adult = _add_member(db, cin='C3', birth_date='1990-05-01', group_id=adults)
+    updates = []
+    db._connect().set_trace_callback(lambda sql: updates.append(sql) if sql.lstrip().startswith('UPDATE') else None)
+    assert db.bulk_update_members({'group_id': 1, 'born_before': '2008-09-01'}, group_id=adults) == [teen]
+    assert len(updates) == 1
+    assert db.bulk_update_members({'ids': [child, adult]}, address='New street', id=99) == [child, adult]
+    assert db.get_member_by_id(adult)['address'] == 'New street'
+    # Refused: no filter, unknown or empty filter keys, nothing to set, a missing group
+    assert db.bulk_update_members({}, address='x') == []
+    assert db.bulk_update_members({'nickname': 'x'}, address='x') == []
+    assert db.bulk_update_members({'search': ''}, address='x') == []
+    assert db.bulk_update_members({'sex': None, 'group_id': None}, address='x') == []
+    assert db.bulk_update_members({'ids': [child]}, nickname='x') == []
+    assert db.bulk_update_members({'ids': [child]}, group_id=9999) == []
+    assert db.get_member_by_id(child)['group_id'] == 1
+    # Paid recently, paid only before the cut-off, enrolled after it
+    db.add_other_payment(child, 50, '2024-06-01', 'equipment')
+    db.add_monthly_payment(teen, 200, '2024-01-05', 'January')
+    newcomer = _add_member(db, cin='C4', enrollment_date='2024-05-10')
+    assert db.archive_members_without_payment_since('2024-03-01') == [teen, adult]
+    assert db.get_member_by_id(newcomer)['status'] == 'active'
+    assert db.archive_members_without_payment_since('2024-03-01') == []
+    db.close()
+    os.remove(path)
+
 if __name__ == '__main__':
     test_groups_crud()
     test_insurance_types_crud()
+    test_connection_is_reused_per_thread()
+    test_close_returns_with_connections_open_in_other_threads()
+    test_members_with_details_joins_names()
+    test_query_members_filters_sorts_and_pages()
+    test_migrate_upgrades_existing_database_in_place()
+    test_rollup_reads_migrate_an_old_database_first()
+    test_monthly_payments_work_on_an_old_database()
+    test_cancellable_interrupts_running_query()
+    test_dashboard_snapshot_counts_active_members_only()
+    test_payment_summaries_follow_payment_changes()
+    test_bulk_add_reports_per_row_errors()
+    test_transactions_ledger_pages_by_cursor()
+    test_monthly_payments_are_keyed_by_year_and_month()
+    test_backdated_payment_without_month_uses_its_date()
+    test_reference_cache_is_invalidated_by_writes_and_other_connections()
+    test_unpaid_queries_skip_archived_members_and_respect_as_of()
+    test_writes_wait_for_another_writer_instead_of_failing()
+    test_transaction_groups_writes_into_one_commit()
+    test_reads_inside_transaction_do_not_commit_it()
+    test_updates_reuse_one_statement_per_column_set()
+    test_bulk_update_and_archive_members_in_one_statement()
     print('All tests passed!') 
\ No newline at end of file
@@ -0,0 +1,102 @@
+import os
+import tempfile
+from database.models import GymDB
+from database.importer import import_file
+
+MEMBERS_CSV = '''first_name,last_name,cin,birth_date,sex,phone_number,address,enrollment_date,group,insurance_type,emergency_contact_relationship
+Ali,Bennani,AB1,2001-02-03,ذكر,0611111111,-,2024-01-10,Cross-Fit,Wushu-Sanda,père
+Sara,Alaoui,AB2,2005-06-07,Femme,0622222222,-,2024-02-11,ووشو أطفال,privé,أم
+Ali,Bennani,AB1,2001-02-03,M,0611111111,-,2024-01-10,Cross-Fit,Wushu-Sanda,father
+Omar,Naciri,AB3,1999-09-09,?,0633333333,-,2024-03-12,Cross-Fit,Wushu-Sanda,other
+'''
+
+LEDGER_CSV = '''cin,amount,payment_date,month
+AB1,120,2024-01-10,January
+AB2,,2024-02-11,February
+ZZ9,100,2024-02-11,February
+'''
+
+
+def _write(content):
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    return path
+
+
+def test_import_members_and_ledger_from_csv():
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(db_path)
+    db.init_db()
+    members_path = _write(MEMBERS_CSV)
+    ledger_path = _write(LEDGER_CSV)
+    state = import_file(db, members_path, 'members', batch_size=2)
+    # Duplicate cin is skipped, the unknown sex label is reported
+    assert (state['inserted'], state['skipped'], state['errors']) == (2, 1, 1)
+    sara = [m for m in db.get_members_with_details() if m['cin'] == 'AB2'][0]
+    assert (sara['sex'], sara['group_name'], sara['insurance_type_name']) == ('F', 'Wushu-Sanda Children', 'private')
+    assert sara['emergency_contact_relationship'] == 'mother'
+    assert db.get_import_checkpoint(os.path.abspath(members_path)) is None
+    state = import_file(db, ledger_path, 'monthly')
+    assert (state['inserted'], state['errors']) == (2, 1)
+    # Missing amount falls back to the member's group fee
+    assert sorted(p['amount'] for p in db.get_monthly_payments()) == [100, 120]
+    db.close()
+    for path in (db_path, members_path, ledger_path):
+        os.remove(path)
+
+
+def test_import_resumes_from_checkpoint():
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(db_path)
+    db.init_db()
+    members_path = _write(MEMBERS_CSV)
+    # Pretend an earlier run committed the first two rows before failing
+    db.save_import_checkpoint(os.path.abspath(members_path), {'rows_done': 2, 'inserted': 2, 'skipped': 0, 'errors': 0})
+    state = import_file(db, members_path, 'members')
+    assert state['rows_done'] == 4 and state['inserted'] == 3
+    assert [m['cin'] for m in db.get_members()] == ['AB1']
+    db.close()
+    for path in (db_path, members_path):
+        os.remove(path)
+
+
+def test_batch_and_checkpoint_commit_together():
+    fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(db_path)
+    db.init_db()
+    db.add_member('Ali', 'Bennani', 'AB1', '2001-02-03', 'M', '0611111111', '-', '2024-01-10', 1, 1, '-', '-', 'other')
+    ledger_path = _write('cin,amount,payment_date\n' + ''.join(f'AB1,100,2024-0{m}-05\n' for m in range(1, 7)))
+    save = db.save_import_checkpoint
+    saved = []
+
+    def crash_on_second_batch(name, state):
+        if saved:
+            raise RuntimeError('crashed while saving the checkpoint')
+        saved.append(state)
+        save(name, state)
+    db.save_import_checkpoint = crash_on_second_batch
+    try:
+        import_file(db, ledger_path, 'monthly', batch_size=2)
+        assert False, 'the crash should propagate'
+    except RuntimeError:
+        pass
+    # The second batch went away with its checkpoint
+    assert len(db.get_monthly_payments()) == 2
+    del db.save_import_checkpoint
+    state = import_file(db, ledger_path, 'monthly', batch_size=2)
+    assert (state['rows_done'], state['inserted']) == (6, 6)
+    assert sorted(p['period'] for p in db.get_monthly_payments()) == [202401, 202402, 202403, 202404, 202405, 202406]
+    db.close()
+    for path in (db_path, ledger_path):
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    test_import_members_and_ledger_from_csv()
+    test_import_resumes_from_checkpoint()
+    test_batch_and_checkpoint_commit_together()
+    print('All tests passed!')
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from database.models import GymDB
+from database.messaging import FakeTransport, ReminderDispatcher
+
+
+def _fresh_db():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    db = GymDB(path)
+    db.migrate()
+    return db, path
+
+
+def test_dispatcher_retries_and_records_each_number():
+    db, path = _fresh_db()
+    numbers = [f'2126000000{i:02d}' for i in range(10)]
+    transport = FakeTransport({numbers[1]: 2, numbers[2]: 'permanent', numbers[3]: 5})
+    dispatcher = ReminderDispatcher(db, lambda worker: transport, workers=3, max_attempts=3, backoff=0.01)
+    assert dispatcher.enqueue('run-1', numbers, 'Reminder') == 10
+    assert dispatcher.run('run-1') == {'pending': 0, 'sending': 0, 'sent': 8, 'failed': 2}
+    assert transport.sessions == 3
+    assert sorted(n for n, _ in transport.sent) == sorted(set(numbers) - {numbers[2], numbers[3]})
+    jobs = {job['phone_number']: job for job in db.get_reminder_jobs('run-1')}
+    assert (jobs[numbers[1]]['status'], jobs[numbers[1]]['attempts']) == ('sent', 3)
+    assert (jobs[numbers[2]]['status'], jobs[numbers[2]]['attempts']) == ('failed', 1)
+    assert (jobs[numbers[3]]['status'], jobs[numbers[3]]['attempts']) == ('failed', 3)
+    db.close()
+    os.remove(path)
+
+
+def test_interrupted_run_resumes_without_resending():
+    db, path = _fresh_db()
+    numbers = ['212600000001', '212600000002', '212600000003']
+    dispatcher = ReminderDispatcher(db, lambda worker: transport, workers=2)
+    dispatcher.enqueue('run-2', numbers, 'Reminder')
+    # First run stopped after one message was sent and another was in flight
+    db.finish_reminder_job(db.claim_reminder_job('run-2')['id'])
+    db.claim_reminder_job('run-2')
+    transport = FakeTransport()
+    # Enqueueing the same run again adds nothing
+    assert dispatcher.enqueue('run-2', numbers, 'Reminder') == 0
+    assert dispatcher.run('run-2')['sent'] == 3
+    assert sorted(n for n, _ in transport.sent) == numbers[1:]
+    db.close()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    test_dispatcher_retries_and_records_each_number()
+    test_interrupted_run_resumes_without_resending()
+    print('All tests passed!')
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_database_layer_does_not_import_selenium():
+    # Fresh interpreter, so modules loaded by other tests do not hide the import
+    for module in ('database.models', 'gym_manager_app'):
+        result = subprocess.run(
+            [sys.executable, '-c', f"import sys, {module}; print('selenium' in sys.modules)"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == 'False', module
+
+if __name__ == '__main__':
+    test_database_layer_does_not_import_selenium()
+    print('All tests passed!')